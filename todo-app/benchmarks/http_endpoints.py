@@ -0,0 +1,221 @@
+"""Latency of the hot HTTP endpoints against seeded datasets.
+
+Drives the ASGI app in-process through ``TestClient``, as the tests do,
+against a temporary database seeded with one user per dataset size (10,
+1,000 and 50,000 todos per list by default). For each dataset it times
+``create_todo``, ``toggle_todo``, ``reorder_todo``, ``search_todos``,
+``get_list``, ``reorder_lists`` and ``app_list_page``, and reports the
+p50/p95/p99 latency and requests per second.
+
+``--save FILE`` writes the results as a JSON baseline. ``--compare FILE``
+checks this run against one and exits with status 1 when any endpoint's
+p50 or p95 is more than ``--max-regression`` percent slower.
+
+Usage: ``uv run python benchmarks/http_endpoints.py [--sizes 10,1000,50000]
+[--requests N] [--save FILE] [--compare FILE] [--max-regression PCT]``
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+# The app reads its database URL at import time
+_DB_DIR = tempfile.mkdtemp(prefix="http-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/bench.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.deps import create_session  # noqa: E402
+from app.database import Todo, TodoList, User, engine, generate_uuid  # noqa: E402
+from app.main import app  # noqa: E402
+from app.migrations import rebuild_list_counts  # noqa: E402
+from app.ordering import integer_key  # noqa: E402
+
+ENDPOINTS = (
+    "create_todo",
+    "toggle_todo",
+    "reorder_todo",
+    "search_todos",
+    "get_list",
+    "reorder_lists",
+    "app_list_page",
+)
+PERCENTILES = (50, 95, 99)
+# Percentiles compared against a baseline
+COMPARED = ("p50_ms", "p95_ms")
+
+
+def populate(size: int, lists: int) -> dict:
+    """Create a user with ``lists`` lists of ``size`` todos; return their ids."""
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        user = User(email=f"bench-{size}@example.com", password="bench")
+        todo_lists = [
+            TodoList(user=user, name=f"List {i}", position=integer_key(i))
+            for i in range(lists)
+        ]
+        session.add_all(todo_lists)
+        session.commit()
+        list_ids = [todo_list.id for todo_list in todo_lists]
+        todo_ids = []
+        for list_id in list_ids:
+            rows = [
+                {
+                    "id": generate_uuid(),
+                    "list_id": list_id,
+                    "title": f"Todo number {i}",
+                    "note": f"Some note text for todo {i}" if i % 3 == 0 else None,
+                    "is_completed": i % 4 == 0,
+                    "priority": ("low", "medium", "high")[i % 3],
+                    "position": integer_key(i),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(size)
+            ]
+            session.execute(insert(Todo), rows)
+            todo_ids.append([row["id"] for row in rows])
+        rebuild_list_counts(session.connection())
+        session.commit()
+        return {"user_id": user.id, "list_ids": list_ids, "todo_ids": todo_ids[0]}
+
+
+def requests_for(client: TestClient, data: dict) -> dict[str, Callable[[int], object]]:
+    """One request per endpoint; ``i`` varies the target between calls."""
+    list_id, lists = data["list_ids"][0], data["list_ids"]
+    todos = data["todo_ids"]
+    return {
+        "create_todo": lambda i: client.post(
+            "/api/todos", data={"list_id": list_id, "title": f"Bench todo {i}"}
+        ),
+        "toggle_todo": lambda i: client.patch(f"/api/todos/{todos[i % len(todos)]}/toggle"),
+        "reorder_todo": lambda i: client.post(
+            f"/api/todos/{todos[i % len(todos)]}/reorder",
+            data={"after_id": todos[(i * 7 + 3) % len(todos)]},
+        ),
+        "search_todos": lambda i: client.get(
+            "/api/todos/search", params={"q": f"number {i % 10}"}
+        ),
+        "get_list": lambda i: client.get(f"/api/lists/{list_id}"),
+        "reorder_lists": lambda i: client.post(
+            "/api/lists/reorder",
+            data={"list_id": lists if i % 2 else list(reversed(lists))},
+        ),
+        "app_list_page": lambda i: client.get(f"/app/lists/{list_id}"),
+    }
+
+
+def measure(request: Callable[[int], object], count: int, warmup: int) -> dict:
+    """Latency percentiles (ms) and throughput of ``count`` sequential calls."""
+    for i in range(warmup):
+        request(i)
+    samples = []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + count):
+        start = time.perf_counter()
+        response = request(i)
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.url} -> {response.status_code}")
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        **{f"p{p}_ms": round(cuts[p - 1], 3) for p in PERCENTILES},
+        "ops_per_sec": round(count / elapsed, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Endpoints whose compared percentiles regressed past the limit."""
+    failures = []
+    for size, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            before = baseline.get(size, {}).get(endpoint)
+            if before is None:
+                continue
+            for key in COMPARED:
+                limit = before[key] * (1 + max_regression / 100)
+                if stats[key] > limit:
+                    change = (stats[key] / before[key] - 1) * 100
+                    failures.append(
+                        f"{endpoint} @ {size} todos: {key} {stats[key]:.2f} ms "
+                        f"vs {before[key]:.2f} ms (+{change:.0f}%)"
+                    )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,1000,50000", help="Todos per list")
+    parser.add_argument("--lists", type=int, default=3, help="Lists per user")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--save", help="Write the results to this JSON baseline")
+    parser.add_argument("--compare", help="Fail when slower than this baseline")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Percent")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    results: dict[str, dict] = {}
+    try:
+        with TestClient(app) as client:
+            for size in sizes:
+                data = populate(size, args.lists)
+                client.cookies.set("session_id", create_session(data["user_id"]))
+                requests = requests_for(client, data)
+                results[str(size)] = {
+                    endpoint: measure(requests[endpoint], args.requests, args.warmup)
+                    for endpoint in ENDPOINTS
+                }
+    finally:
+        engine.dispose()
+        shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+    print(f"{args.requests} requests per endpoint, after {args.warmup} warm-up")
+    for size, endpoints in results.items():
+        print(f"\n{size} todos per list")
+        print(f"{'endpoint':<15}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ops/s':>9}")
+        for endpoint, stats in endpoints.items():
+            print(
+                f"{endpoint:<15}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{stats['ops_per_sec']:>9.1f}"
+            )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "requests": args.requests,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        failures = compare(results, baseline, args.max_regression)
+        if failures:
+            print(f"\nRegressed by more than {args.max_regression:g}%:")
+            print("\n".join(f"  {failure}" for failure in failures))
+            sys.exit(1)
+        print(f"\nNo endpoint regressed by more than {args.max_regression:g}%")
+
+
+if __name__ == "__main__":
+    main()
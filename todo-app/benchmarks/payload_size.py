@@ -0,0 +1,92 @@
+"""Measure the size of a long list's HTML on the wire.
+
+Renders the list view (``partials/todo_list_content.html``) for one list of
+1,000 todos, as untouched templates and with ``TEMPLATE_TRIM_WHITESPACE``,
+and reports the raw size and the size after each compression encoding the
+app can use (brotli and zstd only when their packages are installed).
+
+Usage: ``uv run python benchmarks/payload_size.py [--todos N]``
+"""
+
+import argparse
+import gzip
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import Settings
+from app.core.fragments import todo_fragments
+from app.core.middleware import ENCODERS
+from app.core.templates import create_environment
+from app.database import TodoList
+from app.ordering import integer_key
+from app.read_models import TodoRow
+from app.utils import classify_due
+
+
+def make_todos(count: int) -> list[TodoRow]:
+    """Todos shaped like ``populate`` in read_models.py, without a database."""
+    now = datetime.now(timezone.utc)
+    todos = [
+        TodoRow(
+            f"{i:032x}",
+            f"Todo number {i}",
+            f"Some note text for todo {i}" if i % 3 == 0 else None,
+            i % 4 == 0,
+            now + timedelta(days=i % 30 - 10) if i % 2 else None,
+            ("low", "medium", "high")[i % 3],
+            integer_key(i),
+            now,
+        )
+        for i in range(count)
+    ]
+    classify_due(todos, now.date())
+    return todos
+
+
+def render(trim: bool, todos: list[TodoRow]) -> bytes:
+    # The item cache is keyed by todo, not by environment
+    todo_fragments.clear()
+    env = create_environment(
+        Settings(template_cache_dir=tempfile.mkdtemp(), template_trim_whitespace=trim)
+    )
+    todo_list = TodoList(id="0" * 32, name="Bench", description="A long list")
+    html = env.get_template("partials/todo_list_content.html").render(
+        list=todo_list, todos=todos
+    )
+    return html.encode()
+
+
+def compressed_sizes(body: bytes) -> dict[str, int]:
+    sizes = {"identity": len(body)}
+    for name, factory in ENCODERS.items():
+        if factory is not None:
+            encoder = factory()
+            sizes[name] = len(encoder.compress(body) + encoder.finish())
+    sizes["gzip -9"] = len(gzip.compress(body, 9))
+    return sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=1_000)
+    args = parser.parse_args()
+
+    todos = make_todos(args.todos)
+    results = {
+        label: compressed_sizes(render(trim, todos))
+        for label, trim in (("as written", False), ("trimmed", True))
+    }
+    base = results["as written"]["identity"]
+    print(f"List view with {args.todos} todos, bytes")
+    for label, sizes in results.items():
+        print(
+            f"{label:<11}"
+            + "".join(
+                f"  {name} {size:>8} ({base / size:4.1f}x)"
+                for name, size in sizes.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
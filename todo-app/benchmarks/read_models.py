@@ -0,0 +1,135 @@
+"""Compare ORM hydration with the ``TodoRow`` read models.
+
+Loads one list of todos (10,000 by default) the way the list views used to
+(``select(Todo)``, ORM instances in the session's identity map) and the way
+they do now (``TODO_ROW_COLUMNS`` wrapped in ``TodoRow``), and reports the
+median load time and the memory kept alive per row.
+
+Usage: ``uv run python benchmarks/read_models.py [--todos N] [--rounds N]``
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base, Todo, TodoList, User, generate_uuid
+from app.ordering import integer_key
+from app.read_models import TODO_ROW_COLUMNS, todo_rows
+
+
+def populate(engine, count: int) -> str:
+    """Create one user with one list of ``count`` todos; return the list id."""
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        user = User(email="bench@example.com", password="bench")
+        todo_list = TodoList(user=user, name="Bench", position=integer_key(0))
+        session.add(todo_list)
+        session.commit()
+        list_id = todo_list.id
+        session.execute(
+            insert(Todo),
+            [
+                {
+                    "id": generate_uuid(),
+                    "list_id": list_id,
+                    "title": f"Todo number {i}",
+                    # A third of the todos have a note, like real lists
+                    "note": f"Some note text for todo {i}" if i % 3 == 0 else None,
+                    "is_completed": i % 4 == 0,
+                    "due_date": now + timedelta(days=i % 30 - 10) if i % 2 else None,
+                    "priority": ("low", "medium", "high")[i % 3],
+                    "position": integer_key(i),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(count)
+            ],
+        )
+        session.commit()
+    return list_id
+
+
+def load_orm(session: Session, list_id: str) -> list:
+    """Before: full ORM instances, tracked by the session."""
+    return session.scalars(
+        select(Todo).where(Todo.list_id == list_id).order_by(Todo.position)
+    ).all()
+
+
+def load_read_models(session: Session, list_id: str) -> list:
+    """After: only the rendered columns, as ``__slots__`` objects."""
+    return todo_rows(
+        session.execute(
+            select(*TODO_ROW_COLUMNS)
+            .where(Todo.list_id == list_id)
+            .order_by(Todo.position)
+        )
+    )
+
+
+def measure_time(engine, loader, list_id: str, rounds: int) -> float:
+    """Median wall time in milliseconds, a fresh session per round."""
+    samples = []
+    for _ in range(rounds):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            loader(session, list_id)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure_memory(engine, loader, list_id: str, count: int) -> float:
+    """Bytes per row still allocated while the result and session are alive."""
+    with Session(engine) as session:
+        gc.collect()
+        tracemalloc.start()
+        result = loader(session, list_id)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+    return retained / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="read-models-")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    list_id = populate(engine, args.todos)
+
+    results = {
+        label: (
+            measure_time(engine, loader, list_id, args.rounds),
+            measure_memory(engine, loader, list_id, args.todos),
+        )
+        for label, loader in (
+            ("ORM Todo instances", load_orm),
+            ("TodoRow read models", load_read_models),
+        )
+    }
+    base_ms, base_bytes = results["ORM Todo instances"]
+    print(f"{args.todos} todos, median of {args.rounds} rounds")
+    for label, (ms, per_row) in results.items():
+        print(
+            f"{label:<22} {ms:8.2f} ms ({base_ms / ms:4.1f}x)"
+            f"  {per_row:7.0f} B/row ({base_bytes / per_row:4.1f}x)"
+        )
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
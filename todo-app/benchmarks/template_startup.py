@@ -0,0 +1,72 @@
+"""Measure template compilation cost at worker startup.
+
+Compares the old layout (one ``Jinja2Templates`` per router; as the worst
+case each compiles every template) with the shared environment, with a cold
+and a warm bytecode cache.
+
+Usage: ``uv run python benchmarks/template_startup.py [--rounds N]``
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from fastapi.templating import Jinja2Templates
+
+from app.core.config import Settings
+from app.core.templates import TEMPLATES_DIR, create_environment, precompile_templates
+
+ROUTER_COUNT = 5  # main, pages, auth, todo_lists, todos
+
+
+def per_router_environments() -> None:
+    """Before: every router owns an environment and compiles on its own."""
+    for _ in range(ROUTER_COUNT):
+        env = Jinja2Templates(directory=str(TEMPLATES_DIR)).env
+        for name in env.list_templates(extensions=["html"]):
+            env.get_template(name)
+
+
+def shared_environment(cache_dir: str) -> None:
+    """After: one environment, precompiled from the bytecode cache if warm."""
+    precompile_templates(create_environment(Settings(template_cache_dir=cache_dir)))
+
+
+def measure(func, rounds: int, setup=lambda: None) -> float:
+    """Median wall time in milliseconds."""
+    samples = []
+    for _ in range(rounds):
+        args = setup()
+        start = time.perf_counter()
+        func(*(args or ()))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    rounds = parser.parse_args().rounds
+
+    warm_dir = tempfile.mkdtemp(prefix="jinja-warm-")
+    shared_environment(warm_dir)
+
+    results = {
+        "per-router environments": measure(per_router_environments, rounds),
+        "shared, cold bytecode cache": measure(
+            shared_environment,
+            rounds,
+            setup=lambda: (tempfile.mkdtemp(prefix="jinja-cold-"),),
+        ),
+        "shared, warm bytecode cache": measure(
+            shared_environment, rounds, setup=lambda: (warm_dir,)
+        ),
+    }
+    baseline = results["per-router environments"]
+    for label, ms in results.items():
+        print(f"{label:<30} {ms:8.2f} ms  ({baseline / ms:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Ownership-checked data access shared by the routes.
+
+The "does this row belong to the current user" check is folded into the
+statement that loads or writes the row, so a request does not need a load
+followed by a separate list lookup. Whether a missing row is a 404 or a
+403 is only looked up when the fused statement finds nothing.
+"""
+
+from sqlalchemy import ColumnElement, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database import Todo, TodoList
+from app.read_models import TODO_ROW_COLUMNS, TodoRow, todo_rows
+
+
+def todo_owned_by(user_id: str) -> ColumnElement[bool]:
+    """WHERE clause limiting ``Todo`` rows to lists owned by ``user_id``."""
+    return (
+        select(TodoList.id)
+        .where(TodoList.id == Todo.list_id, TodoList.user_id == user_id)
+        .exists()
+    )
+
+
+async def get_owned_list(
+    db: AsyncSession, list_id: str, user_id: str
+) -> TodoList | None:
+    """Load a list if it belongs to the user."""
+    return await db.scalar(
+        select(TodoList).where(TodoList.id == list_id, TodoList.user_id == user_id)
+    )
+
+
+async def get_owned_todo(db: AsyncSession, todo_id: str, user_id: str) -> Todo | None:
+    """Load a todo if its list belongs to the user."""
+    return await db.scalar(select(Todo).where(Todo.id == todo_id, todo_owned_by(user_id)))
+
+
+async def todo_exists(db: AsyncSession, todo_id: str) -> bool:
+    """Tell "no such todo" (404) from "someone else's todo" (403)."""
+    return await db.scalar(select(Todo.id).where(Todo.id == todo_id)) is not None
+
+
+def todo_page_statement(
+    list_id: str,
+    after: str | None = None,
+    user_id: str | None = None,
+    after_id: str | None = None,
+) -> Select:
+    """Query for the page of a list's todos following the cursor.
+
+    Selects the ``TODO_ROW_COLUMNS`` of app.read_models, not ORM instances.
+
+    Keyset pagination: each page is a range scan on
+    ``ix_todos_list_position_id`` that starts at the cursor, so deep pages
+    cost the same as the first one. Positions are not unique (concurrent
+    inserts, imported data), so the cursor is the ``(position, id)`` pair;
+    ``after`` alone, from links rendered before it was, still works but
+    skips todos that share the boundary position. One row more than a page
+    is selected to tell whether another page follows. Pass ``user_id`` when
+    the list's ownership has not been checked yet.
+    """
+    statement = (
+        select(*TODO_ROW_COLUMNS)
+        .where(Todo.list_id == list_id)
+        .order_by(Todo.position, Todo.id)
+        .limit(settings.todo_page_size + 1)
+    )
+    if after is not None and after_id is not None:
+        statement = statement.where(tuple_(Todo.position, Todo.id) > (after, after_id))
+    elif after is not None:
+        statement = statement.where(Todo.position > after)
+    if user_id is not None:
+        statement = statement.where(todo_owned_by(user_id))
+    return statement
+
+
+async def load_todo_page(
+    db: AsyncSession,
+    list_id: str,
+    after: str | None = None,
+    user_id: str | None = None,
+    after_id: str | None = None,
+) -> tuple[list[TodoRow], tuple[str, str] | None]:
+    """Load a page of todos and the next page's cursor.
+
+    The cursor is the last todo's ``(position, id)``, or None on the last page.
+    """
+    size = settings.todo_page_size
+    todos = todo_rows(
+        await db.execute(todo_page_statement(list_id, after, user_id, after_id))
+    )
+    if len(todos) > size:
+        del todos[size:]
+        return todos, (todos[-1].position, todos[-1].id)
+    return todos, None
@@ -0,0 +1,121 @@
+"""Maintenance commands.
+
+Usage: ``uv run python -m app.cli <command>``
+"""
+
+import argparse
+import time
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from app.core.assets import build_assets, vendor_assets
+from app.core.config import settings
+from app.core.slow_queries import format_report, read_log, summarize
+from app.datagen import generate
+from app.database import Todo, TodoList, engine, init_db
+from app.migrations import (
+    rebalance_positions,
+    rebuild_list_counts,
+    rebuild_search_index,
+)
+
+
+def rebuild_counts(args: argparse.Namespace) -> None:
+    """Recompute every list's open/total todo counters."""
+    with engine.begin() as conn:
+        rebuild_list_counts(conn, args.list_id)
+    print("Rebuilt todo counters" + (f" for list {args.list_id}" if args.list_id else ""))
+
+
+def rebalance(args: argparse.Namespace) -> None:
+    """Rewrite todo and list ordering keys as short, evenly spaced keys."""
+    with engine.begin() as conn:
+        todos = rebalance_positions(conn, Todo, args.list_id)
+        lists = 0 if args.list_id else rebalance_positions(conn, TodoList)
+    print(f"Rebalanced {todos} todo and {lists} list positions")
+
+
+def rebuild_search(args: argparse.Namespace) -> None:
+    """Repopulate the todo full-text search index (run after VACUUM)."""
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+    print("Rebuilt todo search index")
+
+
+def vendor(args: argparse.Namespace) -> None:
+    """Download the pinned Shoelace, HTMX and SortableJS bundles into static/."""
+    files = vendor_assets()
+    print(f"Vendored {len(files)} files")
+
+
+def build_static(args: argparse.Namespace) -> None:
+    """Write gzip (and brotli, if installed) copies of the static files."""
+    print(f"Wrote {build_assets()} precompressed files")
+
+
+def slow_queries(args: argparse.Namespace) -> None:
+    """Summarize the slow-statement log, worst first, with index advice."""
+    print(format_report(summarize(read_log(args.log)), args.top))
+
+
+def generate_data(args: argparse.Namespace) -> None:
+    """Insert synthetic users x lists x todos, reproducible from --seed."""
+    as_of = None
+    if args.as_of:
+        as_of = datetime.strptime(args.as_of, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    start = time.perf_counter()
+    counts = generate(
+        engine, args.users, args.lists, args.todos, args.seed, as_of, args.batch_size
+    )
+    print(
+        f"Generated {counts.users} users, {counts.lists} lists and {counts.todos} "
+        f"todos in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="todo-app", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-counts", help=rebuild_counts.__doc__)
+    rebuild.add_argument("--list-id", help="Only rebuild this list")
+    rebuild.set_defaults(handler=rebuild_counts)
+
+    rebalance_cmd = commands.add_parser("rebalance-positions", help=rebalance.__doc__)
+    rebalance_cmd.add_argument("--list-id", help="Only rebalance todos in this list")
+    rebalance_cmd.set_defaults(handler=rebalance)
+
+    search = commands.add_parser("rebuild-search-index", help=rebuild_search.__doc__)
+    search.set_defaults(handler=rebuild_search)
+
+    vendor_cmd = commands.add_parser("vendor-assets", help=vendor.__doc__)
+    vendor_cmd.set_defaults(handler=vendor)
+
+    build = commands.add_parser("build-assets", help=build_static.__doc__)
+    build.set_defaults(handler=build_static)
+
+    slow = commands.add_parser("slow-queries", help=slow_queries.__doc__)
+    slow.add_argument("--log", default=settings.slow_query_log, help="Log file to read")
+    slow.add_argument("--top", type=int, default=10, help="Statements to show")
+    slow.set_defaults(handler=slow_queries)
+
+    data = commands.add_parser("generate-data", help=generate_data.__doc__)
+    data.add_argument("--users", type=int, default=10)
+    data.add_argument("--lists", type=int, default=5, help="Lists per user")
+    data.add_argument("--todos", type=int, default=100, help="Todos per list")
+    data.add_argument("--seed", type=int, default=0, help="Also part of the emails")
+    data.add_argument("--as-of", help="Date the data is anchored to (YYYY-MM-DD)")
+    data.add_argument("--batch-size", type=int, default=50_000, help="Rows per commit")
+    data.set_defaults(handler=generate_data)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    init_db()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Static assets: vendored bundles, fingerprinted URLs and precompression.
+
+Templates link assets through ``asset_url``. The app's own files get a
+content hash in their name (``css/styles.3f9a1c2e7b40.css``); third-party
+bundles live under ``vendor/<package>-<version>/``, so a version bump is
+what changes their URL. Either way the URL names one exact content, so
+``AssetFiles`` serves it with ``Cache-Control: immutable`` and browsers
+never revalidate it. Files behind any other URL are revalidated through
+their ETag on each use.
+
+``todo-app vendor-assets`` downloads the pinned bundles (until it has run,
+``asset_url`` points at the public CDN instead), and ``todo-app
+build-assets`` writes ``.gz`` (and, with the ``brotli`` package, ``.br``)
+copies next to each file, which ``AssetFiles`` serves to clients that
+accept them.
+"""
+
+import gzip
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import shutil
+import tarfile
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+
+from app.core.middleware import COMPRESSIBLE_TYPES, accepted_encodings, brotli
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_URL = "/static/"
+VENDOR_DIR = "vendor"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Precompressed siblings, in order of preference
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+
+HASH_LENGTH = 12
+_HASHED_NAME = re.compile(
+    rf"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{{{HASH_LENGTH}}})(?P<suffix>\.[^./]+)$"
+)
+
+
+@dataclass(frozen=True)
+class VendorPackage:
+    """A pinned npm package, or the part of it the pages load."""
+
+    name: str
+    version: str
+    # Directory inside the package to vendor; empty for its root
+    source: str
+    # Files of ``source`` to keep; empty keeps the whole directory
+    files: tuple[str, ...] = ()
+
+    @property
+    def slug(self) -> str:
+        return self.name.rpartition("/")[2]
+
+    @property
+    def path(self) -> str:
+        """Directory under STATIC_DIR, e.g. ``vendor/htmx.org-2.0.4``."""
+        return f"{VENDOR_DIR}/{self.slug}-{self.version}"
+
+    @property
+    def tarball_url(self) -> str:
+        return f"https://registry.npmjs.org/{self.name}/-/{self.slug}-{self.version}.tgz"
+
+    @property
+    def cdn_url(self) -> str:
+        source = f"{self.source}/" if self.source else ""
+        return f"https://cdn.jsdelivr.net/npm/{self.name}@{self.version}/{source}"
+
+
+VENDOR_PACKAGES = (
+    # Shoelace loads components and icons relative to its base path, so the
+    # whole cdn/ directory is kept
+    VendorPackage("@shoelace-style/shoelace", "2.19.1", "cdn"),
+    VendorPackage("htmx.org", "2.0.4", "dist", ("htmx.min.js",)),
+    VendorPackage("sortablejs", "1.15.6", "", ("Sortable.min.js",)),
+)
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+
+
+class AssetManifest:
+    """Content hashes of the app's own static files.
+
+    Hashes are recomputed when a file's size or mtime changes, so edits
+    during development get a new URL without a restart. The fingerprint
+    for page ETags is taken once, like TEMPLATES_FINGERPRINT, so the 304
+    path never walks the directory; ``refresh`` retakes it.
+    """
+
+    def __init__(self, directory: Path = STATIC_DIR):
+        self.directory = directory
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+        self._fingerprint: str | None = None
+
+    def hash(self, path: str) -> str | None:
+        """Current content hash of ``path`` (relative), None if it is missing."""
+        try:
+            stat = (self.directory / path).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        cached = self._hashes.get(path)
+        if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            cached = (stat.st_mtime_ns, stat.st_size, _file_hash(self.directory / path))
+            self._hashes[path] = cached
+        return cached[2]
+
+    def url(self, path: str) -> str:
+        """URL of ``path``: hashed for app files, versioned for vendored ones."""
+        path = path.lstrip("/")
+        if path.startswith(f"{VENDOR_DIR}/"):
+            if (self.directory / path).exists():
+                return STATIC_URL + path
+            for package in VENDOR_PACKAGES:
+                if path.startswith(f"{package.path}/"):
+                    return package.cdn_url + path.removeprefix(f"{package.path}/")
+            raise ValueError(f"Unknown vendored asset: {path}")
+        digest = self.hash(path)
+        if digest is None:
+            raise ValueError(f"Unknown static asset: {path}")
+        stem, suffix = os.path.splitext(path)
+        return f"{STATIC_URL}{stem}.{digest}{suffix}"
+
+    def resolve(self, path: str) -> tuple[str, bool]:
+        """Map a requested path to the file on disk and whether it is immutable.
+
+        A hashed name whose hash is no longer current (a page rendered
+        before a deploy) still gets the file, but not the immutable header.
+        """
+        if path.startswith(f"{VENDOR_DIR}/"):
+            return path, True
+        match = _HASHED_NAME.match(path)
+        if match is None:
+            return path, False
+        original = match["stem"] + match["suffix"]
+        digest = self.hash(original)
+        if digest is None:
+            return path, False
+        return original, digest == match["hash"]
+
+    def fingerprint(self) -> str:
+        """Digest over the hashes of all app files, for page ETags."""
+        if self._fingerprint is None:
+            digest = hashlib.sha1(usedforsecurity=False)
+            for path in sorted(_app_files(self.directory)):
+                digest.update(f"{path}={self.hash(path)}\x1f".encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def refresh(self) -> None:
+        """Forget the fingerprint, after the files on disk changed."""
+        self._fingerprint = None
+
+
+def _app_files(directory: Path) -> list[str]:
+    """The app's own static files (not vendored, not precompressed copies)."""
+    files = []
+    for root, dirs, names in os.walk(directory):
+        if Path(root) == directory and VENDOR_DIR in dirs:
+            dirs.remove(VENDOR_DIR)
+        files += [
+            (Path(root) / name).relative_to(directory).as_posix()
+            for name in names
+            if not name.endswith(tuple(PRECOMPRESSED.values()))
+        ]
+    return files
+
+
+assets = AssetManifest()
+
+
+def asset_url(path: str) -> str:
+    """Template global: the cacheable URL of a static asset."""
+    return assets.url(path)
+
+
+class AssetFiles(StaticFiles):
+    """``StaticFiles`` that understands hashed names and precompressed copies."""
+
+    def __init__(self, *, directory: Path = STATIC_DIR, manifest: AssetManifest = assets):
+        super().__init__(directory=directory)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        path, immutable = self.manifest.resolve(path)
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE if immutable else REVALIDATE
+        if isinstance(response, FileResponse):
+            response = self._precompressed(response, scope)
+        return response
+
+    def _precompressed(self, response: FileResponse, scope: Scope) -> Response:
+        """Swap in the ``.br`` / ``.gz`` copy when the client accepts it."""
+        media_type = response.media_type.partition(";")[0].strip()
+        if media_type not in COMPRESSIBLE_TYPES:
+            return response
+        response.headers["Vary"] = "Accept-Encoding"
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED.items():
+            copy = f"{response.path}{suffix}"
+            if encoding in accepted and os.path.isfile(copy):
+                headers = {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name not in ("content-length", "content-type", "etag")
+                }
+                # Same representation metadata, different bytes
+                headers["ETag"] = f'W/{response.headers["etag"]}'
+                headers["Content-Encoding"] = encoding
+                return FileResponse(copy, headers=headers, media_type=response.media_type)
+        return response
+
+
+def vendor_assets(directory: Path = STATIC_DIR) -> list[str]:
+    """Download the pinned VENDOR_PACKAGES into ``directory``/vendor."""
+    written = []
+    for package in VENDOR_PACKAGES:
+        target = directory / package.path
+        with urllib.request.urlopen(package.tarball_url) as response:
+            archive = tarfile.open(fileobj=io.BytesIO(response.read()), mode="r:gz")
+        prefix = f"package/{package.source}/" if package.source else "package/"
+        shutil.rmtree(target, ignore_errors=True)
+        for member in archive.getmembers():
+            if not member.isfile() or not member.name.startswith(prefix):
+                continue
+            relative = member.name.removeprefix(prefix)
+            if package.files and relative not in package.files:
+                continue
+            destination = target / relative
+            if not destination.resolve().is_relative_to(target.resolve()):
+                raise ValueError(f"Unsafe path in {package.name}: {member.name}")
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.write_bytes(archive.extractfile(member).read())
+            written.append(destination.relative_to(directory).as_posix())
+    return written
+
+
+def build_assets(directory: Path = STATIC_DIR, min_size: int = 500) -> int:
+    """Write compressed copies of every compressible static file.
+
+    Copies that are newer than their source are kept, so a rebuild only
+    compresses what changed. Returns how many copies were written.
+    """
+    written = 0
+    for path in directory.rglob("*"):
+        if (
+            not path.is_file()
+            or path.suffix in PRECOMPRESSED.values()
+            or path.stat().st_size < min_size
+            or not _is_compressible(path)
+        ):
+            continue
+        data = None
+        for encoding, suffix in PRECOMPRESSED.items():
+            if encoding == "br" and brotli is None:
+                continue
+            copy = path.with_name(path.name + suffix)
+            if copy.exists() and copy.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+                continue
+            data = data if data is not None else path.read_bytes()
+            if encoding == "br":
+                compressed = brotli.compress(data, quality=11)
+            else:
+                compressed = gzip.compress(data, 9, mtime=0)
+            copy.write_bytes(compressed)
+            written += 1
+    if directory == assets.directory:
+        assets.refresh()
+    return written
+
+
+def _is_compressible(path: Path) -> bool:
+    media_type, _ = mimetypes.guess_type(path.name)
+    return media_type in COMPRESSIBLE_TYPES
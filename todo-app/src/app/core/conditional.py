@@ -0,0 +1,76 @@
+"""Conditional GETs: strong ETags and ``304 Not Modified``.
+
+Routes build the ETag from a few cheap columns, mainly the change counters
+that SQLite triggers keep (``todo_lists.version`` and ``users.lists_version``,
+see app.database), before loading anything else. When the client already
+holds that representation they answer ``304`` without rendering.
+``Cache-Control: private, no-cache`` lets the browser keep the response but
+makes it revalidate on every use, so a stale page is never shown.
+"""
+
+import hashlib
+from typing import TYPE_CHECKING
+
+from fastapi import Request, Response
+
+from app.core.assets import assets
+from app.core.config import settings
+from app.core.templates import TEMPLATES_FINGERPRINT
+from app.utils import request_today
+
+if TYPE_CHECKING:
+    from app.database import TodoList
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over ``parts``, the deployed templates and asset hashes."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    # Pages link assets by content hash, so a changed asset changes them
+    for part in (TEMPLATES_FINGERPRINT, assets.fingerprint(), *parts):
+        digest.update(f"{part}\x1f".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def sidebar_etag(user_id: str, lists_version: int) -> str:
+    """ETag of the user's sidebar (names, colors, order and open counts)."""
+    return make_etag("sidebar", user_id, lists_version)
+
+
+def list_etag(list_obj: "TodoList") -> str:
+    """ETag of a list's first page; the date is in it for the overdue styling."""
+    return make_etag(
+        "list",
+        list_obj.id,
+        list_obj.version,
+        list_obj.updated_at,
+        request_today(),
+        settings.todo_page_size,
+    )
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` already names ``etag``.
+
+    ``If-None-Match`` uses the weak comparison, so a ``W/`` prefix added
+    by a proxy (e.g. after compressing the body) still matches.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    """Mark a rendered response as revalidatable with ``etag``."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    """The bodiless answer to a matching conditional GET."""
+    return set_etag(Response(status_code=304), etag)
@@ -0,0 +1,127 @@
+"""Application settings loaded from environment variables."""
+
+import os
+from dataclasses import dataclass, field
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class Settings:
+    """Runtime configuration. Every field can be overridden via an env var."""
+
+    database_url: str = field(
+        default_factory=lambda: _env_str("DATABASE_URL", "sqlite:///./todo.db")
+    )
+    # "development": one connection per session, default journal (simple, no state)
+    # "production": pooled connections, WAL journal and tuned PRAGMAs
+    db_profile: str = field(default_factory=lambda: _env_str("DB_PROFILE", "development"))
+    db_pool_size: int = field(default_factory=lambda: _env_int("DB_POOL_SIZE", 5))
+    db_max_overflow: int = field(default_factory=lambda: _env_int("DB_MAX_OVERFLOW", 10))
+
+    # SQLite PRAGMAs applied on connect by the production profile
+    sqlite_synchronous: str = field(
+        default_factory=lambda: _env_str("SQLITE_SYNCHRONOUS", "NORMAL")
+    )
+    sqlite_mmap_size: int = field(
+        default_factory=lambda: _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+    )
+    # Negative values are KiB, positive values are pages (SQLite semantics)
+    sqlite_cache_size: int = field(
+        default_factory=lambda: _env_int("SQLITE_CACHE_SIZE", -64_000)
+    )
+    sqlite_temp_store: str = field(
+        default_factory=lambda: _env_str("SQLITE_TEMP_STORE", "MEMORY")
+    )
+    sqlite_busy_timeout: int = field(
+        default_factory=lambda: _env_int("SQLITE_BUSY_TIMEOUT", 5000)
+    )
+
+    # Rebalance a list's ordering keys once a moved key grows past this length
+    order_key_rebalance_length: int = field(
+        default_factory=lambda: _env_int("ORDER_KEY_REBALANCE_LENGTH", 32)
+    )
+    # Todos rendered per response; further pages load as the list is scrolled
+    todo_page_size: int = field(default_factory=lambda: _env_int("TODO_PAGE_SIZE", 100))
+
+    # "memory": per-process store; "sqlite": file shared by all workers;
+    # "signed": no store, HMAC-signed cookies verified with SESSION_SECRET
+    session_backend: str = field(
+        default_factory=lambda: _env_str("SESSION_BACKEND", "memory")
+    )
+    session_db_path: str = field(
+        default_factory=lambda: _env_str("SESSION_DB_PATH", "./sessions.db")
+    )
+    session_secret: str = field(default_factory=lambda: _env_str("SESSION_SECRET", ""))
+    session_ttl: int = field(default_factory=lambda: _env_int("SESSION_TTL", 3600))
+    session_max_entries: int = field(
+        default_factory=lambda: _env_int("SESSION_MAX_ENTRIES", 100_000)
+    )
+
+    # Compiled template bytecode; empty means Jinja2's per-user temp directory
+    template_cache_dir: str = field(
+        default_factory=lambda: _env_str("TEMPLATE_CACHE_DIR", "")
+    )
+    # Strip template indentation and blank lines at compile time
+    template_trim_whitespace: bool = field(
+        default_factory=lambda: _env_bool("TEMPLATE_TRIM_WHITESPACE", False)
+    )
+
+    # Server-Timing header and per-request timing log (also toggled at
+    # runtime with SIGUSR2, see app.core.timing)
+    server_timing: bool = field(
+        default_factory=lambda: _env_bool("SERVER_TIMING", False)
+    )
+    # While timing, log statements one request runs this often (0: never)
+    n_plus_one_threshold: int = field(
+        default_factory=lambda: _env_int("N_PLUS_ONE_THRESHOLD", 5)
+    )
+
+    # Log statements slower than this (ms, 0 disables) with their query
+    # plans to SLOW_QUERY_LOG; summarize with `todo-app slow-queries`
+    # Fractions are fine: most SQLite statements take well under 1 ms
+    slow_query_ms: float = field(
+        default_factory=lambda: _env_float("SLOW_QUERY_MS", 0.0)
+    )
+    slow_query_log: str = field(
+        default_factory=lambda: _env_str("SLOW_QUERY_LOG", "./slow-queries.jsonl")
+    )
+
+    # Share /metrics across workers through snapshot files in this
+    # directory (empty: each worker reports only itself)
+    metrics_dir: str = field(default_factory=lambda: _env_str("METRICS_DIR", ""))
+    metrics_flush_interval: int = field(
+        default_factory=lambda: _env_int("METRICS_FLUSH_INTERVAL", 5)
+    )
+
+    # Response compression: encodings in order of preference (those whose
+    # library is missing are skipped; empty disables) and the smallest body
+    # worth compressing
+    compression_encodings: str = field(
+        default_factory=lambda: _env_str("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    )
+    compression_min_size: int = field(
+        default_factory=lambda: _env_int("COMPRESSION_MIN_SIZE", 500)
+    )
+
+    # Memory cap (characters of HTML) for the rendered todo fragment cache
+    fragment_cache_bytes: int = field(
+        default_factory=lambda: _env_int("FRAGMENT_CACHE_BYTES", 8 * 1024 * 1024)
+    )
+
+
+settings = Settings()
@@ -1,40 +1,57 @@
 """Authentication and dependency injection."""
 
-from datetime import datetime, timedelta, timezone
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Annotated, Optional
-from uuid import uuid4
 
 from fastapi import Cookie, HTTPException, Request, Response
 
-# In-memory session storage - sessions lost on restart
-sessions: dict[str, dict] = {}
+from app.core.config import settings
+from app.core.sessions import SessionStore, create_session_store
+from app.core.timing import span
+
+# Session storage selected by SESSION_BACKEND (see app.core.sessions)
+sessions: SessionStore = create_session_store(settings)
+
+# The user's IANA time zone, copied from User.timezone at login; only used
+# to decide which date "today" is (see app.core.middleware)
+TIMEZONE_COOKIE = "timezone"
+
+
+@contextmanager
+def _session_store_write() -> Iterator[None]:
+    """Answer 503 when the SQLite session store stays locked by another worker."""
+    try:
+        yield
+    except sqlite3.OperationalError as exc:
+        if "locked" not in str(exc):
+            raise
+        raise HTTPException(
+            status_code=503,
+            detail="Session store busy, try again",
+            headers={"Retry-After": "1"},
+        ) from exc
 
 
 def create_session(user_id: str) -> str:
     """Create a new session for a user."""
-    session_id = str(uuid4())
-    sessions[session_id] = {
-        "user_id": user_id,
-        "expires": datetime.now(timezone.utc) + timedelta(hours=1),
-    }
-    return session_id
+    with _session_store_write():
+        return sessions.create(user_id)
 
 
 def delete_session(session_id: str) -> None:
     """Delete a session."""
-    if session_id in sessions:
-        del sessions[session_id]
+    with _session_store_write():
+        sessions.delete(session_id)
 
 
 def get_session(session_id: Optional[str]) -> Optional[dict]:
     """Get session data if valid."""
-    if not session_id or session_id not in sessions:
-        return None
-    session = sessions[session_id]
-    if session["expires"] < datetime.now(timezone.utc):
-        del sessions[session_id]
+    if not session_id:
         return None
-    return session
+    with span("auth"):
+        return sessions.get(session_id)
 
 
 async def get_current_user_id(
@@ -61,14 +78,29 @@ def set_session_cookie(response: Response, session_id: str) -> None:
         key="session_id",
         value=session_id,
         httponly=True,
-        max_age=3600,
+        max_age=sessions.ttl,
         samesite="lax",
     )
 
 
 def clear_session_cookie(response: Response) -> None:
-    """Clear the session cookie."""
+    """Clear the session cookie and the time zone cookie set with it."""
     response.delete_cookie(key="session_id")
+    response.delete_cookie(key=TIMEZONE_COOKIE)
+
+
+def set_timezone_cookie(response: Response, timezone_name: str | None) -> None:
+    """Remember the user's time zone for later requests (cleared if unset)."""
+    if not timezone_name:
+        response.delete_cookie(key=TIMEZONE_COOKIE)
+        return
+    response.set_cookie(
+        key=TIMEZONE_COOKIE,
+        value=timezone_name,
+        httponly=True,
+        max_age=sessions.ttl,
+        samesite="lax",
+    )
 
 
 def is_htmx_request(request: Request) -> bool:
@@ -0,0 +1,88 @@
+"""Cache of rendered ``partials/todo_item.html`` fragments.
+
+A todo's HTML only changes when the todo is written (which bumps
+``updated_at``) or when the date changes (overdue / due-today styling, in
+the user's time zone), so entries are versioned by both. Other workers'
+writes therefore never serve stale HTML, and local writes also drop the
+entry right away to free memory.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from jinja2 import Environment, pass_environment
+from markupsafe import Markup
+
+from app.core.config import settings
+from app.utils import request_today
+
+TODO_ITEM_TEMPLATE = "partials/todo_item.html"
+
+
+class FragmentCache:
+    """LRU map of ``key -> (version, html)`` capped by total HTML size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[tuple, Markup]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: tuple) -> Markup | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, version: tuple, html: Markup) -> None:
+        with self._lock:
+            self._discard(key)
+            if len(html) > self.max_bytes:
+                return
+            self._entries[key] = (version, html)
+            self.size += len(html)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = 0
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+todo_fragments = FragmentCache(settings.fragment_cache_bytes)
+
+
+def _today() -> date:
+    return request_today()
+
+
+@pass_environment
+def render_todo(env: Environment, todo) -> Markup:
+    """Render one todo item, reusing the cached HTML while it is current."""
+    version = (todo.updated_at, _today())
+    html = todo_fragments.get(todo.id, version)
+    if html is None:
+        html = Markup(env.get_template(TODO_ITEM_TEMPLATE).render(todo=todo))
+        todo_fragments.put(todo.id, version, html)
+    return html
@@ -0,0 +1,283 @@
+"""In-process metrics in the Prometheus text format, merged across workers.
+
+Each worker records into plain dicts, updated from the event loop without
+locks. With ``METRICS_DIR`` set, it also writes a snapshot to
+``<METRICS_DIR>/metrics-<pid>.json`` every ``METRICS_FLUSH_INTERVAL``
+seconds and before answering a scrape, and ``/metrics`` on any worker
+merges every snapshot in the directory:
+
+- counters and histograms are summed; a stopped worker's counts are kept,
+  so totals never go backwards (clear the directory when deploying)
+- gauges get a ``pid`` label, and only running workers' values are shown
+
+Without ``METRICS_DIR`` each worker reports only its own metrics.
+"""
+
+import asyncio
+import json
+import os
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+from app.core.config import settings
+from app.core.statements import add_statement_listener
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+# name -> (type, help, histogram buckets)
+METRICS: dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "todo_http_requests_total": ("counter", "HTTP requests by route and status.", ()),
+    "todo_http_request_errors_total": (
+        "counter",
+        "HTTP requests that failed with a 5xx status or an exception.",
+        (),
+    ),
+    "todo_http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency, until the body was sent.",
+        LATENCY_BUCKETS,
+    ),
+    "todo_db_statements_total": ("counter", "SQL statements executed.", ()),
+    "todo_db_statement_duration_seconds": (
+        "histogram",
+        "SQL statement execution time.",
+        STATEMENT_BUCKETS,
+    ),
+    "todo_db_connections_opened_total": ("counter", "New DBAPI connections.", ()),
+    "todo_db_connection_checkouts_total": ("counter", "Pool checkouts.", ()),
+    "todo_db_connections_in_use": ("gauge", "Connections checked out of the pool.", ()),
+    "todo_sessions": ("gauge", "Entries in the session store.", ()),
+    "todo_fragment_cache_hits_total": ("counter", "Rendered todo cache hits.", ()),
+    "todo_fragment_cache_misses_total": ("counter", "Rendered todo cache misses.", ()),
+    "todo_fragment_cache_hit_ratio": (
+        "gauge",
+        "Share of todo renders served from the fragment cache.",
+        (),
+    ),
+    "todo_fragment_cache_bytes": ("gauge", "HTML held by the fragment cache.", ()),
+    "todo_template_cache_templates": ("gauge", "Compiled templates in memory.", ()),
+}
+
+Labels = tuple[tuple[str, str], ...]
+# A collector returns (name, labels, value) samples at snapshot time
+Collector = Callable[[], Iterable[tuple[str, Labels, float]]]
+
+
+class Registry:
+    """One process's metrics."""
+
+    def __init__(self):
+        self.counters: dict[tuple[str, Labels], float] = {}
+        # [per-bucket counts..., +Inf count, sum]
+        self.histograms: dict[tuple[str, Labels], list[float]] = {}
+        self.collectors: list[Collector] = []
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        counts = self.histograms.get(key)
+        if counts is None:
+            counts = self.histograms[key] = [0.0] * (len(buckets) + 2)
+        counts[bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def add_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """JSON-ready copy of the current values, collectors included."""
+        counters = [
+            [name, labels, value] for (name, labels), value in self.counters.items()
+        ]
+        gauges = []
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                target = counters if METRICS[name][0] == "counter" else gauges
+                target.append([name, labels, value])
+        return {
+            "pid": os.getpid(),
+            "counters": counters,
+            "histograms": [
+                [name, labels, list(counts)]
+                for (name, labels), counts in self.histograms.items()
+            ],
+            "gauges": gauges,
+        }
+
+    def clear(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+
+
+registry = Registry()
+
+
+def _snapshot_path(directory: str, pid: int) -> Path:
+    return Path(directory) / f"metrics-{pid}.json"
+
+
+def write_snapshot(snapshot: dict, directory: str) -> None:
+    """Replace this worker's snapshot file atomically."""
+    path = _snapshot_path(directory, snapshot["pid"])
+    temp = path.with_suffix(".tmp")
+    temp.write_text(json.dumps(snapshot))
+    os.replace(temp, path)
+
+
+def read_snapshots(directory: str) -> list[dict]:
+    snapshots = []
+    for path in Path(directory).glob("metrics-*.json"):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Removed or being replaced right now
+            continue
+    return snapshots
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge(snapshots: Iterable[dict]) -> dict:
+    """Sum counters and histograms; label live workers' gauges by pid."""
+    counters: dict[tuple, float] = {}
+    histograms: dict[tuple, list[float]] = {}
+    gauges: dict[tuple, float] = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [0.0] * len(counts))
+            for i, count in enumerate(counts):
+                merged[i] += count
+        pid = snapshot["pid"]
+        if pid == os.getpid() or _is_running(pid):
+            for name, labels, value in snapshot["gauges"]:
+                key = (name, (*map(tuple, labels), ("pid", str(pid))))
+                gauges[key] = value
+    return {"counter": counters, "histogram": histograms, "gauge": gauges}
+
+
+def _labels(labels: Iterable[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(merged: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        samples = sorted(
+            (labels, value) for (metric, labels), value in merged[kind].items()
+            if metric == name
+        )
+        if not samples:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for labels, value in samples:
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*buckets, "+Inf"), value[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(bound)
+                lines.append(
+                    f"{name}_bucket{_labels((*labels, ('le', le)))} {_number(cumulative)}"
+                )
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labels)} {_number(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+async def exposition(directory: str | None = None) -> str:
+    """All workers' metrics (only this one's without a directory)."""
+    directory = settings.metrics_dir if directory is None else directory
+    snapshot = registry.snapshot()
+    if not directory:
+        return render(merge([snapshot]))
+    await asyncio.to_thread(write_snapshot, snapshot, directory)
+    return render(merge(await asyncio.to_thread(read_snapshots, directory)))
+
+
+async def flush_periodically(directory: str, interval: float) -> None:
+    """Lifespan task: keep this worker's snapshot file current."""
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    try:
+        while True:
+            await asyncio.to_thread(write_snapshot, registry.snapshot(), directory)
+            await asyncio.sleep(interval)
+    finally:
+        write_snapshot(registry.snapshot(), directory)
+
+
+def record_request(method: str, route: str, status: int, seconds: float) -> None:
+    labels = (("method", method), ("route", route))
+    registry.inc("todo_http_requests_total", (*labels, ("status", str(status))))
+    if status >= 500:
+        registry.inc("todo_http_request_errors_total", labels)
+    registry.observe("todo_http_request_duration_seconds", seconds, labels)
+
+
+# Database hooks: statements through app.core.statements, connections on
+# the Pool class so every engine is covered
+
+_in_use = 0
+
+
+def _record_statement(conn, statement, parameters, context, executemany, seconds):
+    registry.inc("todo_db_statements_total")
+    registry.observe("todo_db_statement_duration_seconds", seconds)
+
+
+add_statement_listener(_record_statement)
+
+
+@event.listens_for(Pool, "connect")
+def _connect(dbapi_connection, connection_record):
+    registry.inc("todo_db_connections_opened_total")
+
+
+@event.listens_for(Pool, "checkout")
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    global _in_use
+    _in_use += 1
+    registry.inc("todo_db_connection_checkouts_total")
+
+
+@event.listens_for(Pool, "checkin")
+def _checkin(dbapi_connection, connection_record):
+    global _in_use
+    _in_use -= 1
+
+
+registry.add_collector(lambda: [("todo_db_connections_in_use", (), _in_use)])
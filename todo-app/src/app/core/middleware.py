@@ -0,0 +1,300 @@
+"""ASGI middleware applied to every request."""
+
+import zlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from time import perf_counter
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics, timing
+from app.core.deps import TIMEZONE_COOKIE
+from app.utils import reset_request_today, set_request_today
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+
+class RequestTodayMiddleware:
+    """Fix "today" once per request, in the time zone of the user's cookie.
+
+    Plain ASGI rather than ``@app.middleware("http")``, so streamed
+    responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = set_request_today(HTTPConnection(scope).cookies.get(TIMEZONE_COOKIE))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_request_today(token)
+
+
+class ServerTimingMiddleware:
+    """Time each request while app.core.timing is enabled.
+
+    The ``Server-Timing`` header covers the work done before the headers
+    were sent; for streamed pages the log line, written when the body is
+    complete, also covers the rows and items rendered while streaming.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not timing.is_enabled():
+            await self.app(scope, receive, send)
+            return
+        request_timing, token = timing.start_request()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", request_timing.header()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timing.end_request(token)
+            timing.log_request(scope["method"], scope["path"], status, request_timing)
+
+
+class MetricsMiddleware:
+    """Count requests and time them, by route template rather than URL.
+
+    The time runs until the last body chunk is sent, so streamed pages
+    are measured whole.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        root_path = scope.get("root_path", "")
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            route = _route_label(scope, root_path)
+            metrics.record_request(
+                scope["method"], route, status, perf_counter() - start
+            )
+
+
+def _route_label(scope: Scope, root_path: str) -> str:
+    """The matched route's path template, or the mount it went to."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounts (static files) extend root_path instead
+    mount = scope.get("root_path", "").removeprefix(root_path)
+    return mount or "unmatched"
+
+
+# Bodies worth compressing; images and fonts are compressed already
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+
+@dataclass
+class Encoder:
+    """One response's compressor.
+
+    ``flush`` ends a chunk of a streamed body so the client can decode it
+    right away; ``finish`` ends the stream.
+    """
+
+    compress: Callable[[bytes], bytes]
+    flush: Callable[[], bytes]
+    finish: Callable[[], bytes]
+
+
+def gzip_encoder() -> Encoder:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return Encoder(
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def brotli_encoder() -> Encoder:
+    # Quality 5: close to gzip's speed at a clearly better ratio
+    compressor = brotli.Compressor(quality=5)
+    return Encoder(compressor.process, compressor.flush, compressor.finish)
+
+
+def zstd_encoder() -> Encoder:
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    return Encoder(
+        compressor.compress,
+        lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        compressor.flush,
+    )
+
+
+ENCODERS: dict[str, Callable[[], Encoder] | None] = {
+    "zstd": zstd_encoder if zstandard else None,
+    "br": brotli_encoder if brotli else None,
+    "gzip": gzip_encoder,
+}
+
+
+def available_encodings(names: Sequence[str]) -> list[str]:
+    """Keep the configured encodings whose library is installed, in order."""
+    for name in names:
+        if name not in ENCODERS:
+            raise ValueError(f"Unknown compression encoding: {name}")
+    return [name for name in names if ENCODERS[name] is not None]
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Content codings an ``Accept-Encoding`` header allows (``q`` > 0)."""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        quality = params.strip().removeprefix("q=")
+        try:
+            if name and (not params or float(quality) > 0):
+                accepted.add(name)
+        except ValueError:
+            continue
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compress text responses with zstd, brotli or gzip.
+
+    The first of ``encodings`` that the client accepts (and whose library
+    is installed) is used. Bodies below ``min_size`` bytes, other content
+    types and already encoded responses pass through unchanged. Streamed
+    bodies are compressed chunk by chunk and flushed after every chunk, so
+    they still reach the client incrementally. Strong ETags of compressed
+    responses are made weak; If-None-Match compares weakly, so 304s still
+    work.
+    """
+
+    def __init__(
+        self, app: ASGIApp, min_size: int = 500, encodings: Sequence[str] = ("gzip",)
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.encodings = available_encodings(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = next((name for name in self.encodings if name in accepted), None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.min_size))
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """Mark a strong ETag weak: the encoded bytes differ from the identity body's."""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class _CompressingSend:
+    """``send`` wrapper that holds the response start until the first body."""
+
+    def __init__(self, send: Send, encoding: str, min_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.min_size = min_size
+        self.start: Message | None = None
+        self.encoder: Encoder | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if self.start is None:
+            # Passing through, or compressing an ongoing stream
+            if self.encoder is not None and message["type"] == "http.response.body":
+                message = self._encode(message)
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        if start["status"] == 304:
+            # Repeat the validator the compressed 200 carried
+            _weaken_etag(MutableHeaders(raw=start["headers"]))
+        elif message["type"] == "http.response.body" and self._should_compress(
+            start, message
+        ):
+            self.encoder = ENCODERS[self.encoding]()
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            _weaken_etag(headers)
+            message = self._encode(message)
+            if message.get("more_body"):
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+        await self.send(start)
+        await self.send(message)
+
+    def _should_compress(self, start: Message, message: Message) -> bool:
+        headers = Headers(raw=start["headers"])
+        content_type = headers.get("content-type", "").partition(";")[0].strip()
+        if "content-encoding" in headers or content_type not in COMPRESSIBLE_TYPES:
+            return False
+        # A streamed body is compressed whatever its first chunk's size
+        if message.get("more_body", False):
+            return True
+        return len(message.get("body", b"")) >= self.min_size
+
+    def _encode(self, message: Message) -> Message:
+        more_body = message.get("more_body", False)
+        body = self.encoder.compress(message.get("body", b""))
+        body += self.encoder.flush() if more_body else self.encoder.finish()
+        return {**message, "body": body}
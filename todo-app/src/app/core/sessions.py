@@ -0,0 +1,310 @@
+"""Session stores behind ``app.core.deps``.
+
+``SESSION_BACKEND=memory`` (default) keeps sessions in this process;
+``SESSION_BACKEND=sqlite`` keeps them in a small SQLite file that every
+uvicorn worker on the host can share; ``SESSION_BACKEND=signed`` stores
+nothing and verifies HMAC-signed cookies instead.
+"""
+
+import base64
+import hashlib
+import heapq
+import hmac
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import uuid4
+
+from app.core.config import Settings
+
+SESSION_BACKENDS = ("memory", "sqlite", "signed")
+
+
+def _session(user_id: str, expires: float) -> dict:
+    return {
+        "user_id": user_id,
+        "expires": datetime.fromtimestamp(expires, timezone.utc),
+    }
+
+
+class SessionStore(ABC):
+    """Maps opaque session ids to ``{"user_id", "expires"}`` until they expire."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    @abstractmethod
+    def create(self, user_id: str) -> str:
+        """Start a session for ``user_id`` and return its id."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[dict]:
+        """Return the session, or None if it is unknown or expired."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget a session (no error if it does not exist)."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every session."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored sessions, including expired ones not yet evicted."""
+
+
+class _ExpiringMap:
+    """Dict whose entries vanish at their expiry time, with a size cap.
+
+    Every call first pops the entries that have expired off a min-heap keyed
+    by expiry time, so memory does not depend on keys being looked up again.
+    When ``max_size`` is reached the entry closest to expiry is dropped.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: dict[str, tuple[object, float]] = {}
+        self._expiry: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            self._pop()
+
+    def _pop(self) -> None:
+        expires, key = heapq.heappop(self._expiry)
+        entry = self._entries.get(key)
+        # Skip heap entries left behind by pop()
+        if entry is not None and entry[1] == expires:
+            del self._entries[key]
+
+    def set(self, key: str, value: object, expires: float) -> None:
+        with self._lock:
+            self._evict(time.time())
+            while len(self._entries) >= self.max_size:
+                self._pop()
+            self._entries[key] = (value, expires)
+            heapq.heappush(self._expiry, (expires, key))
+
+    def get(self, key: str) -> Optional[tuple[object, float]]:
+        """Return ``(value, expires)`` for a live key."""
+        with self._lock:
+            self._evict(time.time())
+            return self._entries.get(key)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            # Drop stale heap entries once they outnumber live entries
+            if len(self._expiry) > 2 * len(self._entries) + 64:
+                self._expiry = [
+                    item
+                    for item in self._expiry
+                    if self._entries.get(item[1], (None, None))[1] == item[0]
+                ]
+                heapq.heapify(self._expiry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.time())
+            return len(self._entries)
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store with heap-ordered expiry and a size cap.
+
+    Expired sessions are evicted on every call, so memory no longer depends
+    on clients coming back; at ``max_sessions`` the session closest to
+    expiry is dropped.
+    """
+
+    def __init__(self, ttl: int, max_sessions: int):
+        super().__init__(ttl)
+        self._sessions = _ExpiringMap(max_sessions)
+
+    def create(self, user_id: str) -> str:
+        session_id = str(uuid4())
+        self._sessions.set(session_id, user_id, time.time() + self.ttl)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[dict]:
+        entry = self._sessions.get(session_id)
+        return _session(*entry) if entry else None
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+    def clear(self) -> None:
+        self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SignedSessionStore(SessionStore):
+    """Stateless sessions: the cookie itself carries the user id and expiry.
+
+    Tokens are ``<user_id>.<expires>.<token_id>.<signature>`` with an
+    HMAC-SHA256 signature, so any worker holding ``SESSION_SECRET`` verifies
+    them without a storage lookup. Logout adds the token id to an in-process
+    revocation set until the token would have expired anyway; with several
+    workers a revocation is only seen by the worker that handled the logout
+    (the cookie itself is cleared either way).
+
+    The set never drops a live revocation to make room: once it holds
+    ``max_revoked`` tokens, every token issued up to that second is rejected
+    instead (those users sign in again) and the set starts over empty.
+    """
+
+    def __init__(self, secret: str, ttl: int, max_revoked: int):
+        super().__init__(ttl)
+        if not secret:
+            raise ValueError("SESSION_SECRET is required for SESSION_BACKEND=signed")
+        self._key = secret.encode()
+        self._revoked = _ExpiringMap(max_revoked)
+        # Tokens issued at or before this time are rejected (set when full)
+        self._issued_cutoff = float("-inf")
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._key, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def _verify(self, token: str) -> Optional[tuple[str, int, str]]:
+        payload, _, signature = token.rpartition(".")
+        if not payload or not hmac.compare_digest(
+            signature.encode(), self._sign(payload).encode()
+        ):
+            return None
+        user_id, expires, token_id = payload.split(".")
+        return user_id, int(expires), token_id
+
+    def create(self, user_id: str) -> str:
+        expires = int(time.time()) + self.ttl
+        payload = f"{user_id}.{expires}.{secrets.token_urlsafe(12)}"
+        return f"{payload}.{self._sign(payload)}"
+
+    def get(self, session_id: str) -> Optional[dict]:
+        claims = self._verify(session_id)
+        if claims is None:
+            return None
+        user_id, expires, token_id = claims
+        if (
+            expires <= time.time()
+            or expires - self.ttl <= self._issued_cutoff
+            or self._revoked.get(token_id)
+        ):
+            return None
+        return _session(user_id, expires)
+
+    def delete(self, session_id: str) -> None:
+        claims = self._verify(session_id)
+        if claims is not None and claims[1] > time.time():
+            _, expires, token_id = claims
+            if len(self._revoked) >= self._revoked.max_size:
+                # Full: reject all tokens issued so far rather than forget one
+                self._issued_cutoff = int(time.time())
+                self._revoked.clear()
+            self._revoked.set(token_id, True, expires)
+
+    def clear(self) -> None:
+        self._revoked.clear()
+        self._issued_cutoff = float("-inf")
+
+    def __len__(self) -> int:
+        """Number of revoked tokens still tracked (sessions are not stored)."""
+        return len(self._revoked)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store shared by all processes that open the same SQLite file.
+
+    Lookups are a primary key read; expired rows are deleted through the
+    expiry index at most once per ``purge_interval`` seconds.
+
+    The calls are synchronous, on the event loop, so the ``deps`` helpers
+    stay plain functions. That is acceptable because in WAL mode reads never
+    wait for writers, and every write is a single-row autocommit statement
+    that holds the lock for microseconds. ``busy_timeout`` (seconds) caps
+    how long a write may wait for another worker's, so lock contention
+    fails one request with "database is locked" (a 503, see
+    ``app.core.deps``) rather than stalling the whole worker.
+    """
+
+    def __init__(
+        self, path: str, ttl: int, purge_interval: int = 60, busy_timeout: float = 0.1
+    ):
+        super().__init__(ttl)
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=busy_timeout
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires)"
+        )
+
+    def _purge(self, now: float) -> None:
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self._conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+
+    def create(self, user_id: str) -> str:
+        session_id = str(uuid4())
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._conn.execute(
+                "INSERT INTO sessions (id, user_id, expires) VALUES (?, ?, ?)",
+                (session_id, user_id, now + self.ttl),
+            )
+        return session_id
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_id, expires FROM sessions WHERE id = ? AND expires > ?",
+                (session_id, time.time()),
+            ).fetchone()
+        return _session(*row) if row else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM sessions").fetchone()[0]
+
+
+def create_session_store(config: Settings) -> SessionStore:
+    """Build the session store selected by ``SESSION_BACKEND``."""
+    if config.session_backend == "memory":
+        return MemorySessionStore(config.session_ttl, config.session_max_entries)
+    if config.session_backend == "sqlite":
+        return SQLiteSessionStore(config.session_db_path, config.session_ttl)
+    if config.session_backend == "signed":
+        return SignedSessionStore(
+            config.session_secret, config.session_ttl, config.session_max_entries
+        )
+    raise ValueError(f"Unknown SESSION_BACKEND: {config.session_backend}")
@@ -0,0 +1,196 @@
+"""Slow-statement log with SQLite query plans, and a report over it.
+
+With ``SLOW_QUERY_MS`` above zero, every statement that takes at least
+that long is appended to ``SLOW_QUERY_LOG`` as one JSON line (and logged
+as a warning) with:
+
+- its SQL and bound parameters, redacted to their types and sizes
+- the ``EXPLAIN QUERY PLAN`` rows SQLite reports for it
+
+``todo-app slow-queries`` groups the log by statement shape, worst total
+time first, and flags plans that scan a whole table or sort in a
+temporary B-tree, with the index that would avoid it.
+"""
+
+import json
+import logging
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.core.statements import add_statement_listener, remove_statement_listener
+from app.core.timing import statement_shape
+from app.utils import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Queries and writes; DDL, PRAGMAs and transaction control are not logged
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+@dataclass
+class SlowQueryLog:
+    """The active threshold and log file."""
+
+    threshold: float
+    path: Path
+
+
+_log: SlowQueryLog | None = None
+
+
+def redact(value: object) -> object:
+    """Keep a parameter's shape, not its contents."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str):
+        return f"<str {len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _redact_parameters(parameters, executemany: bool) -> object:
+    if executemany:
+        # One row stands for all of them
+        parameters = parameters[0] if parameters else ()
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+    return [redact(value) for value in parameters or ()]
+
+
+def explain(dbapi_connection, statement: str, parameters) -> list[str]:
+    """``EXPLAIN QUERY PLAN`` details, on a cursor of its own."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as exc:  # the plan is a nice-to-have, never an error
+        return [f"(no plan: {exc})"]
+    finally:
+        cursor.close()
+
+
+def _record_statement(conn, statement, parameters, context, executemany, seconds):
+    log = _log
+    if log is None or seconds * 1000 < log.threshold:
+        return
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return
+    plan = []
+    if conn.dialect.name == "sqlite":
+        plan_parameters = parameters[0] if executemany and parameters else parameters
+        plan = explain(conn.connection.dbapi_connection, statement, plan_parameters)
+    entry = {
+        "at": utc_now().isoformat(),
+        "ms": round(seconds * 1000, 3),
+        "statement": statement,
+        "parameters": _redact_parameters(parameters, executemany),
+        "plan": plan,
+    }
+    line = json.dumps(entry)
+    logger.warning(line)
+    with log.path.open("a", encoding="utf-8") as file:
+        file.write(line + "\n")
+
+
+def enable_slow_query_log(threshold_ms: float, path: str | Path) -> None:
+    """Log statements slower than ``threshold_ms`` to ``path``, on every engine."""
+    global _log
+    add_statement_listener(_record_statement)
+    _log = SlowQueryLog(threshold_ms, Path(path))
+
+
+def disable_slow_query_log() -> None:
+    global _log
+    remove_statement_listener(_record_statement)
+    _log = None
+
+
+# Report
+
+_SCAN = re.compile(r"^SCAN (?P<table>\w+)(?P<rest>.*)$")
+_TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+_COMPARED = r"\b{table}\.(\w+)\s*(?:=|<|>|<=|>=|IN\b|IS\b|BETWEEN\b)"
+_ORDER_BY = re.compile(r"\bORDER BY\s+(.+?)(?:\s+LIMIT\b|\s+OFFSET\b|$)", re.S)
+
+
+@dataclass
+class StatementStats:
+    """Slow runs of one statement shape."""
+
+    shape: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    plans: set[str] = field(default_factory=set)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count
+
+
+def read_log(path: str | Path) -> list[dict]:
+    with Path(path).open(encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def summarize(entries: Iterable[dict]) -> list[StatementStats]:
+    """Group slow statements by shape, worst total time first."""
+    stats: dict[str, StatementStats] = {}
+    for entry in entries:
+        shape = statement_shape(entry["statement"])
+        item = stats.setdefault(shape, StatementStats(shape))
+        item.count += 1
+        item.total_ms += entry["ms"]
+        item.max_ms = max(item.max_ms, entry["ms"])
+        item.plans.update(entry["plan"])
+    return sorted(stats.values(), key=lambda item: item.total_ms, reverse=True)
+
+
+def recommend(shape: str, plans: Iterable[str]) -> list[str]:
+    """Index suggestions for the full scans and temporary sorts in ``plans``."""
+    suggestions = []
+    for detail in sorted(plans):
+        scan = _SCAN.match(detail)
+        if scan is not None and "INDEX" not in scan["rest"]:
+            table = scan["table"]
+            columns = list(
+                dict.fromkeys(re.findall(_COMPARED.format(table=table), shape))
+            )
+            if columns:
+                suggestions.append(
+                    f"CREATE INDEX ix_{table}_{'_'.join(columns)} "
+                    f"ON {table} ({', '.join(columns)});"
+                )
+            elif " LIKE " in shape.upper():
+                suggestions.append(
+                    f"{table}: LIKE with a leading wildcard cannot use an index; "
+                    "use the full-text index (app.search) instead"
+                )
+            else:
+                suggestions.append(f"{table}: full table scan without a usable filter")
+        elif detail.startswith(_TEMP_SORT):
+            order_by = _ORDER_BY.search(shape)
+            if order_by is not None:
+                suggestions.append(
+                    f"Sorted in a temporary B-tree; an index ending in "
+                    f"({order_by[1].strip()}) would return rows in order"
+                )
+    return suggestions
+
+
+def format_report(stats: Sequence[StatementStats], top: int = 10) -> str:
+    if not stats:
+        return "No slow statements logged"
+    lines = []
+    for rank, item in enumerate(stats[:top], 1):
+        lines += [
+            f"{rank}. {item.count} x, total {item.total_ms:.1f} ms, "
+            f"mean {item.mean_ms:.1f} ms, max {item.max_ms:.1f} ms",
+            f"   {item.shape}",
+            *(f"   plan: {detail}" for detail in sorted(item.plans)),
+            *(f"   -> {advice}" for advice in recommend(item.shape, item.plans)),
+        ]
+    return "\n".join(lines)
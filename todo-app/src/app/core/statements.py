@@ -0,0 +1,67 @@
+"""One timing hook per SQL statement, shared by the instrumentation.
+
+Request timing (app.core.timing), ``/metrics`` (app.core.metrics) and the
+slow-query log (app.core.slow_queries) each subscribe a listener that is
+called with every statement's duration. A single pair of cursor events on
+the Engine class (so every engine, sync and async, is covered) measures
+it and keeps the start time on the statement's ExecutionContext, so a
+statement that raises leaves nothing behind on the pooled connection.
+"""
+
+from collections.abc import Callable
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+
+# (connection, statement, parameters, context, executemany, seconds)
+StatementListener = Callable[
+    [Connection, str, Any, ExecutionContext, bool, float], None
+]
+
+_listeners: list[StatementListener] = []
+_START = "app_statement_start"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        setattr(context, _START, perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, _START, None)
+    if start is None:
+        return
+    seconds = perf_counter() - start
+    for listener in tuple(_listeners):
+        listener(conn, statement, parameters, context, executemany, seconds)
+
+
+_HOOKS = (
+    ("before_cursor_execute", _before_cursor_execute),
+    ("after_cursor_execute", _after_cursor_execute),
+)
+
+
+def add_statement_listener(listener: StatementListener) -> None:
+    """Call ``listener`` after every statement that completes."""
+    if listener in _listeners:
+        return
+    if not _listeners:
+        for name, hook in _HOOKS:
+            event.listen(Engine, name, hook)
+    _listeners.append(listener)
+
+
+def remove_statement_listener(listener: StatementListener) -> None:
+    if listener not in _listeners:
+        return
+    _listeners.remove(listener)
+    if not _listeners:
+        for name, hook in _HOOKS:
+            event.remove(Engine, name, hook)
+
+
+def has_statement_listener(listener: StatementListener) -> bool:
+    return listener in _listeners
@@ -0,0 +1,72 @@
+"""Streamed rendering of the pages whose size grows with a list's todos.
+
+The template is rendered once with a placeholder where the todo items go,
+and the HTML before it (header, sidebar, list header) is sent right away.
+The items then follow one fragment at a time, so the HTML of a whole page
+is never held in memory at once.
+
+The page's rows (at most ``TODO_PAGE_SIZE + 1``) are read up front on the
+route's session, before the response is returned: the todos come from the
+same session as the list and its ETag, and no cursor (with its SQLite read
+lock) stays open while a slow client reads the body. In the rollback-journal
+profile such a lock would block every writer until the last byte was sent.
+The body needs no session, so it also works on FastAPI before 0.118, which
+closes ``yield`` dependencies before a streamed body is sent.
+"""
+
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from markupsafe import Markup
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.fragments import render_todo
+from app.core.templates import templates
+from app.read_models import TodoRow
+from app.utils import due_state, request_today
+
+TODOS_SLOT = Markup("<!--todos-->")
+TODOS_MORE_TEMPLATE = "partials/todos_more.html"
+
+
+async def stream_todo_page(
+    name: str,
+    context: dict[str, Any],
+    statement: Select,
+    db: AsyncSession,
+    more_url: Callable[[tuple[str, str]], str],
+) -> StreamingResponse | None:
+    """Stream ``name`` with the todos of ``statement`` in its todos slot.
+
+    ``statement`` is a page query as built by app.access.todo_page_statement
+    (``TODO_PAGE_SIZE + 1`` rows of app.read_models columns); ``more_url`` maps the last streamed
+    todo's ``(position, id)`` cursor to the next page's URL. Returns None when the page has no
+    todos, so the caller can render the empty state the usual way. The rows
+    are read on ``db`` before this returns; see the module docstring.
+    """
+    rows = [TodoRow(*row) for row in (await db.execute(statement)).all()]
+    if not rows:
+        return None
+    html = templates.env.get_template(name).render(
+        context | {"todos": rows[:1], "todos_slot": TODOS_SLOT}
+    )
+    head, _, tail = html.partition(TODOS_SLOT)
+    todos, more = rows[: settings.todo_page_size], len(rows) > settings.todo_page_size
+
+    async def body() -> AsyncIterator[str]:
+        yield head
+        today = request_today()
+        for todo in todos:
+            todo.due_state = due_state(todo, today)
+            yield render_todo(templates.env, todo)
+        if more:
+            last = todos[-1]
+            yield templates.env.get_template(TODOS_MORE_TEMPLATE).render(
+                more_url=more_url((last.position, last.id))
+            )
+        yield tail
+
+    return StreamingResponse(body(), media_type="text/html")
@@ -0,0 +1,102 @@
+"""The application's single Jinja2 environment.
+
+Every router renders through ``templates`` from this module, so globals are
+registered once and each template is compiled once per process. Compiled
+bytecode is also kept on disk (``TEMPLATE_CACHE_DIR``), so a restarted or
+newly forked worker loads it instead of parsing the template sources again.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from jinja2.ext import Extension
+
+from app.core.assets import asset_url
+from app.core.config import Settings, settings
+from app.core.fragments import render_todo
+from app.core.timing import TimedTemplate
+from app.utils import (
+    due_state,
+    format_date,
+    format_date_input,
+    is_due_today,
+    is_overdue,
+)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+class TrimWhitespace(Extension):
+    """Drop line indentation and blank lines from template sources.
+
+    Runs once per template at compile time, so rendering costs nothing
+    extra. Only the template's own markup is touched, never rendered
+    values such as todo notes. Newlines are kept, so inline scripts and
+    multi-line attributes stay valid. None of the templates use ``<pre>``
+    or a plain ``<textarea>`` with literal content.
+    """
+
+    _INDENT = re.compile(r"^[ \t]+|[ \t]+$", re.MULTILINE)
+    _BLANK_LINES = re.compile(r"\n{2,}")
+
+    def preprocess(self, source: str, name: str | None, filename: str | None = None) -> str:
+        return self._BLANK_LINES.sub("\n", self._INDENT.sub("", source))
+
+
+def create_environment(config: Settings = settings) -> Environment:
+    """Build the Jinja2 environment with the persistent bytecode cache."""
+    trim = config.template_trim_whitespace
+    # An empty directory means Jinja2's per-user temp directory; trimmed
+    # templates compile differently, so they get their own cache files
+    cache = FileSystemBytecodeCache(
+        config.template_cache_dir or None,
+        "__jinja2_trim_%s.cache" if trim else "__jinja2_%s.cache",
+    )
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(),
+        bytecode_cache=cache,
+        extensions=[TrimWhitespace] if trim else [],
+    )
+    env.template_class = TimedTemplate
+    env.globals["is_overdue"] = is_overdue
+    env.globals["is_due_today"] = is_due_today
+    env.globals["due_state"] = due_state
+    env.globals["format_date"] = format_date
+    env.globals["format_date_input"] = format_date_input
+    env.globals["render_todo"] = render_todo
+    env.globals["asset_url"] = asset_url
+    return env
+
+
+def precompile_templates(env: Environment) -> list[str]:
+    """Load every template into the environment's cache and return the names.
+
+    Called from the app's lifespan, so the first request for each partial
+    does not pay for compiling it.
+    """
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def templates_fingerprint(directory: Path = TEMPLATES_DIR) -> str:
+    """Short hash of every template's name, size and mtime.
+
+    Part of the ETags in app.core.conditional, so a deploy that changes the
+    markup does not leave browsers revalidating into the old HTML. Taken once
+    at import; restart the server after editing templates.
+    """
+    digest = hashlib.sha1(usedforsecurity=False)
+    for path in sorted(directory.rglob("*.html")):
+        name, stat = path.relative_to(directory), path.stat()
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+templates = Jinja2Templates(env=create_environment())
+TEMPLATES_FINGERPRINT = templates_fingerprint()
@@ -0,0 +1,187 @@
+"""Per-request timing for the ``Server-Timing`` header and the timing log.
+
+While enabled (``SERVER_TIMING``, or at runtime with ``set_server_timing``
+or ``kill -USR2 <worker pid>``), ServerTimingMiddleware starts a
+``RequestTiming`` for each request, and the hooks below add to it:
+
+- ``db``: SQL statements and their time, from engine cursor events
+- ``render``: Jinja2 template rendering (``TimedTemplate``)
+- ``auth``: session lookup in the authentication dependencies
+- ``total``: time until the response headers were sent
+
+Statements are also counted by shape (the SQL text with its bound values
+left out); a shape that runs ``N_PLUS_ONE_THRESHOLD`` times in one request
+is logged as a likely N+1 query. Tests assert the same with the
+``assert_max_queries`` fixture.
+
+When disabled, no statement listener (app.core.statements) is subscribed
+and every other hook is a single ContextVar lookup.
+"""
+
+import json
+import logging
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, ContextManager
+
+from jinja2 import Template
+from app.core.config import settings
+from app.core.statements import add_statement_listener, remove_statement_listener
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar["RequestTiming | None"] = ContextVar(
+    "request_timing", default=None
+)
+_enabled = False
+
+
+@dataclass
+class RequestTiming:
+    """Time spent per metric during one request, in seconds."""
+
+    start: float = field(default_factory=perf_counter)
+    durations: dict[str, float] = field(default_factory=dict)
+    db_queries: int = 0
+    # Statements run, by statement_shape
+    statements: Counter[str] = field(default_factory=Counter)
+    # Metrics being measured right now; nested spans of one metric (a
+    # template rendering another) are only counted once
+    _active: set[str] = field(default_factory=set)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+            self._active.discard(name)
+
+    def elapsed(self) -> float:
+        return perf_counter() - self.start
+
+    def header(self) -> str:
+        """``Server-Timing`` value for the time measured so far."""
+        db_ms = self.durations.get("db", 0.0) * 1000
+        metrics = [f'db;dur={db_ms:.1f};desc="{self.db_queries} queries"']
+        metrics += [
+            f"{name};dur={seconds * 1000:.1f}"
+            for name, seconds in self.durations.items()
+            if name != "db"
+        ]
+        metrics.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def summary(self) -> dict[str, Any]:
+        """Fields of the timing log line (milliseconds)."""
+        return {
+            "db_queries": self.db_queries,
+            **{
+                f"{name}_ms": round(seconds * 1000, 2)
+                for name, seconds in self.durations.items()
+            },
+            "total_ms": round(self.elapsed() * 1000, 2),
+        }
+
+
+# Expanded IN lists: "IN (?, ?, ?)" and "IN (?)" are one shape
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """``statement`` without what varies between runs of the same query."""
+    return _SPACE.sub(" ", _IN_LIST.sub("(?)", statement)).strip()
+
+
+def repeated_statements(statements: Iterable[str], threshold: int) -> dict[str, int]:
+    """Shapes run at least ``threshold`` times, with their counts."""
+    counts = Counter(statement_shape(statement) for statement in statements)
+    return {shape: count for shape, count in counts.items() if count >= threshold}
+
+
+def current_timing() -> RequestTiming | None:
+    return _current.get()
+
+
+def start_request() -> tuple[RequestTiming, Token]:
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def span(name: str) -> ContextManager[None]:
+    """Measure the enclosed block as ``name`` if the request is being timed."""
+    timing = _current.get()
+    return timing.span(name) if timing is not None else nullcontext()
+
+
+def log_request(method: str, path: str, status: int, timing: RequestTiming) -> None:
+    """Write one JSON line per request to the ``app.core.timing`` logger."""
+    fields = {"method": method, "path": path, "status": status}
+    logger.info(json.dumps(fields | timing.summary()))
+    threshold = settings.n_plus_one_threshold
+    if threshold <= 0:
+        return
+    for shape, count in timing.statements.items():
+        if count >= threshold:
+            logger.warning(json.dumps(fields | {"n_plus_one": shape, "count": count}))
+
+
+class TimedTemplate(Template):
+    """Template that adds its rendering time to the request's ``render``."""
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        timing = _current.get()
+        if timing is None:
+            return super().render(*args, **kwargs)
+        with timing.span("render"):
+            return super().render(*args, **kwargs)
+
+
+def _record_statement(conn, statement, parameters, context, executemany, seconds):
+    timing = _current.get()
+    if timing is not None:
+        timing.add("db", seconds)
+        timing.db_queries += 1
+        timing.statements[statement_shape(statement)] += 1
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_server_timing(enabled: bool) -> None:
+    """Turn request timing on or off in this process."""
+    global _enabled
+    if enabled == _enabled:
+        return
+    if enabled:
+        add_statement_listener(_record_statement)
+    else:
+        remove_statement_listener(_record_statement)
+    if enabled and not logger.hasHandlers():
+        # Uvicorn only configures its own loggers
+        logger.addHandler(logging.StreamHandler())
+        logger.setLevel(logging.INFO)
+    _enabled = enabled
+
+
+def toggle_server_timing() -> None:
+    set_server_timing(not _enabled)
@@ -1,38 +1,194 @@
 """SQLite database configuration and models."""
 
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from typing import Optional
-from uuid import uuid4
+from uuid import UUID
 
 from sqlalchemy import (
     Boolean,
+    DDL,
     Column,
     DateTime,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    TypeDecorator,
     create_engine,
+    event,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
-DATABASE_URL = "sqlite:///./todo.db"
+from app.core.config import Settings, settings
+from app.ids import uuid7
+from app.ordering import integer_key
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=NullPool,
-)
+DATABASE_URL = settings.database_url
+
+DB_PROFILES = ("development", "production")
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORE_MODES = ("DEFAULT", "FILE", "MEMORY")
+
+
+def sqlite_pragmas(config: Settings) -> list[str]:
+    """Build the connect-time PRAGMAs for the production profile."""
+    synchronous = config.sqlite_synchronous.upper()
+    if synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {config.sqlite_synchronous}")
+    temp_store = config.sqlite_temp_store.upper()
+    if temp_store not in TEMP_STORE_MODES:
+        raise ValueError(f"Invalid SQLITE_TEMP_STORE: {config.sqlite_temp_store}")
+
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(config.sqlite_cache_size)}",
+        f"PRAGMA temp_store={temp_store}",
+        f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout)}",
+    ]
+
+
+def _install_pragmas(sync_engine: Engine, config: Settings) -> None:
+    """Apply the production PRAGMAs to every new DBAPI connection."""
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def _check_profile(config: Settings) -> None:
+    if config.db_profile not in DB_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE: {config.db_profile}")
+
+
+def create_db_engine(url: str | None = None, config: Settings = settings) -> Engine:
+    """Create the SQLAlchemy engine for the configured profile."""
+    url = url or config.database_url
+    _check_profile(config)
+
+    if config.db_profile == "development":
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=NullPool,
+        )
+
+    prod_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+    )
+    _install_pragmas(prod_engine, config)
+    return prod_engine
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync SQLite URL onto the aiosqlite driver."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url.removeprefix("sqlite:")
+    return url
+
+
+def create_async_db_engine(
+    url: str | None = None, config: Settings = settings
+) -> AsyncEngine:
+    """Create the async engine for the configured profile."""
+    url = async_database_url(url or config.database_url)
+    _check_profile(config)
+
+    if config.db_profile == "development":
+        return create_async_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=NullPool,
+        )
+
+    prod_engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+    )
+    _install_pragmas(prod_engine.sync_engine, config)
+    return prod_engine
+
+
+engine = create_db_engine(DATABASE_URL)
+async_engine = create_async_db_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: templates read attributes after commit, and an
+# expired attribute cannot be lazily refreshed outside an awaitable context
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
 
+class OrderKey(TypeDecorator):
+    """Fractional ordering key (see app.ordering), compared as plain text.
+
+    Integers are accepted and stored as the evenly spaced key for that slot,
+    so ``position=2`` still means "third".
+    """
+
+    impl = String(64)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return integer_key(value)
+        return value
+
+
+class UUIDKey(TypeDecorator):
+    """UUID stored as a 16-byte BLOB and exposed as its canonical string.
+
+    Strings that are not UUIDs bind as an empty BLOB, which matches no row,
+    so looking up a malformed id simply finds nothing.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, UUID):
+            return value.bytes
+        if isinstance(value, str):
+            try:
+                return UUID(value).bytes
+            except ValueError:
+                return b""
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(UUID(bytes=value))
+
+
 def generate_uuid() -> str:
-    return str(uuid4())
+    return str(uuid7())
 
 
 def utc_now() -> datetime:
@@ -42,10 +198,15 @@ def utc_now() -> datetime:
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(UUIDKey, primary_key=True, default=generate_uuid)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password = Column(String(255), nullable=False)  # Plain text - educational only!
+    # IANA time zone name for due-date styling; None means UTC
+    timezone = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=utc_now)
+    # Bumped by a trigger whenever one of the user's lists changes, so the
+    # sidebar's ETag is one primary key read (see LIST_VERSION_DDL)
+    lists_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     todo_lists = relationship(
         "TodoList", back_populates="user", cascade="all, delete-orphan"
@@ -55,12 +216,19 @@ class User(Base):
 class TodoList(Base):
     __tablename__ = "todo_lists"
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(UUIDKey, primary_key=True, default=generate_uuid)
+    user_id = Column(UUIDKey, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     color = Column(String(7), default="#3b82f6")  # Hex color
-    position = Column(Integer, default=0)
+    position = Column(OrderKey, default=integer_key(0))
+    # Denormalized counters, maintained by the todo write paths in the same
+    # transaction (see app.migrations.rebuild_list_counts for repair)
+    open_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by a trigger on every write to the list's todos (see
+    # LIST_VERSION_DDL); part of the list's ETag
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
@@ -73,26 +241,96 @@ class TodoList(Base):
 class Todo(Base):
     __tablename__ = "todos"
 
-    id = Column(String(36), primary_key=True, default=generate_uuid)
-    list_id = Column(String(36), ForeignKey("todo_lists.id", ondelete="CASCADE"), nullable=False)
+    id = Column(UUIDKey, primary_key=True, default=generate_uuid)
+    list_id = Column(UUIDKey, ForeignKey("todo_lists.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(200), nullable=False)
     note = Column(Text, nullable=True)
     is_completed = Column(Boolean, default=False)
     completed_at = Column(DateTime, nullable=True)
     due_date = Column(DateTime, nullable=True)
     priority = Column(String(10))  # low, medium, high
-    position = Column(Integer, default=0)
+    position = Column(OrderKey, default=integer_key(0))
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
     todo_list = relationship("TodoList", back_populates="todos")
 
-    __table_args__ = (Index("ix_todos_list_position", "list_id", "position"),)
+    # id breaks ties between equal positions for keyset pagination (app.access)
+    __table_args__ = (
+        Index("ix_todos_list_position_id", "list_id", "position", "id"),
+    )
+
+
+# Full-text index over todo titles and notes, queried by app.search. It is an
+# external-content FTS5 table keyed by the todos rowid, so the text is not
+# stored twice. Triggers keep it in sync with every write path (ORM, bulk
+# UPDATE, cascading deletes); app.migrations adds it to older files.
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5("
+    "title, note, content='todos', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, title, note) "
+    "VALUES (new.rowid, new.title, new.note); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, note) "
+    "VALUES ('delete', old.rowid, old.title, old.note); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF title, note ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, note) "
+    "VALUES ('delete', old.rowid, old.title, old.note); "
+    "INSERT INTO todos_fts(rowid, title, note) "
+    "VALUES (new.rowid, new.title, new.note); END",
+)
+
+for _statement in SEARCH_INDEX_DDL:
+    event.listen(Todo.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Todo.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS todos_fts").execute_if(dialect="sqlite"),
+)
+
+
+# Change counters behind the conditional GETs in app.core.conditional. Any
+# write to a todo bumps its list's version; any change to a list that the
+# sidebar shows bumps its owner's lists_version. Being triggers, they also
+# cover bulk statements and cascades; app.migrations adds them to older files.
+TODO_VERSION_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS todos_version_ai AFTER INSERT ON todos BEGIN "
+    "UPDATE todo_lists SET version = version + 1 WHERE id = new.list_id; END",
+    "CREATE TRIGGER IF NOT EXISTS todos_version_ad AFTER DELETE ON todos BEGIN "
+    "UPDATE todo_lists SET version = version + 1 WHERE id = old.list_id; END",
+    "CREATE TRIGGER IF NOT EXISTS todos_version_au AFTER UPDATE ON todos BEGIN "
+    "UPDATE todo_lists SET version = version + 1 "
+    "WHERE id IN (old.list_id, new.list_id); END",
+)
+USER_VERSION_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS todo_lists_version_ai AFTER INSERT ON todo_lists BEGIN "
+    "UPDATE users SET lists_version = lists_version + 1 WHERE id = new.user_id; END",
+    "CREATE TRIGGER IF NOT EXISTS todo_lists_version_ad AFTER DELETE ON todo_lists BEGIN "
+    "UPDATE users SET lists_version = lists_version + 1 WHERE id = old.user_id; END",
+    "CREATE TRIGGER IF NOT EXISTS todo_lists_version_au "
+    "AFTER UPDATE OF name, description, color, position, open_count ON todo_lists BEGIN "
+    "UPDATE users SET lists_version = lists_version + 1 "
+    "WHERE id IN (old.user_id, new.user_id); END",
+)
+
+LIST_VERSION_DDL = TODO_VERSION_DDL + USER_VERSION_DDL
+
+for _table, _statements in (
+    (Todo.__table__, TODO_VERSION_DDL),
+    (TodoList.__table__, USER_VERSION_DDL),
+):
+    for _statement in _statements:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
 
 
 def init_db() -> None:
-    """Create all database tables."""
+    """Create all database tables and upgrade older database files."""
+    from app.migrations import upgrade_schema  # migrations import the models
+
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
 
 
 def get_db():
@@ -102,3 +340,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
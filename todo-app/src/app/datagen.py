@@ -0,0 +1,198 @@
+"""Synthetic users, lists and todos for load and scale testing.
+
+``generate`` writes ``users`` x ``lists`` x ``todos`` rows with executemany
+INSERTs, ``batch_size`` todos per transaction, so the row triggers (search
+index, version counters) run inside a few large transactions instead of
+one per object. The list counters are written directly rather than rebuilt.
+
+The same seed and ``as_of`` date always produce the same rows, ids
+included. Values follow rough shapes of real use:
+
+- todos are created over each user's lifetime, ids in creation order
+- older todos are more likely to be completed
+- about 40% have a due date, mostly within a few days of creation
+- priorities lean towards the form's default, ``low``
+- most todos have no note; note lengths have a long tail
+"""
+
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import Engine, insert
+
+from app.database import Todo, TodoList, User
+from app.ordering import integer_key
+
+LIST_NAMES = (
+    "Work", "Personal", "Groceries", "Home", "Errands", "Reading", "Travel",
+    "Fitness", "Side project", "Finance", "Garden", "Gifts", "Car", "School",
+)
+COLORS = ("#3b82f6", "#ef4444", "#10b981", "#f59e0b", "#8b5cf6", "#ec4899", "#6b7280")
+VERBS = (
+    "Review", "Update", "Call", "Buy", "Email", "Fix", "Plan", "Book", "Schedule",
+    "Write", "Clean", "Pay", "Read", "Prepare", "Order", "Renew", "Draft", "Check",
+)
+OBJECTS = (
+    "project plan", "documentation", "weekly report", "groceries", "dentist",
+    "invoice", "insurance", "flight tickets", "birthday present", "kitchen",
+    "quarterly budget", "team meeting", "library books", "passport", "blog post",
+    "car service", "rent", "presentation slides", "tax return", "backup drive",
+)
+QUALIFIERS = ("for Monday", "before Friday", "with Alex", "again", "this week", "at home")
+WORDS = (
+    "the", "and", "to", "check", "new", "before", "after", "with", "notes", "call",
+    "about", "next", "week", "details", "send", "list", "remember", "price",
+    "meeting", "document", "follow", "up", "ask", "store", "online", "version",
+)
+# Weights follow the form default: most todos keep "low"
+PRIORITIES = (("low", 55), ("medium", 30), ("high", 15))
+NOTE_MAX_CHARS = 2000
+
+
+@dataclass
+class GeneratedCounts:
+    users: int = 0
+    lists: int = 0
+    todos: int = 0
+
+
+def seeded_uuid(rng: random.Random, at: datetime) -> str:
+    """A UUIDv7 for time ``at`` whose random bits come from ``rng``."""
+    ms = int(at.timestamp() * 1000)
+    counter, rand_b = rng.getrandbits(12), rng.getrandbits(62)
+    bits = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(UUID(int=bits))
+
+
+def _title(rng: random.Random) -> str:
+    title = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if rng.random() < 0.3:
+        title += f" {rng.choice(QUALIFIERS)}"
+    return title
+
+
+def _note(rng: random.Random) -> str | None:
+    if rng.random() < 0.65:
+        return None
+    # Log-normal word count: median around ten words, a few pages at most
+    count = 1 + int(rng.lognormvariate(2.2, 1.0))
+    text = " ".join(rng.choice(WORDS) for _ in range(count)).capitalize() + "."
+    return text[:NOTE_MAX_CHARS]
+
+
+def _todo(
+    rng: random.Random, list_id: str, index: int, created: datetime, as_of: datetime
+) -> dict:
+    age_days = (as_of - created).total_seconds() / 86400
+    completed_at = None
+    if rng.random() < min(0.9, 0.1 + age_days / 120):
+        done = created + timedelta(days=rng.expovariate(1 / 3))
+        completed_at = min(done, as_of)
+    due_date = None
+    if rng.random() < 0.4:
+        due_day = (created + timedelta(days=rng.lognormvariate(1.5, 1.0))).date()
+        due_date = datetime.combine(due_day, time(), timezone.utc)
+    return {
+        "id": seeded_uuid(rng, created),
+        "list_id": list_id,
+        "title": _title(rng),
+        "note": _note(rng),
+        "is_completed": completed_at is not None,
+        "completed_at": completed_at,
+        "due_date": due_date,
+        "priority": rng.choices(
+            [name for name, _ in PRIORITIES], [weight for _, weight in PRIORITIES]
+        )[0],
+        "position": integer_key(index),
+        "created_at": created,
+        "updated_at": completed_at or created,
+    }
+
+
+def generate_rows(
+    users: int, lists: int, todos: int, seed: int, as_of: datetime
+) -> Iterator[tuple[dict, list[dict], list[dict]]]:
+    """Yield each user's row with its list rows and todo rows."""
+    rng = random.Random(seed)
+    for user_index in range(users):
+        joined = as_of - timedelta(days=rng.uniform(1, 730))
+        user_id = seeded_uuid(rng, joined)
+        user = {
+            "id": user_id,
+            "email": f"user{user_index}-{seed}@example.com",
+            "password": "password",
+            "created_at": joined,
+        }
+        list_rows, todo_rows = [], []
+        for list_index in range(lists):
+            name = LIST_NAMES[list_index % len(LIST_NAMES)]
+            if list_index >= len(LIST_NAMES):
+                name += f" {list_index // len(LIST_NAMES) + 1}"
+            list_id = seeded_uuid(rng, joined + timedelta(seconds=list_index))
+            # Creation times in order, so ids are in order as they are for real
+            created = sorted(
+                joined + (as_of - joined) * rng.random() for _ in range(todos)
+            )
+            rows = [
+                _todo(rng, list_id, index, at, as_of)
+                for index, at in enumerate(created)
+            ]
+            open_count = sum(not row["is_completed"] for row in rows)
+            list_rows.append(
+                {
+                    "id": list_id,
+                    "user_id": user_id,
+                    "name": name,
+                    "description": "Generated list" if rng.random() < 0.3 else None,
+                    "color": rng.choice(COLORS),
+                    "position": integer_key(list_index),
+                    "open_count": open_count,
+                    "total_count": len(rows),
+                    "created_at": joined,
+                    "updated_at": joined,
+                }
+            )
+            todo_rows += rows
+        yield user, list_rows, todo_rows
+
+
+def generate(
+    engine: Engine,
+    users: int,
+    lists: int,
+    todos: int,
+    seed: int = 0,
+    as_of: datetime | None = None,
+    batch_size: int = 50_000,
+) -> GeneratedCounts:
+    """Insert ``users`` x ``lists`` x ``todos`` rows; see the module docstring.
+
+    ``as_of`` (default: today, midnight UTC) anchors every date; pass the
+    same one to reproduce a run on another day.
+    """
+    if as_of is None:
+        as_of = datetime.combine(datetime.now(timezone.utc).date(), time(), timezone.utc)
+    counts = GeneratedCounts()
+    batch: tuple[list, list, list] = ([], [], [])
+
+    def flush() -> None:
+        with engine.begin() as conn:
+            for model, rows in zip((User, TodoList, Todo), batch):
+                if rows:
+                    conn.execute(insert(model), rows)
+                    rows.clear()
+
+    for user, list_rows, todo_rows in generate_rows(users, lists, todos, seed, as_of):
+        batch[0].append(user)
+        batch[1].extend(list_rows)
+        batch[2].extend(todo_rows)
+        counts.users += 1
+        counts.lists += len(list_rows)
+        counts.todos += len(todo_rows)
+        if len(batch[2]) + len(batch[1]) >= batch_size:
+            flush()
+    flush()
+    return counts
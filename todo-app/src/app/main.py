@@ -1,18 +1,30 @@
 """FastAPI Todo Application - Main Entry Point."""
 
+import asyncio
+import signal
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core import metrics
+from app.core.assets import AssetFiles
+from app.core.config import settings
+from app.core.deps import sessions
+from app.core.fragments import todo_fragments
+from app.core.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    RequestTodayMiddleware,
+    ServerTimingMiddleware,
+)
+from app.core.slow_queries import enable_slow_query_log
+from app.core.templates import precompile_templates, templates
+from app.core.timing import set_server_timing, toggle_server_timing
 from app.database import SessionLocal, Todo, TodoList, User, init_db
+from app.migrations import rebuild_list_counts
 from app.routes import api, auth, pages, todo_lists, todos
-from app.utils import format_date, format_date_input, is_due_today, is_overdue
-
-templates = Jinja2Templates(directory="src/app/templates")
 
 
 def seed_demo_data():
@@ -99,19 +111,59 @@ def seed_demo_data():
         ]
         for todo in personal_todos:
             db.add(todo)
+        rebuild_list_counts(db)
         db.commit()
 
     finally:
         db.close()
 
 
+def app_metrics():
+    """Session store and template cache samples for /metrics."""
+    lookups = todo_fragments.hits + todo_fragments.misses
+    hit_ratio = todo_fragments.hits / lookups if lookups else 0
+    return [
+        ("todo_sessions", (), len(sessions)),
+        ("todo_fragment_cache_hits_total", (), todo_fragments.hits),
+        ("todo_fragment_cache_misses_total", (), todo_fragments.misses),
+        ("todo_fragment_cache_hit_ratio", (), hit_ratio),
+        ("todo_fragment_cache_bytes", (), todo_fragments.size),
+        ("todo_template_cache_templates", (), len(templates.env.cache or ())),
+    ]
+
+
+metrics.registry.add_collector(app_metrics)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
     init_db()
     seed_demo_data()
+    precompile_templates(templates.env)
+    set_server_timing(settings.server_timing)
+    if settings.slow_query_ms > 0:
+        enable_slow_query_log(settings.slow_query_ms, settings.slow_query_log)
+    # `kill -USR2 <pid>` toggles Server-Timing in a running worker
+    if hasattr(signal, "SIGUSR2"):
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGUSR2, toggle_server_timing
+            )
+        except (NotImplementedError, RuntimeError, ValueError):
+            # No signals on Windows loops or outside the main thread
+            pass
+    flusher = None
+    if settings.metrics_dir:
+        flusher = asyncio.create_task(
+            metrics.flush_periodically(
+                settings.metrics_dir, settings.metrics_flush_interval
+            )
+        )
     yield
+    if flusher is not None:
+        flusher.cancel()
     # Shutdown (no cleanup needed)
 
 
@@ -122,8 +174,18 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="src/app/static"), name="static")
+app.add_middleware(RequestTodayMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    min_size=settings.compression_min_size,
+    encodings=[name for name in settings.compression_encodings.split(",") if name],
+)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so "total" includes the other middleware
+app.add_middleware(ServerTimingMiddleware)
+
+# Mount static files (hashed names, immutable caching, precompressed copies)
+app.mount("/static", AssetFiles(), name="static")
 
 # Include routers
 app.include_router(api.router)
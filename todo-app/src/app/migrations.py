@@ -0,0 +1,233 @@
+"""Lightweight, idempotent schema upgrades for existing SQLite files.
+
+There is no migration framework in this project: new tables are created by
+``create_all`` and the steps below bring older ``todo.db`` files up to date.
+"""
+
+from uuid import UUID
+
+from sqlalchemy import (
+    Connection,
+    Engine,
+    bindparam,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from app.database import (
+    LIST_VERSION_DDL,
+    SEARCH_INDEX_DDL,
+    Base,
+    Todo,
+    TodoList,
+    UUIDKey,
+)
+from app.ids import uuid7
+from app.ordering import integer_key
+
+
+def add_missing_columns(conn: Connection) -> list[str]:
+    """Add model columns that are missing from existing tables.
+
+    Returns the added columns as ``table.column`` strings.
+    """
+    inspector = inspect(conn)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def rebuild_list_counts(db: Connection | Session, list_id: str | None = None) -> None:
+    """Recompute the denormalized todo counters from the todos table.
+
+    A NULL ``is_completed`` (legacy rows) counts as open, as toggling and
+    deleting treat it.
+    """
+    total = (
+        select(func.count(Todo.id))
+        .where(Todo.list_id == TodoList.id)
+        .scalar_subquery()
+    )
+    open_ = (
+        select(func.count(Todo.id))
+        .where(Todo.list_id == TodoList.id, Todo.is_completed.is_not(True))
+        .scalar_subquery()
+    )
+    stmt = update(TodoList).values(open_count=open_, total_count=total)
+    if list_id is not None:
+        stmt = stmt.where(TodoList.id == list_id)
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def rebalance_positions(
+    conn: Connection, model: type[Todo] | type[TodoList], scope_id: str | None = None
+) -> int:
+    """Rewrite ordering keys as evenly spaced keys, keeping the current order.
+
+    Todos are rebalanced per list and lists per user; ``scope_id`` limits the
+    pass to one list (for todos) or one user (for lists). Equal keys keep
+    their order by id, the tie-break the list pages use. Legacy integer
+    positions sort before any key, so they are converted in order as well.
+    Returns the number of rows rewritten.
+    """
+    scope = model.list_id if model is Todo else model.user_id
+    stmt = select(model.id, scope, model.position).order_by(
+        scope, model.position, model.id
+    )
+    if scope_id is not None:
+        stmt = stmt.where(scope == scope_id)
+
+    changes = []
+    current_scope, index = None, 0
+    for row_id, row_scope, position in conn.execute(stmt):
+        if row_scope != current_scope:
+            current_scope, index = row_scope, 0
+        key = integer_key(index)
+        index += 1
+        if position != key:
+            changes.append({"b_id": row_id, "b_position": key})
+
+    if changes:
+        table = model.__table__
+        conn.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(position=bindparam("b_position")),
+            changes,
+        )
+    return len(changes)
+
+
+def _has_integer_positions(conn: Connection, model: type[Todo] | type[TodoList]) -> bool:
+    return (
+        conn.scalar(
+            select(literal(1))
+            .where(func.typeof(model.position) == "integer")
+            .select_from(model)
+            .limit(1)
+        )
+        is not None
+    )
+
+
+# PRAGMA user_version once text ids have been rewritten as BLOBs
+BLOB_IDS_VERSION = 1
+
+
+def _id_bytes(value: str) -> bytes:
+    try:
+        return UUID(value).bytes
+    except ValueError:
+        # Not a UUID (hand-made rows): such ids never appeared in app URLs
+        return uuid7().bytes
+
+
+def convert_text_ids(conn: Connection) -> int:
+    """Rewrite 36-character text UUID keys from older files as 16-byte BLOBs.
+
+    Every primary and foreign key column is rewritten with the same mapping,
+    so relationships survive, and a UUID keeps its string form - existing
+    URLs such as ``/app/lists/{list_id}`` resolve to the same rows.
+    Returns the number of distinct ids converted.
+    """
+    inspector = inspect(conn)
+    columns = [
+        (table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        if inspector.has_table(table.name)
+        for column in table.columns
+        if isinstance(column.type, UUIDKey)
+    ]
+
+    mapping: dict[str, bytes] = {}
+    for table, column in columns:
+        old_ids = conn.execute(
+            text(
+                f"SELECT DISTINCT {column} FROM {table} "
+                f"WHERE typeof({column}) = 'text'"
+            )
+        ).scalars()
+        for old in old_ids:
+            mapping.setdefault(old, _id_bytes(old))
+
+    if mapping:
+        params = [{"old": old, "new": new} for old, new in mapping.items()]
+        for table, column in columns:
+            conn.execute(
+                text(f"UPDATE {table} SET {column} = :new WHERE {column} = :old"),
+                params,
+            )
+    return len(mapping)
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    """Repopulate the todo full-text index from the todos table.
+
+    Needed after ``VACUUM`` (which may renumber the rowids the index is keyed
+    by) or if the index was created over existing rows.
+    """
+    conn.execute(text("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')"))
+
+
+def add_search_index(conn: Connection) -> bool:
+    """Create the full-text index and its triggers if they are missing.
+
+    Returns True if the index was created (and filled from existing todos).
+    """
+    if inspect(conn).has_table("todos_fts"):
+        return False
+    for statement in SEARCH_INDEX_DDL:
+        conn.execute(text(statement))
+    rebuild_search_index(conn)
+    return True
+
+
+# Indexes superseded by a model index under a new name
+RETIRED_INDEXES = ("ix_todos_list_position",)
+
+
+def update_indexes(conn: Connection) -> None:
+    """Drop retired indexes and create the model indexes a file is missing."""
+    for name in RETIRED_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def add_version_triggers(conn: Connection) -> None:
+    """Create the triggers that maintain the list/sidebar change counters."""
+    for statement in LIST_VERSION_DDL:
+        conn.execute(text(statement))
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Bring an existing database file up to the current models."""
+    with engine.begin() as conn:
+        if conn.scalar(text("PRAGMA user_version")) < BLOB_IDS_VERSION:
+            convert_text_ids(conn)
+            conn.execute(text(f"PRAGMA user_version = {BLOB_IDS_VERSION}"))
+        added = add_missing_columns(conn)
+        if "todo_lists.open_count" in added or "todo_lists.total_count" in added:
+            rebuild_list_counts(conn)
+        for model in (TodoList, Todo):
+            if _has_integer_positions(conn, model):
+                rebalance_positions(conn, model)
+        add_search_index(conn)
+        add_version_triggers(conn)
+        update_indexes(conn)
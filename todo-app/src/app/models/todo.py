@@ -37,7 +37,7 @@ class TodoUpdate(BaseModel):
     is_completed: Optional[bool] = None
     due_date: Optional[date] = None
     priority: Optional[str] = Field(default=None, pattern=r"^(low|medium|high)$")
-    position: Optional[int] = None
+    position: Optional[str] = None  # Fractional ordering key (app.ordering)
 
     @field_validator("title")
     @classmethod
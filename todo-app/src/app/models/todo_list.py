@@ -23,7 +23,7 @@ class TodoListUpdate(BaseModel):
     name: Optional[str] = Field(default=None, max_length=100)
     description: Optional[str] = None
     color: Optional[str] = Field(default=None, pattern=r"^#[0-9a-fA-F]{6}$")
-    position: Optional[int] = None
+    position: Optional[str] = None  # Fractional ordering key (app.ordering)
 
     @field_validator("name")
     @classmethod
@@ -0,0 +1,151 @@
+"""Fractional ordering keys for drag-and-drop positions.
+
+Keys are base-62 strings that sort correctly with plain (binary) string
+comparison, so ``ORDER BY position`` keeps working. A key is an integer part
+whose first character encodes its length (``a0``..``az``, ``b00``.. upward,
+``Z``..``A`` downward) followed by an optional fractional part. There is
+always room for a new key between two existing ones, so moving an item only
+rewrites that item's key.
+
+Based on the public-domain "fractional indexing" algorithm by David Greenspan.
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+SMALLEST_INTEGER = "A" + "0" * 26
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Return a fraction strictly between fractions ``a`` and ``b`` (None = 1)."""
+    if b is not None:
+        # Skip the shared prefix, treating a missing digit in ``a`` as zero
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    """Split a key into its integer and fractional parts, validating it."""
+    if not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid order key: {key!r}")
+    length = _integer_length(key[0])
+    if length > len(key) or any(c not in DIGITS for c in key[1:]):
+        raise ValueError(f"Invalid order key: {key!r}")
+    integer, fraction = key[:length], key[length:]
+    if fraction.endswith("0"):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return integer, fraction
+
+
+def _increment_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) + 1
+        if d < BASE:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = "0"
+
+    # Carried past the first digit: move to the next integer length
+    if head == "Z":
+        return "a0"
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """Return a key that sorts strictly between ``a`` and ``b``.
+
+    ``None`` means "start of list" for ``a`` and "end of list" for ``b``.
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Order keys out of order: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a0"
+        int_b, frac_b = _split(b)
+        if int_b == SMALLEST_INTEGER:
+            return int_b + _midpoint("", frac_b)
+        if int_b < b:
+            return int_b
+        result = _decrement_integer(int_b)
+        if result is None:
+            raise ValueError("Cannot create a key before the smallest key")
+        return result
+
+    int_a, frac_a = _split(a)
+    if b is None:
+        result = _increment_integer(int_a)
+        return int_a + _midpoint(frac_a, None) if result is None else result
+
+    int_b, frac_b = _split(b)
+    if int_a == int_b:
+        return int_a + _midpoint(frac_a, frac_b)
+    result = _increment_integer(int_a)
+    if result is None:
+        raise ValueError("Cannot create a key after the largest key")
+    return result if result < b else int_a + _midpoint(frac_a, None)
+
+
+def integer_key(index: int) -> str:
+    """Return the evenly spaced key for slot ``index`` (0 -> "a0", 62 -> "b10").
+
+    Consecutive indexes give short keys with room in between, which makes
+    this the rebalancing target and the mapping for legacy integer positions.
+    """
+    if index < 0:
+        raise ValueError("index must be >= 0")
+    length = 1
+    while index >= BASE**length:
+        length += 1
+    digits = []
+    for _ in range(length):
+        index, d = divmod(index, BASE)
+        digits.append(DIGITS[d])
+    return chr(ord("a") + length - 1) + "".join(reversed(digits))
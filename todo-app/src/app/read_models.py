@@ -0,0 +1,72 @@
+"""Read-only row objects for the paths that only render todos.
+
+List pages, infinite-scroll pages and search select just the columns the
+templates read and wrap each row in a small ``__slots__`` object. Nothing
+is added to the session's identity map and no change-tracking state is
+created, so these rows are cheaper to build and to keep than ORM
+instances. Write paths keep using the ``Todo`` model.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import Row
+
+from app.database import Todo
+
+# Selected in TodoRow's argument order
+TODO_ROW_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.note,
+    Todo.is_completed,
+    Todo.due_date,
+    Todo.priority,
+    Todo.position,
+    Todo.updated_at,
+)
+
+
+class TodoRow:
+    """One todo as ``partials/todo_item.html`` reads it.
+
+    ``due_state`` is filled in by app.utils.classify_due.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "note",
+        "is_completed",
+        "due_date",
+        "priority",
+        "position",
+        "updated_at",
+        "due_state",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        note: str | None,
+        is_completed: bool | None,
+        due_date: datetime | None,
+        priority: str | None,
+        position: str,
+        updated_at: datetime | None,
+    ):
+        self.id = id
+        self.title = title
+        self.note = note
+        self.is_completed = is_completed
+        self.due_date = due_date
+        self.priority = priority
+        self.position = position
+        self.updated_at = updated_at
+        self.due_state = None
+
+
+def todo_rows(rows: Iterable[Row]) -> list[TodoRow]:
+    """Wrap rows selected with ``TODO_ROW_COLUMNS``."""
+    return [TodoRow(*row) for row in rows]
@@ -1,7 +1,9 @@
 """API utility routes - health checks and system endpoints."""
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
+from app.core import metrics
 from app.utils import utc_now
 
 router = APIRouter(tags=["api"])
@@ -14,3 +16,11 @@ async def health_check():
         "status": "ok",
         "timestamp": utc_now().isoformat(),
     }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Metrics in the Prometheus text format, for all workers."""
+    return PlainTextResponse(
+        await metrics.exposition(), media_type=metrics.CONTENT_TYPE
+    )
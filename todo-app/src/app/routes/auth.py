@@ -4,9 +4,9 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, Form, Request, Response
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from pydantic import EmailStr, ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import (
     clear_session_cookie,
@@ -15,11 +15,13 @@ from app.core.deps import (
     get_optional_user_id,
     is_htmx_request,
     set_session_cookie,
+    set_timezone_cookie,
 )
-from app.database import User, get_db
+from app.core.templates import templates
+from app.database import User, get_async_db
+from app.utils import time_zone
 
 router = APIRouter(prefix="/auth", tags=["auth"])
-templates = Jinja2Templates(directory="src/app/templates")
 
 
 def is_safe_redirect(url: str) -> bool:
@@ -36,7 +38,8 @@ async def login(
     email: Annotated[str, Form()],
     password: Annotated[str, Form()],
     next: Annotated[str, Form()] = "/app",
-    db: Session = Depends(get_db),
+    timezone: Annotated[str | None, Form()] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Handle login form submission."""
     # Validate email format
@@ -50,7 +53,7 @@ async def login(
         )
 
     # Find user
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user or user.password != password:
         return templates.TemplateResponse(
             request=request,
@@ -58,10 +61,16 @@ async def login(
             context={"error": "Invalid email or password"},
         )
 
+    # Keep the browser's time zone, so "today" matches the user's calendar
+    if timezone and timezone != user.timezone and time_zone(timezone):
+        user.timezone = timezone
+        await db.commit()
+
     # Create session
     session_id = create_session(user.id)
     response = Response(status_code=200)
     set_session_cookie(response, session_id)
+    set_timezone_cookie(response, user.timezone)
     # Validate redirect URL to prevent open redirect attacks
     redirect_url = next if is_safe_redirect(next) else "/app"
     response.headers["HX-Redirect"] = redirect_url
@@ -74,7 +83,8 @@ async def register(
     email: Annotated[str, Form()],
     password: Annotated[str, Form()],
     confirm_password: Annotated[str, Form()],
-    db: Session = Depends(get_db),
+    timezone: Annotated[str | None, Form()] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Handle registration form submission."""
     # Validate email format
@@ -104,7 +114,7 @@ async def register(
         )
 
     # Check if user exists
-    existing = db.query(User).filter(User.email == email).first()
+    existing = await db.scalar(select(User).where(User.email == email))
     if existing:
         return templates.TemplateResponse(
             request=request,
@@ -113,15 +123,19 @@ async def register(
         )
 
     # Create user
-    user = User(email=email, password=password)
+    user = User(
+        email=email,
+        password=password,
+        timezone=timezone if time_zone(timezone) else None,
+    )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     # Auto-login after registration
     session_id = create_session(user.id)
     response = Response(status_code=200)
     set_session_cookie(response, session_id)
+    set_timezone_cookie(response, user.timezone)
     response.headers["HX-Redirect"] = "/app"
     return response
 
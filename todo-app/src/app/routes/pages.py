@@ -4,21 +4,25 @@ from typing import Annotated, Optional
 
 from fastapi import APIRouter, Cookie, Depends, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.access import todo_page_statement
+from app.core.conditional import (
+    is_not_modified,
+    list_etag,
+    make_etag,
+    not_modified,
+    set_etag,
+    sidebar_etag,
+)
 from app.core.deps import get_optional_user_id, get_session
-from app.database import Todo, TodoList, User, get_db
-from app.utils import format_date, format_date_input, is_due_today, is_overdue
+from app.core.streaming import stream_todo_page
+from app.core.templates import templates
+from app.database import TodoList, User, get_async_db
+from app.routes.todo_lists import todo_page_url
 
 router = APIRouter(tags=["pages"])
-templates = Jinja2Templates(directory="src/app/templates")
-
-# Add utility functions to template globals
-templates.env.globals["is_overdue"] = is_overdue
-templates.env.globals["is_due_today"] = is_due_today
-templates.env.globals["format_date"] = format_date
-templates.env.globals["format_date_input"] = format_date_input
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -70,7 +74,7 @@ async def register_page(
 async def app_page(
     request: Request,
     session_id: Annotated[Optional[str], Cookie()] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Main application page."""
     session = get_session(session_id)
@@ -78,17 +82,18 @@ async def app_page(
         return RedirectResponse(url="/login?next=/app", status_code=302)
 
     user_id = session["user_id"]
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         return RedirectResponse(url="/login", status_code=302)
 
     # Get user's lists with todo counts
     lists = (
-        db.query(TodoList)
-        .filter(TodoList.user_id == user_id)
-        .order_by(TodoList.position)
-        .all()
-    )
+        await db.scalars(
+            select(TodoList)
+            .where(TodoList.user_id == user_id)
+            .order_by(TodoList.position)
+        )
+    ).all()
 
     # Auto-select first list if available
     if lists:
@@ -111,7 +116,7 @@ async def app_list_page(
     request: Request,
     list_id: str,
     session_id: Annotated[Optional[str], Cookie()] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Main app page with a specific list selected."""
     session = get_session(session_id)
@@ -119,41 +124,49 @@ async def app_list_page(
         return RedirectResponse(url=f"/login?next=/app/lists/{list_id}", status_code=302)
 
     user_id = session["user_id"]
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return RedirectResponse(url="/login", status_code=302)
+    # User and active list in one lookup; they carry the page's ETag
+    row = (
+        await db.execute(
+            select(User, TodoList)
+            .join(TodoList, TodoList.user_id == User.id)
+            .where(User.id == user_id, TodoList.id == list_id)
+        )
+    ).one_or_none()
+    if row is None:
+        user = await db.scalar(select(User.id).where(User.id == user_id))
+        return RedirectResponse(url="/app" if user else "/login", status_code=302)
+    user, active_list = row
+
+    etag = make_etag(
+        "page",
+        user.email,
+        sidebar_etag(user_id, user.lists_version),
+        list_etag(active_list),
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
     # Get all lists
     lists = (
-        db.query(TodoList)
-        .filter(TodoList.user_id == user_id)
-        .order_by(TodoList.position)
-        .all()
-    )
-
-    # Get the active list
-    active_list = db.query(TodoList).filter(
-        TodoList.id == list_id, TodoList.user_id == user_id
-    ).first()
-
-    if not active_list:
-        return RedirectResponse(url="/app", status_code=302)
-
-    # Get todos for the active list
-    todos = (
-        db.query(Todo)
-        .filter(Todo.list_id == list_id)
-        .order_by(Todo.position)
-        .all()
-    )
-
-    return templates.TemplateResponse(
-        request=request,
-        name="app.html",
-        context={
-            "user": user,
-            "lists": lists,
-            "active_list": active_list,
-            "todos": todos,
-        },
+        await db.scalars(
+            select(TodoList)
+            .where(TodoList.user_id == user_id)
+            .order_by(TodoList.position)
+        )
+    ).all()
+
+    # Header and sidebar go out first, the first page of todos follows as
+    # rows are read; the rest load on scroll
+    context = {"user": user, "lists": lists, "active_list": active_list}
+    response = await stream_todo_page(
+        "app.html",
+        context,
+        todo_page_statement(list_id),
+        db,
+        more_url=lambda cursor: todo_page_url(list_id, cursor),
     )
+    if response is None:
+        response = templates.TemplateResponse(
+            request=request, name="app.html", context=context | {"todos": []}
+        )
+    return set_etag(response, etag)
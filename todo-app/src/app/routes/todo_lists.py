@@ -1,46 +1,77 @@
 """Todo list routes."""
 
 from typing import Annotated
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Depends, Form, Request, Response
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.access import (
+    get_owned_list,
+    load_todo_page,
+    todo_owned_by,
+    todo_page_statement,
+)
+from app.core.conditional import (
+    is_not_modified,
+    list_etag,
+    not_modified,
+    set_etag,
+    sidebar_etag,
+)
 from app.core.deps import get_current_user_id
-from app.database import Todo, TodoList, get_db
-from app.utils import format_date, format_date_input, is_due_today, is_overdue
+from app.core.streaming import stream_todo_page
+from app.core.templates import templates
+from app.database import Todo, TodoList, User, get_async_db
+from app.ordering import integer_key, key_between
+from app.utils import classify_due
 
 router = APIRouter(prefix="/api/lists", tags=["lists"])
-templates = Jinja2Templates(directory="src/app/templates")
 
-# Add utility functions to template globals
-templates.env.globals["is_overdue"] = is_overdue
-templates.env.globals["is_due_today"] = is_due_today
-templates.env.globals["format_date"] = format_date
-templates.env.globals["format_date_input"] = format_date_input
+
+async def _get_user_lists(db: AsyncSession, user_id: str) -> list[TodoList]:
+    """Load the user's lists in sidebar order."""
+    result = await db.scalars(
+        select(TodoList)
+        .where(TodoList.user_id == user_id)
+        .order_by(TodoList.position)
+    )
+    return list(result.all())
+
+
+def todo_page_url(list_id: str, cursor: tuple[str, str] | None) -> str | None:
+    """URL of the page after ``cursor`` (None once the last page is shown)."""
+    if cursor is None:
+        return None
+    position, todo_id = cursor
+    query = urlencode({"after": position, "after_id": todo_id})
+    return f"/api/lists/{list_id}/todos?{query}"
 
 
 @router.get("", response_class=HTMLResponse)
 async def get_lists(
     request: Request,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all lists for sidebar."""
-    lists = (
-        db.query(TodoList)
-        .filter(TodoList.user_id == user_id)
-        .order_by(TodoList.position)
-        .all()
+    lists_version = await db.scalar(
+        select(User.lists_version).where(User.id == user_id)
     )
+    etag = sidebar_etag(user_id, lists_version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
-    return templates.TemplateResponse(
+    lists = await _get_user_lists(db, user_id)
+
+    response = templates.TemplateResponse(
         request=request,
         name="partials/sidebar_lists.html",
         context={"lists": lists, "active_list": None},
     )
+    return set_etag(response, etag)
 
 
 @router.post("", response_class=HTMLResponse)
@@ -50,7 +81,7 @@ async def create_list(
     name: Annotated[str, Form()],
     description: Annotated[str | None, Form()] = None,
     color: Annotated[str, Form()] = "#3b82f6",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new todo list."""
     # Validate name
@@ -69,12 +100,10 @@ async def create_list(
         )
 
     # Calculate next position
-    max_pos = (
-        db.query(func.max(TodoList.position))
-        .filter(TodoList.user_id == user_id)
-        .scalar()
+    max_pos = await db.scalar(
+        select(func.max(TodoList.position)).where(TodoList.user_id == user_id)
     )
-    new_pos = (max_pos or -1) + 1
+    new_pos = key_between(max_pos, None)
 
     # Create list
     new_list = TodoList(
@@ -85,8 +114,7 @@ async def create_list(
         position=new_pos,
     )
     db.add(new_list)
-    db.commit()
-    db.refresh(new_list)
+    await db.commit()
 
     # Return list item for sidebar and redirect to the new list
     response = templates.TemplateResponse(
@@ -103,12 +131,10 @@ async def get_list(
     request: Request,
     list_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get a specific list and its todos."""
-    list_obj = db.query(TodoList).filter(
-        TodoList.id == list_id, TodoList.user_id == user_id
-    ).first()
+    list_obj = await get_owned_list(db, list_id, user_id)
 
     if not list_obj:
         return templates.TemplateResponse(
@@ -118,17 +144,48 @@ async def get_list(
             status_code=404,
         )
 
-    todos = (
-        db.query(Todo)
-        .filter(Todo.list_id == list_id)
-        .order_by(Todo.position)
-        .all()
+    # HTMX navigation back to an unchanged list ends here
+    etag = list_etag(list_obj)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    # The list header goes out first, todos follow as they are read
+    response = await stream_todo_page(
+        "partials/todo_list_content.html",
+        {"list": list_obj},
+        todo_page_statement(list_id),
+        db,
+        more_url=lambda cursor: todo_page_url(list_id, cursor),
     )
+    if response is None:
+        response = templates.TemplateResponse(
+            request=request,
+            name="partials/todo_list_content.html",
+            context={"list": list_obj, "todos": []},
+        )
+    return set_etag(response, etag)
+
+
+@router.get("/{list_id}/todos", response_class=HTMLResponse)
+async def get_todo_page(
+    request: Request,
+    list_id: str,
+    user_id: Annotated[str, Depends(get_current_user_id)],
+    after: str,
+    after_id: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Next page of a list's todos, requested by the infinite-scroll sentinel."""
+    # Ownership is part of the page query; other users' lists come back empty
+    todos, cursor = await load_todo_page(
+        db, list_id, after, user_id=user_id, after_id=after_id
+    )
+    classify_due(todos)
 
     return templates.TemplateResponse(
         request=request,
-        name="partials/todo_list_content.html",
-        context={"list": list_obj, "todos": todos},
+        name="partials/todos_page.html",
+        context={"todos": todos, "more_url": todo_page_url(list_id, cursor)},
     )
 
 
@@ -140,12 +197,10 @@ async def update_list(
     name: Annotated[str, Form()],
     description: Annotated[str | None, Form()] = None,
     color: Annotated[str, Form()] = "#3b82f6",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a todo list."""
-    list_obj = db.query(TodoList).filter(
-        TodoList.id == list_id, TodoList.user_id == user_id
-    ).first()
+    list_obj = await get_owned_list(db, list_id, user_id)
 
     if not list_obj:
         return templates.TemplateResponse(
@@ -173,16 +228,7 @@ async def update_list(
     list_obj.name = name.strip()
     list_obj.description = description.strip() if description else None
     list_obj.color = color
-    db.commit()
-    db.refresh(list_obj)
-
-    # Get updated sidebar
-    lists = (
-        db.query(TodoList)
-        .filter(TodoList.user_id == user_id)
-        .order_by(TodoList.position)
-        .all()
-    )
+    await db.commit()
 
     response = templates.TemplateResponse(
         request=request,
@@ -197,18 +243,25 @@ async def delete_list(
     request: Request,
     list_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Delete a todo list (CASCADE deletes todos)."""
-    list_obj = db.query(TodoList).filter(
-        TodoList.id == list_id, TodoList.user_id == user_id
-    ).first()
-
-    if not list_obj:
+    """Delete a todo list and its todos."""
+    # Two bulk DELETEs instead of the ORM cascade, which loads every todo
+    # first (SQLite's own ON DELETE CASCADE needs PRAGMA foreign_keys)
+    await db.execute(
+        delete(Todo)
+        .where(Todo.list_id == list_id, todo_owned_by(user_id))
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(
+        delete(TodoList)
+        .where(TodoList.id == list_id, TodoList.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
         return Response(status_code=404)
-
-    db.delete(list_obj)
-    db.commit()
+    await db.commit()
 
     response = Response(status_code=200)
     response.headers["HX-Redirect"] = "/app"
@@ -220,36 +273,39 @@ async def reorder_lists(
     request: Request,
     user_id: Annotated[str, Depends(get_current_user_id)],
     list_id: Annotated[list[str], Form()],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Reorder lists based on drag-and-drop. list_id contains IDs in new order."""
-    # Update positions based on order received
-    for position, lid in enumerate(list_id):
-        list_obj = db.query(TodoList).filter(
-            TodoList.id == lid, TodoList.user_id == user_id
-        ).first()
-        if list_obj:
-            list_obj.position = position
-
-    db.commit()
+    # One ownership-checked UPDATE with a CASE over the submitted ids; rows
+    # whose key is already correct are filtered out and not written
+    new_keys = {
+        lid: integer_key(index) for index, lid in enumerate(dict.fromkeys(list_id))
+    }
+    new_position = case(
+        *((TodoList.id == lid, key) for lid, key in new_keys.items())
+    )
+    await db.execute(
+        update(TodoList)
+        .where(
+            TodoList.user_id == user_id,
+            TodoList.id.in_(list(new_keys)),
+            TodoList.position.is_distinct_from(new_position),
+        )
+        .values(position=new_position)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
 
     # Return updated sidebar lists
-    lists = (
-        db.query(TodoList)
-        .filter(TodoList.user_id == user_id)
-        .order_by(TodoList.position)
-        .all()
-    )
+    lists = await _get_user_lists(db, user_id)
 
-    # Determine active list from referer URL
+    # Determine active list from referer URL (no extra query: it is in `lists`)
     referer = request.headers.get("referer", "")
     active_list_id = None
     if "/app/lists/" in referer:
         active_list_id = referer.split("/app/lists/")[-1].split("?")[0]
 
-    active_list = None
-    if active_list_id:
-        active_list = db.query(TodoList).filter(TodoList.id == active_list_id).first()
+    active_list = next((lst for lst in lists if lst.id == active_list_id), None)
 
     return templates.TemplateResponse(
         request=request,
@@ -2,71 +2,124 @@
 
 from datetime import datetime, timezone
 from typing import Annotated
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Depends, Form, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, Request, Response
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, literal, null, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.access import get_owned_list, get_owned_todo, todo_exists, todo_owned_by
+from app.core.config import settings
 from app.core.deps import get_current_user_id
-from app.database import Todo, TodoList, get_db
-from app.utils import format_date, format_date_input, is_due_today, is_overdue
+from app.core.fragments import todo_fragments
+from app.core.templates import templates
+from app.database import Todo, TodoList, get_async_db
+from app.migrations import rebalance_positions
+from app.ordering import key_between
+from app.read_models import todo_rows
+from app.search import search_statement
+from app.utils import classify_due
 
 router = APIRouter(prefix="/api/todos", tags=["todos"])
-templates = Jinja2Templates(directory="src/app/templates")
 
-# Add utility functions to template globals
-templates.env.globals["is_overdue"] = is_overdue
-templates.env.globals["is_due_today"] = is_due_today
-templates.env.globals["format_date"] = format_date
-templates.env.globals["format_date_input"] = format_date_input
 
+async def _adjust_list_counts(
+    db: AsyncSession, list_id: str, open_delta: int, total_delta: int = 0
+) -> int:
+    """Apply deltas to a list's todo counters and return the new open count.
+
+    Runs in the caller's transaction, so the counters commit (or roll back)
+    together with the todo change. A move between lists is a negative delta
+    on the source list plus a positive delta on the target.
+    """
+    return await db.scalar(
+        update(TodoList)
+        .where(TodoList.id == list_id)
+        .values(
+            open_count=TodoList.open_count + open_delta,
+            total_count=TodoList.total_count + total_delta,
+        )
+        .returning(TodoList.open_count)
+    )
 
-def _verify_list_access(db: Session, list_id: str, user_id: str) -> TodoList | None:
-    """Verify user owns the list and return it."""
-    return db.query(TodoList).filter(
-        TodoList.id == list_id, TodoList.user_id == user_id
-    ).first()
+
+async def _todo_error(request: Request, db: AsyncSession, todo_id: str):
+    """Error page for a todo the fused ownership query did not return."""
+    if await todo_exists(db, todo_id):
+        return templates.TemplateResponse(
+            request=request,
+            name="partials/error.html",
+            context={"error": "Not authorized"},
+            status_code=403,
+        )
+    return templates.TemplateResponse(
+        request=request,
+        name="partials/error.html",
+        context={"error": "Todo not found"},
+        status_code=404,
+    )
 
 
-def _get_list_todo_count(db: Session, list_id: str) -> int:
-    """Get the count of incomplete todos in a list."""
-    return db.query(func.count(Todo.id)).filter(
-        Todo.list_id == list_id, Todo.is_completed == False
-    ).scalar()
+async def _todo_error_status(db: AsyncSession, todo_id: str) -> Response:
+    """Bare 404/403 for endpoints that answer without a body."""
+    return Response(status_code=403 if await todo_exists(db, todo_id) else 404)
 
 
 @router.get("/search", response_class=HTMLResponse)
 async def search_todos(
     request: Request,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    list_id: str,
+    list_id: str | None = None,
     q: str = "",
-    db: Session = Depends(get_db),
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Search todos by title in a specific list."""
-    # Verify list access
-    list_obj = _verify_list_access(db, list_id, user_id)
-    if not list_obj:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "List not found"},
-            status_code=404,
+    """Search todo titles and notes in one list, or in all lists without list_id.
+
+    Results come in pages of ``TODO_PAGE_SIZE``; ``offset`` selects a later
+    page (ranked results have no position to continue from).
+    """
+    list_obj = None
+    if list_id is not None:
+        # Verify list access
+        list_obj = await get_owned_list(db, list_id, user_id)
+        if not list_obj:
+            return templates.TemplateResponse(
+                request=request,
+                name="partials/error.html",
+                context={"error": "List not found"},
+                status_code=404,
+            )
+
+    size = settings.todo_page_size
+    todos = todo_rows(
+        await db.execute(
+            search_statement(user_id, q, list_id).offset(max(offset, 0)).limit(size + 1)
         )
+    )
 
-    query = db.query(Todo).filter(Todo.list_id == list_id)
-
-    if q.strip():
-        query = query.filter(Todo.title.ilike(f"%{q.strip()}%"))
+    classify_due(todos)
 
-    todos = query.order_by(Todo.position).all()
+    more_url = None
+    if len(todos) > size:
+        todos = todos[:size]
+        params = {"q": q, "offset": offset + size}
+        if list_id is not None:
+            params["list_id"] = list_id
+        more_url = f"/api/todos/search?{urlencode(params)}"
 
     return templates.TemplateResponse(
         request=request,
-        name="partials/todos_list.html",
-        context={"todos": todos, "list": list_obj, "search_query": q},
+        # Later pages are appended to the results: no empty state
+        name="partials/todos_page.html" if offset > 0 else "partials/todos_list.html",
+        context={
+            "todos": todos,
+            "list": list_obj,
+            "search_query": q,
+            "more_url": more_url,
+        },
     )
 
 
@@ -76,19 +129,9 @@ async def create_todo(
     user_id: Annotated[str, Depends(get_current_user_id)],
     list_id: Annotated[str, Form()],
     title: Annotated[str, Form()],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new todo (quick add with title only)."""
-    # Verify list access
-    list_obj = _verify_list_access(db, list_id, user_id)
-    if not list_obj:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "List not found"},
-            status_code=404,
-        )
-
     # Validate title
     if not title.strip():
         return templates.TemplateResponse(
@@ -104,32 +147,47 @@ async def create_todo(
             context={"error": "Title must be 200 characters or less"},
         )
 
-    # Calculate next position
-    max_pos = (
-        db.query(func.max(Todo.position))
-        .filter(Todo.list_id == list_id)
-        .scalar()
+    # Verify list access, bump its counters and read the last position in one
+    # statement; the write lock it takes also keeps concurrent appends apart
+    last_position = (
+        select(func.max(Todo.position))
+        .where(Todo.list_id == list_id)
+        .scalar_subquery()
     )
-    new_pos = (max_pos or -1) + 1
+    row = (
+        await db.execute(
+            update(TodoList)
+            .where(TodoList.id == list_id, TodoList.user_id == user_id)
+            .values(
+                open_count=TodoList.open_count + 1,
+                total_count=TodoList.total_count + 1,
+            )
+            .returning(TodoList.open_count, last_position)
+        )
+    ).one_or_none()
+    if row is None:
+        return templates.TemplateResponse(
+            request=request,
+            name="partials/error.html",
+            context={"error": "List not found"},
+            status_code=404,
+        )
+    count, max_pos = row
 
     # Create todo
     todo = Todo(
         list_id=list_id,
         title=title.strip(),
-        position=new_pos,
+        position=key_between(max_pos, None),
         priority="low",
     )
     db.add(todo)
-    db.commit()
-    db.refresh(todo)
-
-    # Get updated count for OOB swap
-    count = _get_list_todo_count(db, list_id)
+    await db.commit()
 
     return templates.TemplateResponse(
         request=request,
         name="partials/todo_item_with_oob.html",
-        context={"todo": todo, "list": list_obj, "count": count},
+        context={"todo": todo, "count": count},
     )
 
 
@@ -138,27 +196,12 @@ async def get_todo(
     request: Request,
     todo_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get a single todo item."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
+    todo = await get_owned_todo(db, todo_id, user_id)
     if not todo:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "Todo not found"},
-            status_code=404,
-        )
-
-    # Verify access
-    list_obj = _verify_list_access(db, todo.list_id, user_id)
-    if not list_obj:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "Not authorized"},
-            status_code=403,
-        )
+        return await _todo_error(request, db, todo_id)
 
     return templates.TemplateResponse(
         request=request,
@@ -176,28 +219,9 @@ async def update_todo(
     note: Annotated[str | None, Form()] = None,
     due_date: Annotated[str | None, Form()] = None,
     priority: Annotated[str, Form()] = "low",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a todo item."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
-    if not todo:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "Todo not found"},
-            status_code=404,
-        )
-
-    # Verify access
-    list_obj = _verify_list_access(db, todo.list_id, user_id)
-    if not list_obj:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "Not authorized"},
-            status_code=403,
-        )
-
     # Validate title
     if not title.strip():
         return templates.TemplateResponse(
@@ -217,23 +241,33 @@ async def update_todo(
     if priority not in ("low", "medium", "high"):
         priority = "low"
 
-    # Update fields
-    todo.title = title.strip()
-    todo.note = note.strip() if note else None
+    values = {
+        "title": title.strip(),
+        "note": note.strip() if note else None,
+        "priority": priority,
+    }
 
     # Parse due date
     if due_date and due_date.strip():
         try:
             parsed_date = datetime.strptime(due_date, "%Y-%m-%d")
-            todo.due_date = parsed_date.replace(tzinfo=timezone.utc)
+            values["due_date"] = parsed_date.replace(tzinfo=timezone.utc)
         except ValueError:
             pass  # Keep existing
     else:
-        todo.due_date = None
-
-    todo.priority = priority
-    db.commit()
-    db.refresh(todo)
+        values["due_date"] = None
+
+    # Ownership check and write in one statement
+    todo = await db.scalar(
+        update(Todo)
+        .where(Todo.id == todo_id, todo_owned_by(user_id))
+        .values(**values)
+        .returning(Todo)
+    )
+    if not todo:
+        return await _todo_error(request, db, todo_id)
+    await db.commit()
+    todo_fragments.invalidate(todo.id)
 
     return templates.TemplateResponse(
         request=request,
@@ -247,41 +281,35 @@ async def toggle_todo(
     request: Request,
     todo_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Toggle todo completion status."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
-    if not todo:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "Todo not found"},
-            status_code=404,
-        )
-
-    # Verify access
-    list_obj = _verify_list_access(db, todo.list_id, user_id)
-    if not list_obj:
-        return templates.TemplateResponse(
-            request=request,
-            name="partials/error.html",
-            context={"error": "Not authorized"},
-            status_code=403,
+    # Flip in SQL, so the ownership check, read and write are one statement
+    completing = func.coalesce(Todo.is_completed, False) == False  # noqa: E712
+    todo = await db.scalar(
+        update(Todo)
+        .where(Todo.id == todo_id, todo_owned_by(user_id))
+        .values(
+            is_completed=completing,
+            completed_at=case(
+                (completing, datetime.now(timezone.utc)), else_=null()
+            ),
         )
+        .returning(Todo)
+    )
+    if not todo:
+        return await _todo_error(request, db, todo_id)
 
-    # Toggle completion
-    todo.is_completed = not todo.is_completed
-    todo.completed_at = datetime.now(timezone.utc) if todo.is_completed else None
-    db.commit()
-    db.refresh(todo)
-
-    # Get updated count for OOB swap
-    count = _get_list_todo_count(db, todo.list_id)
+    count = await _adjust_list_counts(
+        db, todo.list_id, open_delta=-1 if todo.is_completed else 1
+    )
+    await db.commit()
+    todo_fragments.invalidate(todo.id)
 
     return templates.TemplateResponse(
         request=request,
         name="partials/todo_item_with_oob.html",
-        context={"todo": todo, "list": list_obj, "count": count},
+        context={"todo": todo, "count": count},
     )
 
 
@@ -290,24 +318,25 @@ async def delete_todo(
     request: Request,
     todo_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a todo item."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
-    if not todo:
-        return Response(status_code=404)
-
-    # Verify access
-    list_obj = _verify_list_access(db, todo.list_id, user_id)
-    if not list_obj:
-        return Response(status_code=403)
-
-    list_id = todo.list_id
-    db.delete(todo)
-    db.commit()
+    row = (
+        await db.execute(
+            delete(Todo)
+            .where(Todo.id == todo_id, todo_owned_by(user_id))
+            .returning(Todo.id, Todo.list_id, Todo.is_completed)
+        )
+    ).one_or_none()
+    if row is None:
+        return await _todo_error_status(db, todo_id)
 
-    # Get updated count for OOB swap
-    count = _get_list_todo_count(db, list_id)
+    deleted_id, list_id, is_completed = row
+    count = await _adjust_list_counts(
+        db, list_id, open_delta=0 if is_completed else -1, total_delta=-1
+    )
+    await db.commit()
+    todo_fragments.invalidate(deleted_id)
 
     return templates.TemplateResponse(
         request=request,
@@ -316,51 +345,124 @@ async def delete_todo(
     )
 
 
+def _neighbour_keys(after_id: str | None, position: int | None):
+    """Correlated subqueries for the keys the moved todo has to fit between.
+
+    Todos are ordered by ``(position, id)``, as the list pages show them, so
+    the next key is that of the first other todo after the anchor in that
+    order. It equals ``prev_key`` when the anchor shares its key with the
+    following todo; there is no key in between then.
+    """
+    before = aliased(Todo, name="before")
+    # Explicit correlation: these are also nested inside next_key below
+    others = (
+        select(before.id)
+        .where(before.list_id == Todo.list_id, before.id != Todo.id)
+        .correlate(Todo)
+    )
+    after = aliased(Todo, name="after")
+    next_key = select(func.min(after.position)).where(
+        after.list_id == Todo.list_id, after.id != Todo.id
+    )
+
+    if after_id:
+        anchor_id = literal(after_id, Todo.id.type)
+    elif position:
+        # Legacy index-based API: the todo ends up after the position-th other
+        anchor_id = func.coalesce(
+            others.order_by(before.position, before.id)
+            .offset(position - 1)
+            .limit(1)
+            .scalar_subquery(),
+            others.order_by(before.position.desc(), before.id.desc())
+            .limit(1)
+            .scalar_subquery(),
+        )
+    else:
+        return null(), next_key.scalar_subquery()
+
+    prev_key = (
+        others.with_only_columns(before.position)
+        .where(before.id == anchor_id)
+        .scalar_subquery()
+    )
+    next_key = next_key.where(
+        tuple_(after.position, after.id) > tuple_(prev_key, anchor_id)
+    )
+    return prev_key, next_key.scalar_subquery()
+
+
+async def _load_move(
+    db: AsyncSession,
+    todo_id: str,
+    user_id: str,
+    after_id: str | None,
+    position: int | None,
+):
+    """Load the owned todo together with its new neighbours' keys."""
+    prev_key, next_key = _neighbour_keys(after_id, position)
+    return (
+        await db.execute(
+            select(Todo, prev_key, next_key).where(
+                Todo.id == todo_id, todo_owned_by(user_id)
+            )
+        )
+    ).one_or_none()
+
+
+async def _rebalance_list(engine: AsyncEngine, list_id: str) -> None:
+    """Background pass: respace a list's keys once repeated moves made them long."""
+    async with engine.begin() as conn:
+        await conn.run_sync(rebalance_positions, Todo, list_id)
+
+
 @router.post("/{todo_id}/reorder")
 async def reorder_todo(
     request: Request,
     todo_id: str,
     user_id: Annotated[str, Depends(get_current_user_id)],
-    position: Annotated[int, Form()],
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    after_id: Annotated[str | None, Form()] = None,
+    position: Annotated[int | None, Form()] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Reorder a todo to a new position (drag-drop)."""
-    todo = db.query(Todo).filter(Todo.id == todo_id).first()
-    if not todo:
-        return Response(status_code=404)
-
-    # Verify access
-    list_obj = _verify_list_access(db, todo.list_id, user_id)
-    if not list_obj:
-        return Response(status_code=403)
+    """Move a todo directly below ``after_id`` (drag-drop).
 
-    old_position = todo.position
-    new_position = position
+    Without ``after_id`` the todo moves to the top, unless the legacy
+    ``position`` index is given. Only the moved row is written.
+    """
+    row = await _load_move(db, todo_id, user_id, after_id, position)
+    if row is None:
+        return await _todo_error_status(db, todo_id)
+    todo, prev_key, next_key = row
 
-    if old_position == new_position:
+    if after_id == todo.id:
         return Response(status_code=200)
+    if after_id and prev_key is None:
+        return Response(status_code=404)
 
-    # Get all todos in the list ordered by position
-    todos = (
-        db.query(Todo)
-        .filter(Todo.list_id == todo.list_id)
-        .order_by(Todo.position)
-        .all()
-    )
+    if prev_key is not None and next_key is not None and prev_key >= next_key:
+        # The anchor shares its key with the next todo (e.g. two concurrent
+        # creates): respace, then retry once
+        await db.run_sync(
+            lambda session: rebalance_positions(session.connection(), Todo, todo.list_id)
+        )
+        await db.refresh(todo)
+        todo, prev_key, next_key = await _load_move(
+            db, todo_id, user_id, after_id, position
+        )
 
-    # Reorder: shift items between old and new positions
-    if old_position < new_position:
-        # Moving down: shift items up
-        for t in todos:
-            if old_position < t.position <= new_position:
-                t.position -= 1
-    else:
-        # Moving up: shift items down
-        for t in todos:
-            if new_position <= t.position < old_position:
-                t.position += 1
+    # Already in place
+    if (prev_key is None or prev_key < todo.position) and (
+        next_key is None or todo.position < next_key
+    ):
+        await db.commit()
+        return Response(status_code=200)
+
+    todo.position = key_between(prev_key, next_key)
+    await db.commit()
 
-    todo.position = new_position
-    db.commit()
+    if len(todo.position) > settings.order_key_rebalance_length:
+        background_tasks.add_task(_rebalance_list, db.bind, todo.list_id)
 
     return Response(status_code=200)
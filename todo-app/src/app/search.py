@@ -0,0 +1,56 @@
+"""Full-text todo search on the SQLite FTS5 index (``todos_fts``)."""
+
+import re
+
+from sqlalchemy import Select, column, func, literal_column, select, table
+
+from app.database import Todo, TodoList
+from app.read_models import TODO_ROW_COLUMNS
+
+# bm25 column weights: a hit in the title ranks above a hit in the note
+TITLE_WEIGHT = 10.0
+NOTE_WEIGHT = 1.0
+
+todos_fts = table("todos_fts", column("rowid"))
+
+_WORD = re.compile(r"\w+")
+
+
+def match_expression(q: str) -> str | None:
+    """Turn free text into an FTS5 query where every word matches as a prefix.
+
+    Words are quoted, so FTS5 syntax in user input (``AND``, ``NEAR``, ``*``,
+    ``:``) is searched for literally. Returns None if there are no words.
+    """
+    words = _WORD.findall(q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_statement(user_id: str, q: str, list_id: str | None = None) -> Select:
+    """Build the query for a user's todos matching ``q``, best match first.
+
+    Searches one list when ``list_id`` is given, otherwise all of the user's
+    lists. Without search words every todo in scope is returned in list order.
+    Selects the ``TODO_ROW_COLUMNS`` of app.read_models.
+    """
+    stmt = (
+        select(*TODO_ROW_COLUMNS)
+        .join(TodoList, Todo.list_id == TodoList.id)
+        .where(TodoList.user_id == user_id)
+    )
+    if list_id is not None:
+        stmt = stmt.where(Todo.list_id == list_id)
+
+    match = match_expression(q)
+    if match is None:
+        return stmt.order_by(TodoList.position, Todo.position)
+
+    fts = literal_column("todos_fts")
+    rank = func.bm25(fts, TITLE_WEIGHT, NOTE_WEIGHT)
+    return (
+        stmt.join(todos_fts, todos_fts.c.rowid == literal_column("todos.rowid"))
+        .where(fts.op("MATCH")(match))
+        .order_by(rank, TodoList.position, Todo.position)
+    )
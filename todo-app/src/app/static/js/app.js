@@ -59,14 +59,23 @@ function initTodoSortable() {
             ghostClass: 'sortable-ghost',
             chosenClass: 'sortable-chosen',
             dragClass: 'sortable-drag',
+            // The infinite-scroll sentinel stays put at the end of the page
+            draggable: '.todo-item',
             onEnd: function(evt) {
-                // Get the todo ID and new position
+                if (evt.oldIndex === evt.newIndex) return;
+
+                // Send the todo now directly above the moved one (empty = top);
+                // the server only rewrites the moved todo's position, so this
+                // also works when later pages are not loaded yet
                 const todoId = evt.item.dataset.todoId;
-                const newPosition = evt.newIndex;
+                let previous = evt.item.previousElementSibling;
+                while (previous && !previous.dataset.todoId) {
+                    previous = previous.previousElementSibling;
+                }
+                const afterId = previous ? previous.dataset.todoId : '';
 
-                // Send position update to server
                 htmx.ajax('POST', `/api/todos/${todoId}/reorder`, {
-                    values: { position: newPosition },
+                    values: { after_id: afterId },
                     swap: 'none'
                 });
             }
@@ -81,6 +90,15 @@ function initSortable() {
 
 document.addEventListener('DOMContentLoaded', initSortable);
 
+// Login and registration send the browser's time zone, so due dates are
+// styled against the user's own "today"
+document.addEventListener('DOMContentLoaded', () => {
+    const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
+    document.querySelectorAll('.browser-timezone').forEach((input) => {
+        input.value = timezone || '';
+    });
+});
+
 // Re-initialize sortable after HTMX swaps
 document.body.addEventListener('htmx:afterSwap', (evt) => {
     if (evt.detail.target.id === 'sidebar-lists') {
@@ -91,6 +109,16 @@ document.body.addEventListener('htmx:afterSwap', (evt) => {
     }
 });
 
+// A page loaded by the infinite-scroll sentinel can repeat a todo that was
+// added or dragged past the page boundary after the page before it loaded;
+// keep the copy that is already shown
+htmx.onLoad((elt) => {
+    if (elt.classList && elt.classList.contains('todo-item')
+            && document.querySelectorAll(`[id="${elt.id}"]`).length > 1) {
+        elt.remove();
+    }
+});
+
 // Edit list dialog - uses data attributes for XSS safety
 function openEditListDialog(id, name, description, color) {
     const dialog = document.getElementById('edit-list-dialog');
@@ -315,8 +343,12 @@ document.body.addEventListener('htmx:afterSwap', (evt) => {
     }
 });
 
-// Set no-cache headers for all responses
+// Keep caches out of writes. GETs are left alone: list and page responses
+// carry an ETag with Cache-Control: no-cache, so the browser revalidates
+// them and the server answers 304 when nothing changed.
 document.body.addEventListener('htmx:configRequest', (evt) => {
-    evt.detail.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate';
-    evt.detail.headers['Pragma'] = 'no-cache';
+    if (evt.detail.verb !== 'get') {
+        evt.detail.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate';
+        evt.detail.headers['Pragma'] = 'no-cache';
+    }
 });
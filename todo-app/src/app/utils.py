@@ -1,28 +1,90 @@
 """Shared utility functions for templates and routes."""
 
+from collections.abc import Iterable
+from contextvars import ContextVar, Token
 from datetime import date, datetime, timezone
 from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 if TYPE_CHECKING:
     from app.database import Todo
 
 
+# Due-date states, as tagged by classify_due and read by the templates
+OVERDUE = "overdue"
+DUE_TODAY = "due-today"
+UPCOMING = "upcoming"
+NO_DUE_STATE = "none"  # no due date, or completed after its date passed
+
+_request_today: ContextVar[date | None] = ContextVar("request_today", default=None)
+
+
+def time_zone(name: str | None) -> ZoneInfo | None:
+    """Return the IANA time zone ``name``, or None if it is empty or unknown."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def set_request_today(timezone_name: str | None) -> Token:
+    """Fix "today" for the current request, in the user's time zone.
+
+    Called once per request by app.core.middleware; everything rendered for
+    the request then reads the same date without touching the clock.
+    """
+    zone = time_zone(timezone_name) or timezone.utc
+    return _request_today.set(datetime.now(zone).date())
+
+
+def reset_request_today(token: Token) -> None:
+    _request_today.reset(token)
+
+
+def request_today() -> date:
+    """Today's date for the current request (UTC outside of a request)."""
+    today = _request_today.get()
+    return today if today is not None else datetime.now(timezone.utc).date()
+
+
+def due_state(todo: "Todo", today: date | None = None) -> str:
+    """Classify a todo's due date as OVERDUE, DUE_TODAY, UPCOMING or NO_DUE_STATE.
+
+    Returns the state tagged by classify_due when there is one.
+    """
+    state = getattr(todo, "due_state", None)
+    if state is not None and today is None:
+        return state
+    if not todo.due_date:
+        return NO_DUE_STATE
+    if today is None:
+        today = request_today()
+    due = todo.due_date.date() if isinstance(todo.due_date, datetime) else todo.due_date
+    if due == today:
+        return DUE_TODAY
+    if due > today:
+        return UPCOMING
+    return NO_DUE_STATE if todo.is_completed else OVERDUE
+
+
+def classify_due(todos: Iterable["Todo"], today: date | None = None) -> None:
+    """Tag every todo with its ``due_state`` in one pass over the batch."""
+    if today is None:
+        today = request_today()
+    for todo in todos:
+        todo.due_state = due_state(todo, today)
+
+
 def is_overdue(todo: "Todo") -> bool:
     """Return True if due_date < today AND not completed."""
-    if todo.is_completed or not todo.due_date:
-        return False
-    today = datetime.now(timezone.utc).date()
-    due = todo.due_date.date() if isinstance(todo.due_date, datetime) else todo.due_date
-    return due < today
+    return due_state(todo) == OVERDUE
 
 
 def is_due_today(todo: "Todo") -> bool:
     """Return True if due_date == today."""
-    if not todo.due_date:
-        return False
-    today = datetime.now(timezone.utc).date()
-    due = todo.due_date.date() if isinstance(todo.due_date, datetime) else todo.due_date
-    return due == today
+    return due_state(todo) == DUE_TODAY
 
 
 def format_date(dt: datetime | date | None) -> str:
@@ -1,20 +1,38 @@
 """Pytest configuration and fixtures."""
 
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Keep the app's lifespan (init_db + demo seeding) away from the real todo.db
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='todo-app-tests-')}/app.db"
+)
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app.database import Base, get_db
+from app.core.timing import repeated_statements
+from app.database import Base, async_database_url, get_async_db, get_db
 from app.main import app
 
 
 @pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh in-memory database for each test."""
+def db_url(tmp_path):
+    """Per-test SQLite file, shared by the sync fixtures and the async app."""
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture(scope="function")
+def db_session(db_url):
+    """Create a fresh database for each test."""
     engine = create_engine(
-        "sqlite:///:memory:",
+        db_url,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
@@ -30,9 +48,71 @@ def db_session():
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with overridden database dependency."""
+def app_engine(db_url):
+    """Async engine the app's routes use during a test."""
+    # NullPool: the app runs on the TestClient's own event loop, so no
+    # aiosqlite connection may outlive a request
+    return create_async_engine(
+        async_database_url(db_url),
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+    )
+
+
+@pytest.fixture
+def query_counter(app_engine):
+    """Collect the SQL statements the app executes (clear it before a request)."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(app_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(app_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail a block that runs more than ``n`` SQL statements, or any N+1.
+
+    ``with assert_max_queries(3): client.get(...)`` counts statements on
+    every engine. A statement shape repeated ``max_repeats`` + 1 times
+    fails too, so a per-row query is caught even while the total stays
+    under budget.
+    """
+
+    @contextmanager
+    def check(n: int, max_repeats: int = 1):
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        listing = "\n".join(statements)
+        assert len(statements) <= n, (
+            f"{len(statements)} statements, budget {n}:\n{listing}"
+        )
+        repeated = repeated_statements(statements, max_repeats + 1)
+        assert not repeated, f"Repeated statements (N+1?): {repeated}"
+
+    return check
+
+
+@pytest.fixture(scope="function")
+def client(db_session, app_engine):
+    """Create a test client with overridden database dependencies."""
     from app.core.deps import sessions
+    from app.core.fragments import todo_fragments
+
+    TestingAsyncSessionLocal = async_sessionmaker(
+        app_engine, autoflush=False, expire_on_commit=False
+    )
 
     def override_get_db():
         try:
@@ -40,10 +120,16 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
-    # Clear sessions before each test
+    # Clear sessions and cached fragments before each test
     sessions.clear()
+    todo_fragments.clear()
 
     with TestClient(app) as test_client:
         yield test_client
@@ -108,6 +194,8 @@ def test_todo(db_session, test_list):
         position=0,
     )
     db_session.add(todo)
+    test_list.open_count += 1
+    test_list.total_count += 1
     db_session.commit()
     db_session.refresh(todo)
     return todo
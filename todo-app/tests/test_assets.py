@@ -0,0 +1,128 @@
+"""Tests for fingerprinted, precompressed static assets."""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core.assets import (
+    IMMUTABLE,
+    REVALIDATE,
+    AssetFiles,
+    AssetManifest,
+    assets,
+    build_assets,
+)
+
+CSS = "body { color: black; }\n" * 50
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text(CSS)
+    vendored = tmp_path / "vendor" / "htmx.org-2.0.4"
+    vendored.mkdir(parents=True)
+    (vendored / "htmx.min.js").write_text("var htmx;")
+    return tmp_path
+
+
+@pytest.fixture
+def manifest(static_dir):
+    return AssetManifest(static_dir)
+
+
+@pytest.fixture
+def static_client(static_dir, manifest):
+    app = Starlette(
+        routes=[Mount("/static", AssetFiles(directory=static_dir, manifest=manifest))]
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+class TestAssetUrls:
+    """Tests for ``AssetManifest`` URLs."""
+
+    def test_app_files_get_content_hash(self, static_dir, manifest):
+        """Test the URL carries a hash that changes with the content."""
+        url = manifest.url("css/site.css")
+        assert url.startswith("/static/css/site.") and url.endswith(".css")
+
+        (static_dir / "css" / "site.css").write_text(CSS + "p {}\n")
+        assert manifest.url("css/site.css") != url
+
+    def test_vendor_falls_back_to_cdn(self, static_dir, manifest):
+        """Test vendored files are served locally, missing ones from the CDN."""
+        assert manifest.url("vendor/htmx.org-2.0.4/htmx.min.js") == (
+            "/static/vendor/htmx.org-2.0.4/htmx.min.js"
+        )
+        assert manifest.url("vendor/sortablejs-1.15.6/Sortable.min.js") == (
+            "https://cdn.jsdelivr.net/npm/sortablejs@1.15.6/Sortable.min.js"
+        )
+
+    def test_fingerprint_is_cached_until_refresh(self, static_dir, manifest):
+        """Test page ETags do not walk the directory on every request."""
+        fingerprint = manifest.fingerprint()
+        (static_dir / "css" / "extra.css").write_text("p {}\n")
+        assert manifest.fingerprint() == fingerprint
+
+        manifest.refresh()
+        assert manifest.fingerprint() != fingerprint
+
+    def test_unknown_asset_is_rejected(self, manifest):
+        """Test a typo in a template fails loudly."""
+        with pytest.raises(ValueError, match="Unknown static asset"):
+            manifest.url("css/missing.css")
+
+    def test_pages_link_hashed_assets(self, client):
+        """Test rendered pages use the fingerprinted URLs."""
+        html = client.get("/login").text
+        assert assets.url("css/styles.css") in html
+        assert assets.url("js/app.js") in html
+
+
+class TestAssetFiles:
+    """Tests for serving assets with ``AssetFiles``."""
+
+    def test_hashed_url_is_immutable(self, static_client, manifest):
+        """Test a current hashed URL is cached forever and carries an ETag."""
+        response = static_client.get(manifest.url("css/site.css"))
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE
+        assert response.headers["etag"]
+        assert response.text == CSS
+
+    def test_plain_and_stale_urls_revalidate(self, static_client):
+        """Test unhashed and outdated hashed URLs are not cached as immutable."""
+        for url in ("/static/css/site.css", "/static/css/site.000000000000.css"):
+            response = static_client.get(url)
+            assert response.status_code == 200
+            assert response.headers["cache-control"] == REVALIDATE
+
+    def test_vendored_files_are_immutable(self, static_client):
+        """Test the versioned vendor directory is cached forever."""
+        response = static_client.get("/static/vendor/htmx.org-2.0.4/htmx.min.js")
+        assert response.headers["cache-control"] == IMMUTABLE
+
+    def test_precompressed_copy_is_served(self, static_dir, static_client, manifest):
+        """Test build-assets output is sent to clients that accept gzip."""
+        assert build_assets(static_dir) == 1
+        assert build_assets(static_dir) == 0
+
+        url = manifest.url("css/site.css")
+        response = static_client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/css")
+        assert int(response.headers["content-length"]) == len(
+            (static_dir / "css" / "site.css.gz").read_bytes()
+        )
+        assert response.text == CSS
+
+        plain = static_client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert gzip.decompress((static_dir / "css" / "site.css.gz").read_bytes()) == (
+            CSS.encode()
+        )
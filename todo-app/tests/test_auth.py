@@ -138,9 +138,13 @@ class TestAuth:
 
     def test_logout(self, authenticated_client):
         """Test logout clears session."""
+        authenticated_client.cookies.set("timezone", "Europe/Warsaw")
         response = authenticated_client.post("/auth/logout")
         assert response.status_code == 200
         assert response.headers.get("HX-Redirect") == "/login"
+        cleared = response.headers.get_list("set-cookie")
+        assert any(c.startswith("session_id=") and "Max-Age=0" in c for c in cleared)
+        assert any(c.startswith("timezone=") and "Max-Age=0" in c for c in cleared)
 
 
 class TestProtectedRoutes:
@@ -0,0 +1,127 @@
+"""Tests for response compression and whitespace-trimmed templates."""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.config import Settings
+from app.core.middleware import (
+    CompressionMiddleware,
+    accepted_encodings,
+    available_encodings,
+)
+from app.core.templates import create_environment
+
+BODY = "todo " * 200
+
+
+async def big(request):
+    return PlainTextResponse(BODY, headers={"ETag": '"abc"'})
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def image(request):
+    return Response(BODY.encode(), media_type="image/png")
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"<p>chunk {i}</p>"
+
+    return StreamingResponse(chunks(), media_type="text/html")
+
+
+@pytest.fixture
+def compressed_client():
+    app = Starlette(
+        routes=[
+            Route("/big", big),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, min_size=500, encodings=["zstd", "br", "gzip"])
+    # Decode by hand, so the raw Content-Encoding is visible
+    with TestClient(app) as client:
+        yield client
+
+
+def _get(client, path, accept="gzip"):
+    return client.get(path, headers={"Accept-Encoding": accept})
+
+
+class TestCompressionMiddleware:
+    """Tests for ``CompressionMiddleware``."""
+
+    def test_gzip_when_accepted(self, compressed_client):
+        """Test a large text body is gzipped and marked as varying."""
+        response = _get(compressed_client, "/big")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert response.text == BODY
+
+    def test_identity_without_accept_encoding(self, compressed_client):
+        """Test clients that accept no coding get the plain body."""
+        response = _get(compressed_client, "/big", accept="identity")
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"abc"'
+
+    def test_small_and_binary_bodies_pass_through(self, compressed_client):
+        """Test bodies under the threshold and non-text types stay as they are."""
+        for path in ("/small", "/image"):
+            assert "content-encoding" not in _get(compressed_client, path).headers
+
+    def test_streamed_body_is_compressed(self, compressed_client):
+        """Test a streamed page is compressed as one valid gzip stream."""
+        response = _get(compressed_client, "/stream")
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == "".join(f"<p>chunk {i}</p>" for i in range(3))
+
+    def test_app_pages_are_compressed(self, authenticated_client, test_list):
+        """Test the app itself serves its HTML compressed."""
+        response = authenticated_client.get(
+            f"/app/lists/{test_list.id}", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Test List" in response.text
+
+    def test_accepted_encodings(self):
+        """Test q=0 excludes a coding and names are case-insensitive."""
+        assert accepted_encodings("GZip, br;q=0, zstd;q=0.5") == {"gzip", "zstd"}
+
+    def test_unknown_encoding_is_rejected(self):
+        """Test a typo in COMPRESSION_ENCODINGS fails at startup."""
+        with pytest.raises(ValueError, match="Unknown compression encoding"):
+            available_encodings(["gzip", "lzma"])
+
+
+class TestTrimWhitespace:
+    """Tests for the TEMPLATE_TRIM_WHITESPACE option."""
+
+    def test_trimmed_output_is_smaller_and_equivalent(self, tmp_path, test_todo):
+        """Test trimming drops indentation but keeps the rendered content."""
+        # Pinned, so a TEMPLATE_TRIM_WHITESPACE in the environment cannot leak in
+        plain = create_environment(
+            Settings(template_cache_dir=str(tmp_path), template_trim_whitespace=False)
+        )
+        trimmed = create_environment(
+            Settings(template_cache_dir=str(tmp_path), template_trim_whitespace=True)
+        )
+        name = "partials/todo_item.html"
+        before = plain.get_template(name).render(todo=test_todo)
+        after = trimmed.get_template(name).render(todo=test_todo)
+
+        assert len(after) < len(before)
+        assert "\n " not in after
+        assert after.split() == before.split()
@@ -0,0 +1,185 @@
+"""Tests for database engine configuration."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import Settings
+from app.database import (
+    Todo,
+    TodoList,
+    async_database_url,
+    create_async_db_engine,
+    create_db_engine,
+)
+from app.ids import uuid7
+from app.migrations import rebuild_list_counts, upgrade_schema
+
+
+class TestEngineProfiles:
+    """Tests for the selectable engine profiles."""
+
+    def test_development_profile_uses_null_pool(self, tmp_path):
+        """Test development profile keeps one connection per session."""
+        engine = create_db_engine(
+            f"sqlite:///{tmp_path}/dev.db", Settings(db_profile="development")
+        )
+        assert isinstance(engine.pool, NullPool)
+
+        with engine.connect() as conn:
+            mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+        assert mode == "delete"
+        engine.dispose()
+
+    def test_production_profile_pools_and_applies_pragmas(self, tmp_path):
+        """Test production profile pools connections and enables WAL."""
+        config = Settings(
+            db_profile="production",
+            sqlite_synchronous="normal",
+            sqlite_mmap_size=1024 * 1024,
+            sqlite_cache_size=-2000,
+            sqlite_temp_store="memory",
+            sqlite_busy_timeout=1234,
+        )
+        engine = create_db_engine(f"sqlite:///{tmp_path}/prod.db", config)
+        assert isinstance(engine.pool, QueuePool)
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA mmap_size")).scalar() == 1024 * 1024
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -2000
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        engine.dispose()
+
+    def test_unknown_profile_rejected(self):
+        """Test an unknown profile name fails loudly."""
+        with pytest.raises(ValueError):
+            create_db_engine("sqlite://", Settings(db_profile="turbo"))
+
+    def test_invalid_pragma_value_rejected(self):
+        """Test PRAGMA values are validated before being interpolated."""
+        config = Settings(db_profile="production", sqlite_synchronous="NORMAL; DROP")
+        with pytest.raises(ValueError):
+            create_db_engine("sqlite://", config)
+
+
+class TestAsyncEngine:
+    """Tests for the aiosqlite engine used by the routers."""
+
+    def test_async_database_url(self):
+        """Test sync SQLite URLs map onto the aiosqlite driver."""
+        assert async_database_url("sqlite:///./todo.db") == "sqlite+aiosqlite:///./todo.db"
+        assert async_database_url("sqlite://") == "sqlite+aiosqlite://"
+
+    def test_async_production_profile_applies_pragmas(self, tmp_path):
+        """Test the async engine shares the production profile."""
+        engine = create_async_db_engine(
+            f"sqlite:///{tmp_path}/prod.db", Settings(db_profile="production")
+        )
+        assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+
+        async def journal_mode():
+            async with engine.connect() as conn:
+                mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            await engine.dispose()
+            return mode
+
+        assert asyncio.run(journal_mode()) == "wal"
+
+
+class TestSchemaUpgrades:
+    """Tests for upgrading database files created by older versions."""
+
+    def test_upgrades_legacy_database(self, tmp_path):
+        """Test an old file gains counters, ordering keys, BLOB ids, search and versions."""
+        user_id = "0b6c1a8e-5f0e-4d43-9d2a-3c1f2e4b5a61"
+        list_id = "9f1e2d3c-4b5a-4968-8776-a5b4c3d2e1f0"
+        t1, t2, t3 = (f"00000000-0000-4000-8000-00000000000{i}" for i in (1, 2, 3))
+        engine = create_db_engine(f"sqlite:///{tmp_path}/old.db", Settings())
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE users (id VARCHAR(36) PRIMARY KEY, email VARCHAR(255), password VARCHAR(255), created_at DATETIME)"))
+            conn.execute(text("CREATE TABLE todo_lists (id VARCHAR(36) PRIMARY KEY, user_id VARCHAR(36), name VARCHAR(100), description TEXT, color VARCHAR(7), position INTEGER, created_at DATETIME, updated_at DATETIME)"))
+            conn.execute(text("CREATE TABLE todos (id VARCHAR(36) PRIMARY KEY, list_id VARCHAR(36), title VARCHAR(200), note TEXT, is_completed BOOLEAN, completed_at DATETIME, due_date DATETIME, priority VARCHAR(10), position INTEGER, created_at DATETIME, updated_at DATETIME)"))
+            conn.execute(text("CREATE INDEX ix_todos_list_position ON todos (list_id, position)"))
+            conn.execute(text(f"INSERT INTO users (id, email, password) VALUES ('{user_id}', 'a@b.c', 'x')"))
+            conn.execute(text(f"INSERT INTO todo_lists (id, user_id, name) VALUES ('{list_id}', '{user_id}', 'List')"))
+            conn.execute(text(f"INSERT INTO todos (id, list_id, title, is_completed, position) VALUES ('{t1}', '{list_id}', 'a', 0, 2), ('{t2}', '{list_id}', 'b', 1, 0), ('{t3}', '{list_id}', 'c', 0, 1)"))
+
+        upgrade_schema(engine)
+
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT open_count, total_count FROM todo_lists")).one()
+            positions = conn.execute(select(Todo.id, Todo.position).order_by(Todo.position)).all()
+            id_types = conn.execute(text("SELECT DISTINCT typeof(id), typeof(list_id) FROM todos")).all()
+            hits = conn.execute(text("SELECT rowid FROM todos_fts WHERE todos_fts MATCH 'b'")).all()
+            indexes = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'todos' AND sql IS NOT NULL")).scalars().all()
+        assert tuple(row) == (2, 3)
+        # Legacy integer positions become ordering keys, order preserved
+        assert [tuple(p) for p in positions] == [(t2, "a0"), (t3, "a1"), (t1, "a2")]
+        # Keys are stored as 16-byte BLOBs but keep their string form
+        assert [tuple(t) for t in id_types] == [("blob", "blob")]
+        # Existing todos are indexed for full-text search
+        assert len(hits) == 1
+        # The pagination index is replaced by the (position, id) one
+        assert "ix_todos_list_position_id" in indexes
+        assert "ix_todos_list_position" not in indexes
+
+        with Session(engine) as session:
+            todo_list = session.get(TodoList, list_id)
+            assert todo_list.user.id == user_id
+            assert len(todo_list.todos) == 3
+            # Change counters for conditional GETs are maintained from now on
+            todo_list.todos[0].title = "changed"
+            session.commit()
+            assert todo_list.version == 1
+
+        # Second run is a no-op
+        upgrade_schema(engine)
+        engine.dispose()
+
+    def test_rebuild_list_counts_repairs_drift(self, db_session, test_todo, test_list):
+        """Test the repair step recomputes counters from the todos table."""
+        test_list.open_count = 42
+        test_list.total_count = 42
+        db_session.commit()
+
+        rebuild_list_counts(db_session)
+        db_session.commit()
+        db_session.refresh(test_list)
+        assert test_list.open_count == 1
+        assert test_list.total_count == 1
+
+    def test_rebuild_list_counts_null_completed_is_open(
+        self, db_session, test_todo, test_list
+    ):
+        """Test legacy todos with a NULL is_completed are counted as open."""
+        db_session.execute(update(Todo).values(is_completed=None))
+        db_session.commit()
+
+        rebuild_list_counts(db_session)
+        db_session.commit()
+        db_session.refresh(test_list)
+        assert test_list.open_count == 1
+
+
+class TestKeys:
+    """Tests for the time-ordered primary keys."""
+
+    def test_uuid7_is_time_ordered(self):
+        """Test ids are version 7 and increase in generation order."""
+        ids = [uuid7() for _ in range(1000)]
+        assert all(i.version == 7 for i in ids)
+        assert [i.bytes for i in ids] == sorted(i.bytes for i in ids)
+
+    def test_ids_stored_as_blobs(self, db_session, test_todo):
+        """Test keys take 16 bytes on disk and read back as strings."""
+        stored = db_session.execute(
+            text("SELECT typeof(id), length(id), typeof(list_id) FROM todos")
+        ).one()
+        assert tuple(stored) == ("blob", 16, "blob")
+        assert db_session.get(Todo, test_todo.id).id == test_todo.id
@@ -0,0 +1,51 @@
+"""Tests for the synthetic data generator."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app.database import Todo, TodoList, User
+from app.datagen import generate, generate_rows
+from app.migrations import rebuild_list_counts
+
+AS_OF = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def test_generate_inserts_users_lists_and_todos(db_session):
+    """Test every user gets its lists and todos, with correct list counters."""
+    counts = generate(db_session.get_bind(), 3, 4, 25, seed=1, as_of=AS_OF, batch_size=70)
+    assert (counts.users, counts.lists, counts.todos) == (3, 12, 300)
+    assert db_session.scalar(select(func.count(User.id))) == 3
+    assert db_session.scalar(select(func.count(Todo.id))) == 300
+
+    written = db_session.execute(
+        select(TodoList.id, TodoList.open_count, TodoList.total_count)
+    ).all()
+    rebuild_list_counts(db_session)
+    db_session.commit()
+    rebuilt = db_session.execute(
+        select(TodoList.id, TodoList.open_count, TodoList.total_count)
+    ).all()
+    assert sorted(written) == sorted(rebuilt)
+
+
+def test_generate_rows_is_reproducible():
+    """Test one seed and date always give the same rows, ids included."""
+    first = list(generate_rows(2, 2, 10, seed=7, as_of=AS_OF))
+    assert first == list(generate_rows(2, 2, 10, seed=7, as_of=AS_OF))
+    assert first != list(generate_rows(2, 2, 10, seed=8, as_of=AS_OF))
+
+
+def test_generated_todos_are_plausible():
+    """Test dates, priorities and ids follow the app's own invariants."""
+    _, _, todos = next(generate_rows(1, 1, 500, seed=3, as_of=AS_OF))
+    assert {todo["priority"] for todo in todos} == {"low", "medium", "high"}
+    assert 0 < sum(todo["is_completed"] for todo in todos) < len(todos)
+    assert 0 < sum(todo["note"] is None for todo in todos) < len(todos)
+    assert all(len(todo["title"]) <= 200 for todo in todos)
+    for todo in todos:
+        assert todo["created_at"] <= todo["updated_at"] <= AS_OF
+        if todo["completed_at"] is not None:
+            assert todo["created_at"] <= todo["completed_at"] <= AS_OF
+    ids = [todo["id"] for todo in todos]
+    assert ids == sorted(ids)
@@ -0,0 +1,88 @@
+"""Tests for the rendered todo fragment cache."""
+
+from datetime import date
+
+from markupsafe import Markup
+
+from app.core import fragments
+from app.core.fragments import FragmentCache, todo_fragments
+from app.database import Todo
+
+
+class TestFragmentCache:
+    """Tests for the LRU cache itself."""
+
+    def test_version_mismatch_is_a_miss(self):
+        """Test an entry is only served for the version it was stored with."""
+        cache = FragmentCache(max_bytes=1000)
+        cache.put("a", (1,), Markup("<p>a</p>"))
+        assert cache.get("a", (1,)) == "<p>a</p>"
+        assert cache.get("a", (2,)) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used_over_cap(self):
+        """Test the size cap drops the least recently used fragments."""
+        cache = FragmentCache(max_bytes=20)
+        cache.put("a", (1,), Markup("x" * 8))
+        cache.put("b", (1,), Markup("x" * 8))
+        cache.get("a", (1,))
+        cache.put("c", (1,), Markup("x" * 8))
+
+        assert cache.get("b", (1,)) is None
+        assert cache.get("a", (1,)) is not None
+        assert cache.get("c", (1,)) is not None
+        assert cache.size == 16
+
+    def test_oversized_fragment_not_stored(self):
+        """Test a fragment larger than the cap is rendered but not kept."""
+        cache = FragmentCache(max_bytes=4)
+        cache.put("a", (1,), Markup("too long"))
+        assert len(cache) == 0
+        assert cache.size == 0
+
+
+class TestTodoFragments:
+    """Tests for list views assembled from cached todo fragments."""
+
+    def test_list_view_reuses_fragments(self, authenticated_client, test_todo):
+        """Test the second render of a list serves the todo from cache."""
+        url = f"/api/lists/{test_todo.list_id}"
+        first = authenticated_client.get(url).text
+        hits = todo_fragments.hits
+        second = authenticated_client.get(url).text
+
+        assert todo_fragments.hits == hits + 1
+        assert first == second
+        assert f'id="todo-{test_todo.id}"' in second
+
+    def test_writes_invalidate(self, authenticated_client, test_todo):
+        """Test a toggle re-renders the item instead of serving old HTML."""
+        url = f"/api/lists/{test_todo.list_id}"
+        authenticated_client.get(url)
+        authenticated_client.patch(f"/api/todos/{test_todo.id}/toggle")
+
+        assert "todo-item completed" in authenticated_client.get(url).text
+
+        authenticated_client.delete(f"/api/todos/{test_todo.id}")
+        assert len(todo_fragments) == 0
+
+    def test_outside_writes_are_not_served_stale(
+        self, authenticated_client, test_todo, db_session
+    ):
+        """Test a write this process did not see still changes the version."""
+        url = f"/api/lists/{test_todo.list_id}"
+        authenticated_client.get(url)
+
+        test_todo.title = "Changed elsewhere"
+        db_session.commit()
+        assert "Changed elsewhere" in authenticated_client.get(url).text
+
+    def test_new_day_rerenders(self, authenticated_client, test_todo, monkeypatch):
+        """Test overdue styling is recomputed when the date changes."""
+        url = f"/api/lists/{test_todo.list_id}"
+        authenticated_client.get(url)
+        misses = todo_fragments.misses
+
+        monkeypatch.setattr(fragments, "_today", lambda: date(2999, 1, 1))
+        authenticated_client.get(url)
+        assert todo_fragments.misses == misses + 1
@@ -0,0 +1,84 @@
+"""Tests for the /metrics endpoint."""
+
+import asyncio
+import os
+
+import pytest
+
+from app.core import metrics
+
+
+@pytest.fixture
+def registry():
+    metrics.registry.clear()
+    yield metrics.registry
+    metrics.registry.clear()
+
+
+def _samples(text: str) -> dict[str, float]:
+    """Sample lines of an exposition, by name and labels."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+class TestMetricsEndpoint:
+    """Tests for the metrics collected while serving requests."""
+
+    def test_requests_are_counted_by_route(
+        self, registry, authenticated_client, test_list
+    ):
+        """Test counters and histograms use the route template, not the URL."""
+        for _ in range(2):
+            authenticated_client.get(f"/api/lists/{test_list.id}")
+        response = authenticated_client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        samples = _samples(response.text)
+        route = 'method="GET",route="/api/lists/{list_id}"'
+        assert samples[f'todo_http_requests_total{{{route},status="200"}}'] == 2
+        histogram = "todo_http_request_duration_seconds"
+        assert samples[f'{histogram}_bucket{{{route},le="+Inf"}}'] == 2
+        assert samples[f"{histogram}_count{{{route}}}"] == 2
+        assert samples["todo_db_statements_total"] >= 2
+        assert f'todo_sessions{{pid="{os.getpid()}"}}' in samples
+        assert "# TYPE todo_fragment_cache_hit_ratio gauge" in response.text
+
+    def test_server_errors_are_counted(self, registry):
+        """Test 5xx responses also count as errors."""
+        metrics.record_request("GET", "/x", 503, 0.2)
+        metrics.record_request("GET", "/x", 200, 0.01)
+
+        samples = _samples(metrics.render(metrics.merge([registry.snapshot()])))
+        assert samples['todo_http_request_errors_total{method="GET",route="/x"}'] == 1
+        bucket = 'todo_http_request_duration_seconds_bucket{method="GET",route="/x",le='
+        assert samples[bucket + '"0.01"}'] == 1
+        assert samples[bucket + '"0.25"}'] == 2
+
+
+class TestWorkerAggregation:
+    """Tests for merging the workers' snapshot files."""
+
+    def test_counters_sum_and_dead_gauges_drop(self, registry, tmp_path):
+        """Test every worker's counts are summed, but only live workers' gauges kept."""
+        registry.inc("todo_db_statements_total", amount=3)
+        # A worker that has exited (pid 2**22 + 1 is above Linux's pid_max)
+        dead = registry.snapshot() | {"pid": 2**22 + 1}
+        dead["gauges"] = [["todo_sessions", [], 7]]
+        metrics.write_snapshot(dead, str(tmp_path))
+
+        text = asyncio.run(metrics.exposition(str(tmp_path)))
+        samples = _samples(text)
+
+        assert samples["todo_db_statements_total"] >= 6
+        assert f'todo_sessions{{pid="{2**22 + 1}"}}' not in samples
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+            [f"metrics-{os.getpid()}.json", f"metrics-{2**22 + 1}.json"]
+        )
+
+    def test_label_values_are_escaped(self):
+        """Test quotes and backslashes cannot break the exposition format."""
+        assert metrics._labels([("route", 'a"b\\c')]) == '{route="a\\"b\\\\c"}'
@@ -0,0 +1,74 @@
+"""Tests for fractional ordering keys."""
+
+import random
+
+import pytest
+
+from app.ordering import integer_key, key_between
+
+
+class TestKeyBetween:
+    """Tests for generating keys between neighbours."""
+
+    def test_first_key(self):
+        """Test an empty list starts at a0."""
+        assert key_between(None, None) == "a0"
+
+    def test_append_and_prepend(self):
+        """Test keys before/after an existing key."""
+        assert key_between("a0", None) == "a1"
+        assert key_between(None, "a0") == "Zz"
+        assert key_between("az", None) == "b00"
+
+    def test_between_adjacent_integers(self):
+        """Test a fractional digit is added when integers are adjacent."""
+        key = key_between("a0", "a1")
+        assert "a0" < key < "a1"
+
+    def test_random_inserts_stay_sorted(self):
+        """Test many random inserts keep keys strictly ordered and short."""
+        rng = random.Random(42)
+        keys: list[str] = []
+        for _ in range(2000):
+            index = rng.randint(0, len(keys))
+            before = keys[index - 1] if index > 0 else None
+            after = keys[index] if index < len(keys) else None
+            keys.insert(index, key_between(before, after))
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+        assert max(len(k) for k in keys) < 10
+
+    def test_repeated_appends_stay_short(self):
+        """Test appending 10k items keeps keys compact."""
+        key = None
+        for _ in range(10_000):
+            key = key_between(key, None)
+        assert len(key) <= 4
+
+    def test_rejects_unordered_bounds(self):
+        """Test bounds must be ordered."""
+        with pytest.raises(ValueError):
+            key_between("a1", "a0")
+
+    def test_rejects_invalid_key(self):
+        """Test legacy or corrupt keys are rejected."""
+        with pytest.raises(ValueError):
+            key_between("0", None)
+
+
+class TestIntegerKey:
+    """Tests for evenly spaced slot keys."""
+
+    def test_integer_keys_sort_like_integers(self):
+        """Test slot keys sort in index order across length changes."""
+        keys = [integer_key(i) for i in range(5000)]
+        assert keys == sorted(keys)
+        assert keys[0] == "a0"
+        assert keys[61] == "az"
+        assert keys[62] == "b10"
+
+    def test_integer_keys_leave_room_between(self):
+        """Test a key always fits between two consecutive slots."""
+        for i in (0, 61, 62, 3843):
+            key = key_between(integer_key(i), integer_key(i + 1))
+            assert integer_key(i) < key < integer_key(i + 1)
@@ -0,0 +1,124 @@
+"""Query budgets: every route's SQL statement count, held against growth.
+
+Each request runs against a user with several lists of several todos, so a
+query per list or per todo would exceed its budget or trip the N+1 check
+in ``assert_max_queries``.
+"""
+
+import pytest
+
+from app.database import Todo, TodoList
+
+LISTS = 4
+TODOS_PER_LIST = 6
+
+
+@pytest.fixture
+def data(db_session, test_user):
+    """Lists and todos for the budgeted requests, by role."""
+    lists = [
+        TodoList(user_id=test_user.id, name=f"List {i}", position=i)
+        for i in range(LISTS)
+    ]
+    db_session.add_all(lists)
+    db_session.commit()
+    todos = [
+        Todo(list_id=todo_list.id, title=f"Todo {i}", position=i)
+        for todo_list in lists
+        for i in range(TODOS_PER_LIST)
+    ]
+    db_session.add_all(todos)
+    db_session.commit()
+    return {
+        "list": lists[0].id,
+        "other_list": lists[-1].id,
+        "list_ids": [todo_list.id for todo_list in reversed(lists)],
+        "todo": todos[0].id,
+        "next_todo": todos[1].id,
+    }
+
+
+# (method, url, form data, statement budget); urls and data are formatted
+# with the ``data`` fixture's ids
+ROUTES = [
+    # api
+    ("get", "/health", None, 0),
+    ("get", "/metrics", None, 0),
+    # pages
+    ("get", "/", None, 0),
+    ("get", "/login", None, 0),
+    ("get", "/register", None, 0),
+    ("get", "/app", None, 2),
+    ("get", "/app/lists/{list}", None, 3),
+    # todo_lists
+    ("get", "/api/lists", None, 2),
+    ("post", "/api/lists", {"name": "New list"}, 2),
+    ("get", "/api/lists/{list}", None, 2),
+    ("get", "/api/lists/{list}/todos?after=0", None, 1),
+    ("put", "/api/lists/{list}", {"name": "Renamed"}, 2),
+    ("post", "/api/lists/reorder", {"list_id": "{list_ids}"}, 2),
+    ("delete", "/api/lists/{other_list}", None, 2),
+    # todos
+    ("get", "/api/todos/search?q=Todo", None, 1),
+    ("post", "/api/todos", {"list_id": "{list}", "title": "New todo"}, 2),
+    ("get", "/api/todos/{todo}", None, 1),
+    ("put", "/api/todos/{todo}", {"title": "Edited"}, 1),
+    ("patch", "/api/todos/{todo}/toggle", None, 2),
+    ("post", "/api/todos/{todo}/reorder", {"after_id": "{next_todo}"}, 2),
+    ("delete", "/api/todos/{todo}", None, 2),
+    # auth
+    ("post", "/auth/logout", None, 0),
+]
+
+
+def _fill(value, data):
+    if value == "{list_ids}":
+        return data["list_ids"]
+    return value.format(**data) if isinstance(value, str) else value
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "form", "budget"),
+    ROUTES,
+    ids=[f"{method.upper()} {url}" for method, url, _, _ in ROUTES],
+)
+def test_route_query_budget(
+    authenticated_client, data, assert_max_queries, method, url, form, budget
+):
+    """Test the route stays within its statement budget, without N+1s."""
+    kwargs = {"follow_redirects": False}
+    if form:
+        kwargs["data"] = {key: _fill(value, data) for key, value in form.items()}
+    with assert_max_queries(budget):
+        response = getattr(authenticated_client, method)(_fill(url, data), **kwargs)
+    assert response.status_code < 400, response.text
+
+
+@pytest.mark.parametrize(
+    ("url", "form", "budget"),
+    [
+        ("/auth/login", {"email": "test@example.com", "password": "testpass123"}, 1),
+        (
+            "/auth/register",
+            {
+                "email": "new@example.com",
+                "password": "password123",
+                "confirm_password": "password123",
+            },
+            2,
+        ),
+    ],
+)
+def test_auth_query_budget(client, test_user, assert_max_queries, url, form, budget):
+    """Test logging in and registering stay within their budgets."""
+    with assert_max_queries(budget):
+        response = client.post(url, data=form, follow_redirects=False)
+    assert response.status_code < 400
+
+
+def test_assert_max_queries_catches_n_plus_one(assert_max_queries, db_session, data):
+    """Test a per-row query fails the check even within the total budget."""
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with assert_max_queries(100):
+            for todo_list in db_session.query(TodoList).all():
+                db_session.query(Todo).filter(Todo.list_id == todo_list.id).count()
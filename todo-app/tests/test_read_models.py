@@ -0,0 +1,41 @@
+"""Tests for the rendering-only read models."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.access import load_todo_page
+from app.database import Todo
+from app.read_models import TodoRow
+
+
+class TestTodoRow:
+    """Tests for ``TodoRow`` and the paths that load it."""
+
+    def test_has_no_instance_dict(self):
+        """Test rows are slotted, so they carry no per-instance dict."""
+        row = TodoRow("id", "title", None, False, None, "low", "a0", None)
+        assert not hasattr(row, "__dict__")
+        with pytest.raises(AttributeError):
+            row.list_id = "x"
+
+    def test_page_is_not_tracked_by_session(self, app_engine, test_list, db_session):
+        """Test a loaded page holds read models and leaves the identity map empty."""
+        db_session.add_all(
+            [
+                Todo(list_id=test_list.id, title="With note", note="n", position=0),
+                Todo(list_id=test_list.id, title="No note", position=1),
+            ]
+        )
+        db_session.commit()
+
+        async def load():
+            async with AsyncSession(app_engine) as db:
+                todos, _ = await load_todo_page(db, test_list.id)
+                return todos, len(db.identity_map)
+
+        todos, tracked = asyncio.run(load())
+        assert [type(todo) for todo in todos] == [TodoRow, TodoRow]
+        assert [todo.note for todo in todos] == ["n", None]
+        assert tracked == 0
@@ -0,0 +1,251 @@
+"""Tests for the session stores."""
+
+import sqlite3
+import time
+
+import pytest
+
+from app.core import sessions as sessions_module
+from app.core.config import Settings
+from app.core.sessions import (
+    MemorySessionStore,
+    SignedSessionStore,
+    SQLiteSessionStore,
+    create_session_store,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.time() inside the session stores."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(sessions_module.time, "time", lambda: now[0])
+    return now
+
+
+class TestMemorySessionStore:
+    """Tests for the per-process store."""
+
+    def test_round_trip(self, clock):
+        """Test a created session can be read and deleted."""
+        store = MemorySessionStore(ttl=60, max_sessions=10)
+        session_id = store.create("user-1")
+
+        session = store.get(session_id)
+        assert session["user_id"] == "user-1"
+        assert session["expires"].timestamp() == clock[0] + 60
+
+        store.delete(session_id)
+        assert store.get(session_id) is None
+
+    def test_expired_sessions_evicted_without_lookup(self, clock):
+        """Test expired entries go away even if their cookie never returns."""
+        store = MemorySessionStore(ttl=60, max_sessions=1000)
+        for i in range(100):
+            store.create(f"user-{i}")
+        assert len(store) == 100
+
+        clock[0] += 61
+        fresh = store.create("late")
+        assert len(store) == 1
+        assert store.get(fresh)["user_id"] == "late"
+
+    def test_max_sessions_drops_oldest(self, clock):
+        """Test the size cap evicts the session closest to expiry."""
+        store = MemorySessionStore(ttl=60, max_sessions=2)
+        first = store.create("a")
+        clock[0] += 1
+        second = store.create("b")
+        clock[0] += 1
+        third = store.create("c")
+
+        assert len(store) == 2
+        assert store.get(first) is None
+        assert store.get(second) is not None
+        assert store.get(third) is not None
+
+    def test_deleted_entries_do_not_accumulate(self, clock):
+        """Test the expiry heap is compacted after many logouts."""
+        store = MemorySessionStore(ttl=60, max_sessions=1000)
+        for _ in range(500):
+            store.delete(store.create("user"))
+        assert len(store) == 0
+        assert len(store._sessions._expiry) <= 64
+
+
+class TestSQLiteSessionStore:
+    """Tests for the store shared between worker processes."""
+
+    def test_shared_between_store_instances(self, tmp_path, clock):
+        """Test two stores on one file (as two workers would) see each other."""
+        path = str(tmp_path / "sessions.db")
+        worker_a = SQLiteSessionStore(path, ttl=60)
+        worker_b = SQLiteSessionStore(path, ttl=60)
+
+        session_id = worker_a.create("user-1")
+        assert worker_b.get(session_id)["user_id"] == "user-1"
+
+        worker_b.delete(session_id)
+        assert worker_a.get(session_id) is None
+
+    def test_expired_sessions_rejected_and_purged(self, tmp_path, clock):
+        """Test expiry hides sessions at once and purges them on later writes."""
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60, purge_interval=0)
+        old = store.create("user-1")
+
+        clock[0] += 61
+        assert store.get(old) is None
+        store.create("user-2")
+        assert len(store) == 1
+
+    def test_lock_wait_is_bounded(self, tmp_path):
+        """Test a write blocked by another worker fails fast instead of stalling."""
+        path = str(tmp_path / "sessions.db")
+        store = SQLiteSessionStore(path, ttl=60, busy_timeout=0.05)
+        session_id = store.create("user-1")
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            # Reads are not blocked by the other worker's write lock
+            assert store.get(session_id)["user_id"] == "user-1"
+            start = time.monotonic()
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                store.create("user-2")
+            assert time.monotonic() - start < 1
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+    def test_login_while_locked_is_retryable(
+        self, tmp_path, client, test_user, monkeypatch
+    ):
+        """Test a login blocked by another worker's write answers 503, not 500."""
+        from app.core import deps
+
+        path = str(tmp_path / "sessions.db")
+        monkeypatch.setattr(
+            deps, "sessions", SQLiteSessionStore(path, ttl=60, busy_timeout=0.05)
+        )
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            response = client.post(
+                "/auth/login",
+                data={"email": test_user.email, "password": "testpass123"},
+            )
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert "session_id" not in response.cookies
+
+
+class TestSignedSessionStore:
+    """Tests for stateless HMAC-signed session cookies."""
+
+    def test_verified_by_any_worker_with_the_secret(self, clock):
+        """Test a token from one store validates in another without storage."""
+        worker_a = SignedSessionStore("s3cret", ttl=60, max_revoked=10)
+        worker_b = SignedSessionStore("s3cret", ttl=60, max_revoked=10)
+
+        token = worker_a.create("user-1")
+        session = worker_b.get(token)
+        assert session["user_id"] == "user-1"
+        assert session["expires"].timestamp() == int(clock[0]) + 60
+
+    def test_tampered_or_foreign_tokens_rejected(self, clock):
+        """Test edited payloads and other secrets fail verification."""
+        store = SignedSessionStore("s3cret", ttl=60, max_revoked=10)
+        token = store.create("user-1")
+        user_id, expires, token_id, signature = token.split(".")
+
+        assert store.get(f"user-2.{expires}.{token_id}.{signature}") is None
+        assert store.get(f"{user_id}.{int(expires) + 999}.{token_id}.{signature}") is None
+        assert store.get(SignedSessionStore("other", 60, 10).create("user-1")) is None
+        assert store.get("garbage") is None
+        assert store.get("ünïcode.sig") is None
+
+    def test_expired_token_rejected(self, clock):
+        """Test the embedded expiry is enforced."""
+        store = SignedSessionStore("s3cret", ttl=60, max_revoked=10)
+        token = store.create("user-1")
+        clock[0] += 61
+        assert store.get(token) is None
+
+    def test_logout_revokes_until_expiry(self, clock):
+        """Test deleting a token revokes it and the entry is later dropped."""
+        store = SignedSessionStore("s3cret", ttl=60, max_revoked=10)
+        token = store.create("user-1")
+        other = store.create("user-1")
+
+        store.delete(token)
+        assert store.get(token) is None
+        assert store.get(other) is not None
+        assert len(store) == 1
+
+        clock[0] += 61
+        store.delete(other)
+        assert len(store) == 0
+
+    def test_full_revocation_set_fails_closed(self, clock):
+        """Test no revoked token is accepted again when the set is full."""
+        store = SignedSessionStore("s3cret", ttl=60, max_revoked=2)
+        tokens = [store.create("user-1") for _ in range(3)]
+
+        for token in tokens:
+            store.delete(token)
+        assert [store.get(token) for token in tokens] == [None] * 3
+
+        # Tokens issued after the cutoff are unaffected
+        clock[0] += 1
+        assert store.get(store.create("user-1")) is not None
+
+    def test_secret_required(self):
+        """Test the signed backend refuses to run without a secret."""
+        with pytest.raises(ValueError):
+            create_session_store(Settings(session_backend="signed", session_secret=""))
+
+
+class TestSessionBackendSelection:
+    """Tests for choosing a backend from settings."""
+
+    def test_backends(self, tmp_path):
+        """Test SESSION_BACKEND picks the store implementation."""
+        assert isinstance(create_session_store(Settings(session_backend="memory")), MemorySessionStore)
+        sqlite_store = create_session_store(
+            Settings(session_backend="sqlite", session_db_path=str(tmp_path / "s.db"))
+        )
+        assert isinstance(sqlite_store, SQLiteSessionStore)
+
+    def test_unknown_backend_rejected(self):
+        """Test an unknown backend name fails loudly."""
+        with pytest.raises(ValueError):
+            create_session_store(Settings(session_backend="redis"))
+
+
+class TestSignedSessionsInApp:
+    """Tests for the app running with signed session cookies."""
+
+    def test_login_request_logout(self, client, test_user, monkeypatch):
+        """Test the cookie flow and 401 handling are unchanged in signed mode."""
+        from app.core import deps
+
+        monkeypatch.setattr(deps, "sessions", SignedSessionStore("s3cret", 3600, 100))
+
+        response = client.post(
+            "/auth/login",
+            data={"email": test_user.email, "password": "testpass123"},
+        )
+        token = response.cookies["session_id"]
+        assert token.startswith(f"{test_user.id}.")
+        assert 'Max-Age=3600' in response.headers["set-cookie"]
+
+        client.cookies.set("session_id", token)
+        assert client.get("/api/lists").status_code == 200
+
+        client.post("/auth/logout")
+        client.cookies.set("session_id", token)
+        response = client.get("/api/lists", headers={"HX-Request": "true"})
+        assert response.status_code == 401
+        assert response.headers["HX-Redirect"].startswith("/login")
@@ -0,0 +1,94 @@
+"""Tests for the slow-statement log and its report."""
+
+import json
+
+import pytest
+
+from app import cli
+from app.core.config import Settings
+from app.core.slow_queries import (
+    disable_slow_query_log,
+    enable_slow_query_log,
+    read_log,
+    recommend,
+    summarize,
+)
+
+
+@pytest.fixture
+def slow_log(client, tmp_path):
+    """Log every statement (threshold 0) to a temporary file."""
+    # After the client, whose lifespan applies the SLOW_QUERY_MS setting
+    path = tmp_path / "slow.jsonl"
+    enable_slow_query_log(0, path)
+    yield path
+    disable_slow_query_log()
+
+
+class TestSlowQueryLog:
+    """Tests for capturing slow statements."""
+
+    def test_statements_are_logged_with_plan(
+        self, slow_log, authenticated_client, test_list, test_todo
+    ):
+        """Test the app's async queries are logged with their query plan."""
+        authenticated_client.get("/api/todos/search", params={"q": "Test"})
+
+        entries = read_log(slow_log)
+        search = next(e for e in entries if "todos_fts" in e["statement"])
+        assert search["ms"] >= 0
+        assert search["plan"] and not search["plan"][0].startswith("(no plan")
+
+    def test_parameters_are_redacted(self, slow_log, authenticated_client, test_list):
+        """Test user data never reaches the log, only its type and size."""
+        authenticated_client.post(
+            "/api/todos", data={"list_id": test_list.id, "title": "Secret plans"}
+        )
+
+        text = slow_log.read_text()
+        assert "Secret plans" not in text
+        assert "<str 12>" in text
+
+    def test_threshold_accepts_fractional_ms(self, monkeypatch):
+        """Test a sub-millisecond ``SLOW_QUERY_MS`` is a valid setting."""
+        monkeypatch.setenv("SLOW_QUERY_MS", "0.5")
+        assert Settings().slow_query_ms == 0.5
+
+    def test_disabled_logs_nothing(self, tmp_path, authenticated_client, test_list):
+        """Test nothing is written without a threshold."""
+        authenticated_client.get(f"/api/lists/{test_list.id}")
+        assert not (tmp_path / "slow.jsonl").exists()
+
+
+class TestSlowQueryReport:
+    """Tests for ``todo-app slow-queries``."""
+
+    SCAN = "SELECT todos.id FROM todos WHERE todos.priority = ? ORDER BY todos.due_date"
+
+    def test_scan_gets_an_index_recommendation(self):
+        """Test a full scan filtered on a column suggests indexing it."""
+        advice = recommend(self.SCAN, ["SCAN todos", "USE TEMP B-TREE FOR ORDER BY"])
+
+        assert advice[0] == "CREATE INDEX ix_todos_priority ON todos (priority);"
+        assert "(todos.due_date)" in advice[1]
+
+    def test_index_search_needs_nothing(self):
+        """Test a plan that already uses an index gets no advice."""
+        plan = ["SEARCH todos USING INDEX ix_todos_list_position_id (list_id=?)"]
+        assert recommend("SELECT ... WHERE todos.list_id = ?", plan) == []
+
+    def test_report_ranks_by_total_time(self, tmp_path, capsys):
+        """Test the CLI groups runs by shape, worst total first."""
+        log = tmp_path / "slow.jsonl"
+        entries = [
+            {"ms": 5, "statement": "SELECT 1 WHERE x IN (?, ?)", "plan": []},
+            {"ms": 7, "statement": "SELECT 1 WHERE x IN (?)", "plan": []},
+            {"ms": 9, "statement": self.SCAN, "plan": ["SCAN todos"]},
+        ]
+        log.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+        assert [item.count for item in summarize(entries)] == [2, 1]
+        cli.main(["slow-queries", "--log", str(log)])
+        out = capsys.readouterr().out
+        assert out.startswith("1. 2 x, total 12.0 ms")
+        assert "-> CREATE INDEX ix_todos_priority" in out
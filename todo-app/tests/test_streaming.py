@@ -0,0 +1,128 @@
+"""Tests for streamed list rendering."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.access import todo_page_statement
+from app.core.config import settings
+from app.core.streaming import stream_todo_page
+from app.database import Todo
+
+
+def _stream(app_engine, list_obj, name="partials/todo_list_content.html", **context):
+    """Run ``stream_todo_page`` and collect the chunks it sends."""
+
+    async def collect():
+        async with AsyncSession(app_engine) as db:
+            response = await stream_todo_page(
+                name,
+                {"list": list_obj, "active_list": list_obj, "lists": [], **context},
+                todo_page_statement(list_obj.id),
+                db,
+                more_url=lambda cursor: f"/more?after={cursor[0]}",
+            )
+            if response is None:
+                return None
+            return [chunk async for chunk in response.body_iterator]
+
+    return asyncio.run(collect())
+
+
+class TestStreamTodoPage:
+    """Tests for ``stream_todo_page``."""
+
+    @pytest.fixture
+    def todos(self, db_session, test_list):
+        todos = [
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(3)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+        return todos
+
+    def test_head_is_sent_before_todos(self, app_engine, test_list, todos):
+        """Test the list header is its own first chunk, then one chunk per todo."""
+        chunks = _stream(app_engine, test_list)
+
+        assert "Test List" in chunks[0]
+        assert "todo-item" not in chunks[0]
+        assert [todo.title in chunk for todo, chunk in zip(todos, chunks[1:])] == [
+            True
+        ] * 3
+        assert chunks[-1].rstrip().endswith("</div>")
+        assert "<!--todos-->" not in "".join(chunks)
+
+    def test_stops_at_page_size_with_sentinel(
+        self, monkeypatch, app_engine, test_list, todos
+    ):
+        """Test only one page is streamed, followed by the load-more sentinel."""
+        monkeypatch.setattr(settings, "todo_page_size", 2)
+        html = "".join(_stream(app_engine, test_list))
+
+        assert "Todo 1" in html
+        assert "Todo 2" not in html
+        assert f'hx-get="/more?after={todos[1].position}"' in html
+
+    def test_full_page_streams_layout_first(
+        self, app_engine, test_user, test_list, todos
+    ):
+        """Test the app page's layout precedes the todos and closes after them."""
+        chunks = _stream(app_engine, test_list, name="app.html", user=test_user)
+
+        assert "<html" in chunks[0]
+        assert "</html>" in chunks[-1]
+        assert sum("todo-item" in chunk for chunk in chunks) == 3
+
+    def test_body_outlives_the_route_session(self, app_engine, test_list, todos):
+        """Test the todos still stream after the route's session is closed."""
+
+        async def collect():
+            async with AsyncSession(app_engine) as db:
+                response = await stream_todo_page(
+                    "partials/todo_list_content.html",
+                    {"list": test_list},
+                    todo_page_statement(test_list.id),
+                    db,
+                    more_url=lambda cursor: f"/more?after={cursor[0]}",
+                )
+            # As FastAPI < 0.118 does with yield dependencies
+            return [chunk async for chunk in response.body_iterator]
+
+        html = "".join(asyncio.run(collect()))
+        assert all(todo.title in html for todo in todos)
+
+    def test_slow_reader_does_not_block_writers(
+        self, app_engine, db_session, test_list
+    ):
+        """Test no read lock is held while the body is still being sent."""
+        todos = [
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(120)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+
+        async def collect():
+            async with AsyncSession(app_engine) as db:
+                response = await stream_todo_page(
+                    "partials/todo_list_content.html",
+                    {"list": test_list},
+                    todo_page_statement(test_list.id),
+                    db,
+                    more_url=lambda cursor: f"/more?after={cursor[0]}",
+                )
+                chunks = response.body_iterator
+                sent = [await anext(chunks), await anext(chunks)]
+                # A write lands while the client is still reading the page
+                todos[-1].title = "Renamed"
+                db_session.commit()
+                return sent + [chunk async for chunk in chunks]
+
+        html = "".join(asyncio.run(collect()))
+        assert "Todo 99" in html
+        assert "Renamed" not in html
+
+    def test_empty_list_is_not_streamed(self, app_engine, test_list):
+        """Test an empty list returns None so the empty state is rendered."""
+        assert _stream(app_engine, test_list) is None
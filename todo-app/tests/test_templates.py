@@ -0,0 +1,40 @@
+"""Tests for the shared Jinja2 environment."""
+
+from app.core.config import Settings
+from app.core.templates import create_environment, precompile_templates, templates
+from app.routes import auth, pages, todo_lists, todos
+
+
+class TestTemplates:
+    """Tests for template compilation and caching."""
+
+    def test_routers_share_one_environment(self):
+        """Test every router renders through the same environment."""
+        for module in (auth, pages, todo_lists, todos):
+            assert module.templates is templates
+        assert templates.env.globals["is_overdue"] is not None
+        assert "url_for" in templates.env.globals
+
+    def test_precompile_loads_every_partial(self, tmp_path):
+        """Test lifespan precompilation fills the in-memory template cache."""
+        env = create_environment(Settings(template_cache_dir=str(tmp_path)))
+        names = precompile_templates(env)
+
+        assert "partials/todo_item.html" in names
+        assert "app.html" in names
+        cached = {template.name for template in env.cache.values()}
+        assert set(names) <= cached
+
+    def test_bytecode_cache_skips_compilation(self, tmp_path, monkeypatch):
+        """Test a new environment (e.g. a new worker) reuses cached bytecode."""
+        warm = create_environment(Settings(template_cache_dir=str(tmp_path)))
+        names = precompile_templates(warm)
+        assert len(list(tmp_path.iterdir())) == len(names)
+
+        fresh = create_environment(Settings(template_cache_dir=str(tmp_path)))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("template was compiled again")
+
+        monkeypatch.setattr(fresh, "compile", fail)
+        precompile_templates(fresh)
@@ -0,0 +1,134 @@
+"""Tests for Server-Timing instrumentation."""
+
+import json
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import timing
+from app.core.config import settings
+from app.core.statements import has_statement_listener
+from app.database import Todo
+
+
+@pytest.fixture
+def server_timing(client):
+    # After the client, whose lifespan applies the SERVER_TIMING setting
+    timing.set_server_timing(True)
+    yield
+    timing.set_server_timing(False)
+
+
+@pytest.fixture
+def no_server_timing(client, monkeypatch):
+    # Off whatever SERVER_TIMING is set to where the tests run
+    monkeypatch.setattr(settings, "server_timing", False)
+    timing.set_server_timing(False)
+
+
+def _metrics(header: str) -> dict[str, str]:
+    """``Server-Timing`` entries by name, e.g. ``{"db": 'dur=1.2;desc="3 queries"'}``."""
+    entries = (entry.strip().partition(";") for entry in header.split(","))
+    return {name: params for name, _, params in entries}
+
+
+class TestServerTiming:
+    """Tests for the per-request timing header and log line."""
+
+    def test_header_has_db_render_and_total(
+        self, server_timing, authenticated_client, test_list, test_todo
+    ):
+        """Test a list page reports its queries, rendering and total time."""
+        response = authenticated_client.get(f"/api/lists/{test_list.id}")
+        metrics = _metrics(response.headers["server-timing"])
+
+        assert {"db", "render", "auth", "total"} <= metrics.keys()
+        queries = int(metrics["db"].partition('desc="')[2].split()[0])
+        assert queries >= 1
+
+    def test_log_line_covers_streamed_body(
+        self, server_timing, authenticated_client, test_list, db_session, caplog
+    ):
+        """Test the JSON log line is written once the streamed page is complete."""
+        db_session.add_all(
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(3)
+        )
+        db_session.commit()
+        caplog.set_level(logging.INFO, logger=timing.logger.name)
+
+        response = authenticated_client.get(f"/app/lists/{test_list.id}")
+        assert response.status_code == 200
+
+        (record,) = [r for r in caplog.records if r.name == timing.logger.name]
+        line = json.loads(record.getMessage())
+        assert line["path"] == f"/app/lists/{test_list.id}"
+        assert line["status"] == 200
+        assert line["db_queries"] >= 1
+        assert line["render_ms"] > 0
+        assert line["total_ms"] >= line["render_ms"]
+
+    def test_disabled_adds_nothing(
+        self, no_server_timing, authenticated_client, test_list
+    ):
+        """Test timing off means no header and no statement listener."""
+        response = authenticated_client.get(f"/api/lists/{test_list.id}")
+
+        assert "server-timing" not in response.headers
+        assert not has_statement_listener(timing._record_statement)
+
+    def test_toggle_at_runtime(self, no_server_timing, authenticated_client, test_list):
+        """Test toggling (as SIGUSR2 does) switches the header on and off."""
+        url = f"/api/lists/{test_list.id}"
+        timing.toggle_server_timing()
+        try:
+            assert "server-timing" in authenticated_client.get(url).headers
+        finally:
+            timing.toggle_server_timing()
+        assert "server-timing" not in authenticated_client.get(url).headers
+
+
+    def test_failed_statement_leaves_no_state(self, server_timing, tmp_path):
+        """Test a statement that raises is not counted and leaves the connection clean."""
+        engine = create_engine(f"sqlite:///{tmp_path}/failing.db")
+        request, token = timing.start_request()
+        try:
+            with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+                conn.execute(text("SELECT 1"))
+                leftovers = [key for key in conn.info if key.endswith("_start")]
+        finally:
+            timing.end_request(token)
+            engine.dispose()
+
+        assert request.db_queries == 1
+        assert leftovers == []
+
+
+class TestNPlusOneDetection:
+    """Tests for flagging repeated statement shapes."""
+
+    def test_statement_shape_ignores_in_list_length(self):
+        """Test IN lists of any length are one shape."""
+        assert timing.statement_shape(
+            "SELECT id FROM todos\n WHERE id IN (?, ?, ?)"
+        ) == timing.statement_shape("SELECT id FROM todos WHERE id IN (?)")
+
+    def test_repeated_shape_is_logged(
+        self, monkeypatch, server_timing, authenticated_client, test_list, caplog
+    ):
+        """Test a shape run ``N_PLUS_ONE_THRESHOLD`` times in a request is logged."""
+        monkeypatch.setattr(settings, "n_plus_one_threshold", 1)
+        caplog.set_level(logging.INFO, logger=timing.logger.name)
+
+        authenticated_client.get(f"/api/lists/{test_list.id}")
+
+        warnings = [
+            json.loads(record.getMessage())
+            for record in caplog.records
+            if record.name == timing.logger.name and record.levelno == logging.WARNING
+        ]
+        assert warnings and all(line["count"] >= 1 for line in warnings)
+        assert any("FROM todos" in line["n_plus_one"] for line in warnings)
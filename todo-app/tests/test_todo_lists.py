@@ -1,10 +1,23 @@
 """Tests for todo list routes."""
 
+import html
+import re
+
 import pytest
+from sqlalchemy import update
 
+from app.core.config import settings
 from app.database import Todo, TodoList
 
 
+def _classes(html: str, element_id: str) -> set[str]:
+    """CSS classes of the tag with ``element_id``, however it is laid out."""
+    tag = re.search(rf'<[^>]*\bid="{re.escape(element_id)}"[^>]*>', html)
+    assert tag is not None, element_id
+    classes = re.search(r'\bclass="([^"]*)"', tag[0])
+    return set(classes[1].split()) if classes else set()
+
+
 class TestTodoLists:
     """Tests for todo list CRUD operations."""
 
@@ -124,6 +137,287 @@ class TestTodoLists:
         db_session.refresh(list1)
         db_session.refresh(list2)
         db_session.refresh(list3)
-        assert list3.position == 0
-        assert list1.position == 1
-        assert list2.position == 2
+        assert list3.position < list1.position < list2.position
+
+    def test_reorder_lists_fills_null_positions(
+        self, authenticated_client, test_user, db_session
+    ):
+        """Test lists with a NULL position (legacy rows) get a key too."""
+        lists = [
+            TodoList(user_id=test_user.id, name=f"List {i}", position=i) for i in range(2)
+        ]
+        db_session.add_all(lists)
+        db_session.commit()
+        db_session.execute(update(TodoList).values(position=None))
+        db_session.commit()
+
+        response = authenticated_client.post(
+            "/api/lists/reorder", data={"list_id": [lists[1].id, lists[0].id]}
+        )
+        assert response.status_code == 200
+
+        for todo_list in lists:
+            db_session.refresh(todo_list)
+        assert [lists[1].position, lists[0].position] == ["a0", "a1"]
+
+    def test_reorder_lists_is_bulk(
+        self, authenticated_client, test_user, db_session, query_counter
+    ):
+        """Test reordering 200 lists costs one UPDATE plus one sidebar read."""
+        lists = [
+            TodoList(user_id=test_user.id, name=f"List {i}", position=i)
+            for i in range(200)
+        ]
+        db_session.add_all(lists)
+        db_session.commit()
+        new_order = [lst.id for lst in reversed(lists)]
+
+        query_counter.clear()
+        response = authenticated_client.post(
+            "/api/lists/reorder",
+            data={"list_id": new_order},
+            headers={"referer": f"http://testserver/app/lists/{lists[5].id}"},
+        )
+        assert response.status_code == 200
+        assert len(query_counter) == 2
+        assert query_counter[0].startswith("UPDATE todo_lists")
+
+        # Sidebar is rendered in the new order with the active list marked
+        content = response.text
+        assert content.index(f'id="list-{lists[199].id}"') < content.index(
+            f'id="list-{lists[0].id}"'
+        )
+        assert "active" in _classes(content, f"list-{lists[5].id}")
+        assert "active" not in _classes(content, f"list-{lists[6].id}")
+
+    def test_reorder_lists_ignores_other_users_lists(
+        self, authenticated_client, test_user, db_session
+    ):
+        """Test the bulk update only touches the caller's lists."""
+        from app.database import User
+
+        other = User(email="other@example.com", password="password")
+        db_session.add(other)
+        db_session.commit()
+        foreign = TodoList(user_id=other.id, name="Foreign", position=7)
+        mine = TodoList(user_id=test_user.id, name="Mine", position=3)
+        db_session.add_all([foreign, mine])
+        db_session.commit()
+
+        response = authenticated_client.post(
+            "/api/lists/reorder", data={"list_id": [foreign.id, mine.id]}
+        )
+        assert response.status_code == 200
+
+        db_session.refresh(foreign)
+        db_session.refresh(mine)
+        assert foreign.position == "a7"
+        assert mine.position == "a1"
+        assert b"Foreign" not in response.content
+
+
+class TestConditionalGets:
+    """Tests for ETag revalidation of the list, sidebar and page routes."""
+
+    def _revalidate(self, client, url):
+        first = client.get(url)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "private, no-cache"
+        return etag, client.get(url, headers={"If-None-Match": etag})
+
+    @pytest.mark.parametrize(
+        "url", ["/api/lists", "/api/lists/{id}", "/app/lists/{id}"]
+    )
+    def test_unchanged_returns_304(self, authenticated_client, test_list, url):
+        """Test a matching If-None-Match gets an empty 304."""
+        etag, response = self._revalidate(
+            authenticated_client, url.format(id=test_list.id)
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_304_is_one_lookup(self, authenticated_client, test_list, query_counter):
+        """Test HTMX navigation to an unchanged list costs one SELECT."""
+        url = f"/api/lists/{test_list.id}"
+        etag = authenticated_client.get(url).headers["etag"]
+        query_counter.clear()
+
+        response = authenticated_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert len(query_counter) == 1
+
+    def test_todo_write_changes_list_etag(self, authenticated_client, test_todo):
+        """Test todo edits change the list's ETag, even without touching the list."""
+        url = f"/api/lists/{test_todo.list_id}"
+        before = authenticated_client.get(url).headers["etag"]
+
+        authenticated_client.put(
+            f"/api/todos/{test_todo.id}", data={"title": "Renamed"}
+        )
+        response = authenticated_client.get(url, headers={"If-None-Match": before})
+        assert response.status_code == 200
+        assert b"Renamed" in response.content
+        assert response.headers["etag"] != before
+
+    def test_list_rename_changes_etags(self, authenticated_client, test_list):
+        """Test renaming a list changes the list, sidebar and page ETags."""
+        urls = ["/api/lists", f"/api/lists/{test_list.id}", f"/app/lists/{test_list.id}"]
+        before = {url: authenticated_client.get(url).headers["etag"] for url in urls}
+
+        authenticated_client.put(
+            f"/api/lists/{test_list.id}", data={"name": "Renamed"}
+        )
+        for url in urls:
+            response = authenticated_client.get(
+                url, headers={"If-None-Match": before[url]}
+            )
+            assert response.status_code == 200
+            assert b"Renamed" in response.content
+
+    def test_sidebar_etag_follows_counts_and_order(
+        self, authenticated_client, test_user, test_list, db_session
+    ):
+        """Test the sidebar ETag changes with open counts and list order."""
+        other = TodoList(user_id=test_user.id, name="Other", position=1)
+        db_session.add(other)
+        db_session.commit()
+        etags = [authenticated_client.get("/api/lists").headers["etag"]]
+
+        authenticated_client.post(
+            "/api/todos", data={"list_id": test_list.id, "title": "New"}
+        )
+        etags.append(authenticated_client.get("/api/lists").headers["etag"])
+        authenticated_client.post(
+            "/api/lists/reorder", data={"list_id": [other.id, test_list.id]}
+        )
+        etags.append(authenticated_client.get("/api/lists").headers["etag"])
+        assert len(set(etags)) == 3
+
+    def test_todo_edit_keeps_sidebar_etag(self, authenticated_client, test_todo):
+        """Test edits that do not show in the sidebar keep it revalidating to 304."""
+        etag, _ = self._revalidate(authenticated_client, "/api/lists")
+        authenticated_client.put(
+            f"/api/todos/{test_todo.id}", data={"title": "Edited"}
+        )
+
+        response = authenticated_client.get(
+            "/api/lists", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_etag_is_per_user(self, client, db_session, test_list):
+        """Test another user's ETag never matches."""
+        from app.core.deps import create_session
+        from app.database import User
+
+        client.cookies.set("session_id", create_session(test_list.user_id))
+        etag = client.get("/api/lists").headers["etag"]
+
+        other = User(email="other@example.com", password="password")
+        db_session.add(other)
+        db_session.commit()
+        client.cookies.set("session_id", create_session(other.id))
+        response = client.get("/api/lists", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+
+class TestTodoPagination:
+    """Tests for keyset-paginated todo loading."""
+
+    @pytest.fixture
+    def many_todos(self, monkeypatch, db_session, test_list):
+        monkeypatch.setattr(settings, "todo_page_size", 3)
+        todos = [
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(7)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+        return todos
+
+    def _load_all(self, client, url):
+        """Follow the infinite-scroll sentinels; return titles and page count."""
+        titles, pages = [], 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            titles += re.findall(r'data-todo-title="(Todo \d+)"', response.text)
+            pages += 1
+            match = re.search(r'hx-get="(/api/lists/[^"]+/todos[^"]+)"', response.text)
+            url = match and html.unescape(match.group(1))
+        return titles, pages
+
+    def test_list_loads_in_pages(self, authenticated_client, test_list, many_todos):
+        """Test the list renders one page and a sentinel chain for the rest."""
+        titles, pages = self._load_all(
+            authenticated_client, f"/api/lists/{test_list.id}"
+        )
+        assert titles == [todo.title for todo in many_todos]
+        assert pages == 3
+
+    def test_app_page_renders_first_page(self, authenticated_client, test_list, many_todos):
+        """Test the full page only renders the first page of todos."""
+        response = authenticated_client.get(f"/app/lists/{test_list.id}")
+        assert response.text.count('class="todo-item') == 3
+        assert 'hx-trigger="revealed"' in response.text
+
+    def test_page_is_one_range_scan(
+        self, authenticated_client, test_list, many_todos, query_counter
+    ):
+        """Test a later page is a single statement on the position index."""
+        authenticated_client.get(
+            f"/api/lists/{test_list.id}/todos",
+            params={"after": "a2", "after_id": many_todos[2].id},
+        )
+        assert len(query_counter) == 1
+        assert "(todos.position, todos.id) >" in query_counter[0]
+        assert "LIMIT" in query_counter[0]
+
+    def test_duplicate_positions_at_page_boundary(
+        self, authenticated_client, db_session, test_list, many_todos
+    ):
+        """Test todos sharing the boundary position all appear, once each."""
+        for todo in many_todos[1:5]:
+            todo.position = many_todos[2].position
+        db_session.commit()
+
+        titles, pages = self._load_all(
+            authenticated_client, f"/api/lists/{test_list.id}"
+        )
+        assert sorted(titles) == sorted(todo.title for todo in many_todos)
+        assert pages == 3
+
+    def test_reorder_across_page_boundary(
+        self, authenticated_client, test_list, many_todos
+    ):
+        """Test moving a todo below the last loaded one keeps every page whole."""
+        first, last_loaded = many_todos[0], many_todos[2]
+        authenticated_client.post(
+            f"/api/todos/{first.id}/reorder", data={"after_id": last_loaded.id}
+        )
+
+        titles, _ = self._load_all(
+            authenticated_client, f"/api/lists/{test_list.id}"
+        )
+        expected = [todo.title for todo in many_todos]
+        expected.insert(2, expected.pop(0))
+        assert titles == expected
+
+    def test_page_of_other_users_list_is_empty(
+        self, client, db_session, test_list, many_todos
+    ):
+        """Test the page endpoint does not leak another user's todos."""
+        from app.core.deps import create_session
+        from app.database import User
+
+        other = User(email="other@example.com", password="password")
+        db_session.add(other)
+        db_session.commit()
+        client.cookies.set("session_id", create_session(other.id))
+
+        response = client.get(
+            f"/api/lists/{test_list.id}/todos", params={"after": ""}
+        )
+        assert response.status_code == 200
+        assert "todo-item" not in response.text
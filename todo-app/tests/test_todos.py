@@ -4,7 +4,7 @@ from datetime import date, datetime, timezone
 
 import pytest
 
-from app.database import Todo
+from app.database import Todo, TodoList
 
 
 class TestTodos:
@@ -111,9 +111,7 @@ class TestTodos:
         db_session.refresh(todo1)
         db_session.refresh(todo2)
         db_session.refresh(todo3)
-        assert todo3.position == 0
-        assert todo1.position == 1
-        assert todo2.position == 2
+        assert todo3.position < todo1.position < todo2.position
 
     def test_reorder_todo_move_down(self, authenticated_client, test_list, db_session):
         """Test reordering a todo to a later position."""
@@ -135,9 +133,115 @@ class TestTodos:
         db_session.refresh(todo1)
         db_session.refresh(todo2)
         db_session.refresh(todo3)
-        assert todo2.position == 0
-        assert todo3.position == 1
-        assert todo1.position == 2
+        assert todo2.position < todo3.position < todo1.position
+
+    def test_reorder_todo_after_id_writes_only_moved_row(
+        self, authenticated_client, test_list, db_session
+    ):
+        """Test moving a todo below another only rewrites the moved todo."""
+        todos = [
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(5)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+        before = {t.id: t.position for t in todos}
+
+        # Move the last todo between "Todo 1" and "Todo 2"
+        response = authenticated_client.post(
+            f"/api/todos/{todos[4].id}/reorder",
+            data={"after_id": todos[1].id},
+        )
+        assert response.status_code == 200
+
+        for todo in todos:
+            db_session.refresh(todo)
+        assert todos[1].position < todos[4].position < todos[2].position
+        unchanged = [t for t in todos if t.position == before[t.id]]
+        assert len(unchanged) == 4
+
+    def test_reorder_todo_to_top(self, authenticated_client, test_list, db_session):
+        """Test omitting after_id moves the todo to the top."""
+        todos = [
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(3)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+
+        response = authenticated_client.post(
+            f"/api/todos/{todos[2].id}/reorder", data={"after_id": ""}
+        )
+        assert response.status_code == 200
+
+        db_session.refresh(todos[2])
+        db_session.refresh(todos[0])
+        assert todos[2].position < todos[0].position
+
+    def test_reorder_todo_unknown_after_id(self, authenticated_client, test_todo):
+        """Test after_id must be a todo in the same list."""
+        response = authenticated_client.post(
+            f"/api/todos/{test_todo.id}/reorder", data={"after_id": "missing"}
+        )
+        assert response.status_code == 404
+
+    def test_reorder_todo_rebalances_long_keys(
+        self, authenticated_client, test_list, db_session, monkeypatch
+    ):
+        """Test a move producing a long key triggers the rebalancing pass."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "order_key_rebalance_length", 2)
+        todos = [
+            Todo(list_id=test_list.id, title=f"Todo {i}", position=i) for i in range(3)
+        ]
+        db_session.add_all(todos)
+        db_session.commit()
+
+        # "a0" < new key < "a1" needs a fractional digit, exceeding the limit
+        response = authenticated_client.post(
+            f"/api/todos/{todos[2].id}/reorder", data={"after_id": todos[0].id}
+        )
+        assert response.status_code == 200
+
+        for todo in todos:
+            db_session.refresh(todo)
+        assert [todos[0].position, todos[2].position, todos[1].position] == [
+            "a0",
+            "a1",
+            "a2",
+        ]
+
+    def test_reorder_todo_after_duplicate_key(
+        self, authenticated_client, test_list, db_session
+    ):
+        """Test moving after a todo that shares its key respaces the list first."""
+        todos = [Todo(list_id=test_list.id, title=name) for name in "abcd"]
+        db_session.add_all(todos)
+        db_session.commit()
+        # A and B share "a1" (e.g. two concurrent creates); ties sort by id
+        todos.sort(key=lambda t: t.id)
+        for todo, name, key in zip(todos, "abcd", ("a1", "a1", "a2", "a3")):
+            todo.title, todo.position = name, key
+        db_session.commit()
+
+        response = authenticated_client.post(
+            f"/api/todos/{todos[3].id}/reorder", data={"after_id": todos[0].id}
+        )
+        assert response.status_code == 200
+
+        for todo in todos:
+            db_session.refresh(todo)
+        ordered = sorted(todos, key=lambda t: (t.position, t.id))
+        assert [t.title for t in ordered] == ["a", "d", "b", "c"]
+        assert len({t.position for t in todos}) == 4
+
+    def test_create_todo_appends_after_last(self, authenticated_client, test_todo, db_session):
+        """Test new todos get a key after the current last todo."""
+        authenticated_client.post(
+            "/api/todos", data={"list_id": test_todo.list_id, "title": "Appended"}
+        )
+        created = db_session.query(Todo).filter(Todo.title == "Appended").one()
+        db_session.refresh(test_todo)
+        assert created.position > test_todo.position
 
     def test_search_todos(self, authenticated_client, test_list, db_session):
         """Test searching todos."""
@@ -190,6 +294,115 @@ class TestTodos:
         assert b"Todo 1" in response.content
         assert b"Todo 2" in response.content
 
+    def test_search_matches_notes_and_prefixes(
+        self, authenticated_client, test_list, db_session
+    ):
+        """Test search covers notes and matches word prefixes."""
+        db_session.add_all([
+            Todo(list_id=test_list.id, title="Call Bob", note="about the invoice", position=0),
+            Todo(list_id=test_list.id, title="Send email", position=1),
+        ])
+        db_session.commit()
+
+        response = authenticated_client.get(
+            f"/api/todos/search?list_id={test_list.id}&q=invo"
+        )
+        assert b"Call Bob" in response.content
+        assert b"Send email" not in response.content
+
+    def test_search_ranks_title_hits_first(
+        self, authenticated_client, test_list, db_session
+    ):
+        """Test bm25 ranking puts title matches above note matches."""
+        db_session.add_all([
+            Todo(list_id=test_list.id, title="Errands", note="pick up milk", position=0),
+            Todo(list_id=test_list.id, title="Buy milk", position=1),
+        ])
+        db_session.commit()
+
+        content = authenticated_client.get(
+            f"/api/todos/search?list_id={test_list.id}&q=milk"
+        ).text
+        assert content.index("Buy milk") < content.index("Errands")
+
+    def test_search_treats_query_syntax_as_text(
+        self, authenticated_client, test_list, db_session
+    ):
+        """Test FTS5 operators in user input do not cause errors."""
+        db_session.add(Todo(list_id=test_list.id, title="Buy milk", position=0))
+        db_session.commit()
+
+        for q in ['"', "milk AND", "NEAR(", "title:*", "-"]:
+            response = authenticated_client.get(
+                "/api/todos/search", params={"list_id": test_list.id, "q": q}
+            )
+            assert response.status_code == 200
+
+    def test_search_index_follows_writes(self, authenticated_client, test_todo):
+        """Test the index tracks edits and deletes made through the API."""
+        authenticated_client.put(
+            f"/api/todos/{test_todo.id}",
+            data={"title": "Renamed task", "priority": "low"},
+        )
+        url = f"/api/todos/search?list_id={test_todo.list_id}&q="
+        assert b"Renamed task" in authenticated_client.get(url + "renamed").content
+        assert b"Renamed task" not in authenticated_client.get(url + "test").content
+
+        authenticated_client.delete(f"/api/todos/{test_todo.id}")
+        assert b"Renamed task" not in authenticated_client.get(url + "renamed").content
+
+    def test_search_across_all_lists(
+        self, authenticated_client, test_user, test_list, db_session
+    ):
+        """Test omitting list_id searches every list of the current user only."""
+        from app.database import User
+
+        other_list = TodoList(user_id=test_user.id, name="Other", position=1)
+        stranger = User(email="other@example.com", password="password")
+        db_session.add_all([other_list, stranger])
+        db_session.commit()
+        foreign_list = TodoList(user_id=stranger.id, name="Foreign", position=0)
+        db_session.add(foreign_list)
+        db_session.commit()
+        db_session.add_all([
+            Todo(list_id=test_list.id, title="Buy milk", position=0),
+            Todo(list_id=other_list.id, title="Buy bread", position=0),
+            Todo(list_id=foreign_list.id, title="Buy shoes", position=0),
+        ])
+        db_session.commit()
+
+        response = authenticated_client.get("/api/todos/search?q=buy")
+        assert response.status_code == 200
+        assert b"Buy milk" in response.content
+        assert b"Buy bread" in response.content
+        assert b"Buy shoes" not in response.content
+
+    def test_search_results_are_paged(
+        self, monkeypatch, authenticated_client, test_list, db_session
+    ):
+        """Test search results come in pages chained by a revealed sentinel."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "todo_page_size", 2)
+        db_session.add_all(
+            [Todo(list_id=test_list.id, title=f"Task {i}", position=i) for i in range(3)]
+        )
+        db_session.commit()
+
+        first = authenticated_client.get(
+            "/api/todos/search", params={"list_id": test_list.id, "q": "task"}
+        )
+        assert first.text.count('class="todo-item') == 2
+        assert "offset=2" in first.text
+
+        rest = authenticated_client.get(
+            "/api/todos/search",
+            params={"list_id": test_list.id, "q": "task", "offset": 2},
+        )
+        assert rest.text.count('class="todo-item') == 1
+        assert 'hx-trigger="revealed"' not in rest.text
+        assert "empty-todos" not in rest.text
+
 
 class TestTodoAccess:
     """Tests for todo access control."""
@@ -232,3 +445,109 @@ class TestTodoAccess:
             data={"title": "Hacked!"},
         )
         assert response.status_code == 403
+
+
+class TestTodoCounters:
+    """Tests for the denormalized open/total counters on TodoList."""
+
+    def test_create_increments_counters(self, authenticated_client, test_list, db_session):
+        """Test creating a todo bumps both counters and the OOB count."""
+        response = authenticated_client.post(
+            "/api/todos",
+            data={"list_id": test_list.id, "title": "Counted"},
+        )
+        assert response.status_code == 200
+        assert f'id="list-{test_list.id}-count" hx-swap-oob="true">1<' in response.text
+
+        db_session.refresh(test_list)
+        assert test_list.open_count == 1
+        assert test_list.total_count == 1
+
+    def test_toggle_moves_open_count(self, authenticated_client, test_todo, test_list, db_session):
+        """Test toggling only changes the open counter."""
+        authenticated_client.patch(f"/api/todos/{test_todo.id}/toggle")
+        db_session.refresh(test_list)
+        assert test_list.open_count == 0
+        assert test_list.total_count == 1
+
+        authenticated_client.patch(f"/api/todos/{test_todo.id}/toggle")
+        db_session.refresh(test_list)
+        assert test_list.open_count == 1
+        assert test_list.total_count == 1
+
+    def test_delete_decrements_counters(self, authenticated_client, test_todo, test_list, db_session):
+        """Test deleting an open todo decrements both counters."""
+        response = authenticated_client.delete(f"/api/todos/{test_todo.id}")
+        assert response.status_code == 200
+        assert ">0</span>" in response.text
+
+        db_session.refresh(test_list)
+        assert test_list.open_count == 0
+        assert test_list.total_count == 0
+
+    def test_delete_completed_keeps_open_count(self, authenticated_client, test_todo, test_list, db_session):
+        """Test deleting a completed todo leaves the open counter alone."""
+        authenticated_client.patch(f"/api/todos/{test_todo.id}/toggle")
+        authenticated_client.delete(f"/api/todos/{test_todo.id}")
+
+        db_session.refresh(test_list)
+        assert test_list.open_count == 0
+        assert test_list.total_count == 0
+
+    def test_sidebar_renders_counter(self, authenticated_client, test_todo, test_list):
+        """Test the sidebar reads the stored counter."""
+        response = authenticated_client.get("/api/lists")
+        assert f'id="list-{test_list.id}-count">1<' in response.text
+
+
+class TestTodoQueryBudget:
+    """Tests that todo endpoints fuse the ownership check into their queries."""
+
+    def test_mutations_use_at_most_two_statements(
+        self, authenticated_client, test_todo, test_list, db_session, query_counter
+    ):
+        """Test every todo mutation needs no more than two SQL statements."""
+        other = Todo(list_id=test_list.id, title="Other", position=1)
+        db_session.add(other)
+        db_session.commit()
+
+        requests = [
+            ("post", "/api/todos", {"list_id": test_list.id, "title": "New"}),
+            ("get", f"/api/todos/{test_todo.id}", None),
+            ("put", f"/api/todos/{test_todo.id}", {"title": "Edited"}),
+            ("patch", f"/api/todos/{test_todo.id}/toggle", None),
+            ("post", f"/api/todos/{test_todo.id}/reorder", {"after_id": other.id}),
+            ("post", f"/api/todos/{test_todo.id}/reorder", {"position": 0}),
+            ("delete", f"/api/todos/{test_todo.id}", None),
+        ]
+        for method, url, data in requests:
+            query_counter.clear()
+            kwargs = {"data": data} if data else {}
+            response = getattr(authenticated_client, method)(url, **kwargs)
+            assert response.status_code == 200, (method, url)
+            assert len(query_counter) <= 2, (method, url, query_counter)
+
+    def test_toggle_sets_and_clears_completed_at(
+        self, authenticated_client, test_todo, db_session
+    ):
+        """Test the SQL-side toggle keeps completed_at in step."""
+        authenticated_client.patch(f"/api/todos/{test_todo.id}/toggle")
+        db_session.refresh(test_todo)
+        assert test_todo.is_completed is True
+        assert test_todo.completed_at is not None
+
+        authenticated_client.patch(f"/api/todos/{test_todo.id}/toggle")
+        db_session.refresh(test_todo)
+        assert test_todo.is_completed is False
+        assert test_todo.completed_at is None
+
+    def test_missing_todo_is_404_for_every_mutation(self, authenticated_client):
+        """Test the error path still tells missing from forbidden."""
+        missing = "00000000-0000-7000-8000-000000000000"
+        assert authenticated_client.get(f"/api/todos/{missing}").status_code == 404
+        assert authenticated_client.put(
+            f"/api/todos/{missing}", data={"title": "x"}
+        ).status_code == 404
+        assert authenticated_client.patch(f"/api/todos/{missing}/toggle").status_code == 404
+        assert authenticated_client.delete(f"/api/todos/{missing}").status_code == 404
+        assert authenticated_client.post(f"/api/todos/{missing}/reorder").status_code == 404
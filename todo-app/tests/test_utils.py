@@ -0,0 +1,120 @@
+"""Tests for the template helpers in app.utils."""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.database import Todo, User
+from app.utils import (
+    DUE_TODAY,
+    NO_DUE_STATE,
+    OVERDUE,
+    UPCOMING,
+    classify_due,
+    request_today,
+    reset_request_today,
+    set_request_today,
+)
+
+# UTC+14 and UTC-11: their dates differ at every moment
+AHEAD, BEHIND = "Pacific/Kiritimati", "Pacific/Pago_Pago"
+
+
+def _local_today(zone: str):
+    return datetime.now(ZoneInfo(zone)).date()
+
+
+class TestDueState:
+    """Tests for the batch due-state classification."""
+
+    def test_classify_due(self):
+        """Test every todo in the batch is tagged against one date."""
+        today = datetime(2025, 6, 15, tzinfo=timezone.utc)
+        todos = [
+            Todo(title="past", due_date=today - timedelta(days=1), is_completed=False),
+            Todo(title="done", due_date=today - timedelta(days=1), is_completed=True),
+            Todo(title="today", due_date=today, is_completed=True),
+            Todo(title="later", due_date=today + timedelta(days=1)),
+            Todo(title="none", due_date=None),
+        ]
+        classify_due(todos, today.date())
+        assert [todo.due_state for todo in todos] == [
+            OVERDUE,
+            NO_DUE_STATE,
+            DUE_TODAY,
+            UPCOMING,
+            NO_DUE_STATE,
+        ]
+
+    def test_request_today_uses_time_zone(self):
+        """Test the request's date follows the given zone, UTC when unknown."""
+        for zone, expected in [
+            (AHEAD, _local_today(AHEAD)),
+            (BEHIND, _local_today(BEHIND)),
+            ("Not/AZone", datetime.now(timezone.utc).date()),
+            (None, datetime.now(timezone.utc).date()),
+        ]:
+            token = set_request_today(zone)
+            try:
+                assert request_today() == expected
+            finally:
+                reset_request_today(token)
+
+
+class TestUserTimezone:
+    """Tests for rendering due dates in the user's time zone."""
+
+    def test_login_stores_browser_timezone(
+        self, client, test_user, test_todo, db_session
+    ):
+        """Test login keeps a valid browser time zone and applies it afterwards."""
+        test_todo.due_date = datetime.combine(_local_today(AHEAD), datetime.min.time())
+        db_session.commit()
+
+        client.post(
+            "/auth/login",
+            data={"email": test_user.email, "password": "testpass123", "timezone": AHEAD},
+        )
+        db_session.refresh(test_user)
+        assert test_user.timezone == AHEAD
+        assert "due-today priority" in client.get(f"/api/todos/{test_todo.id}").text
+
+    def test_login_ignores_unknown_timezone(self, client, test_user, db_session):
+        """Test a bogus time zone is not stored."""
+        client.post(
+            "/auth/login",
+            data={
+                "email": test_user.email,
+                "password": "testpass123",
+                "timezone": "Mars/Base",
+            },
+        )
+        db_session.refresh(test_user)
+        assert test_user.timezone is None
+
+    def test_due_today_follows_user_timezone(
+        self, authenticated_client, test_todo, db_session
+    ):
+        """Test "due today" is decided by the user's calendar, not UTC's."""
+        test_todo.due_date = datetime.combine(_local_today(AHEAD), datetime.min.time())
+        db_session.commit()
+        url = f"/api/todos/{test_todo.id}"
+
+        authenticated_client.cookies.set("timezone", AHEAD)
+        assert "due-today priority" in authenticated_client.get(url).text
+
+        authenticated_client.cookies.set("timezone", BEHIND)
+        assert "due-today" not in authenticated_client.get(url).text
+
+    def test_register_stores_timezone(self, client, db_session):
+        """Test registration keeps the browser's time zone."""
+        client.post(
+            "/auth/register",
+            data={
+                "email": "tz@example.com",
+                "password": "password123",
+                "confirm_password": "password123",
+                "timezone": BEHIND,
+            },
+        )
+        user = db_session.query(User).filter(User.email == "tz@example.com").one()
+        assert user.timezone == BEHIND